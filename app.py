@@ -12,7 +12,7 @@ from services.reddit.reddit_scraper import RedditScraper
 from routes.daily_summary_routes import router as daily_summary_router
 from services.reddit import reddit_scraper as scrapper
 from services.top_mover_service import fetch_top_movers
-from services.technical_indicator_service import calculate_technical_indicators
+from services.technical_indicator_service import calculate_technical_indicators, calculate_technical_indicators_batch
 from services.portfolio_service import purchase_asset, fetch_portfolio, do_transaction
 from services.paper_trading_service import (
     do_paper_transaction, get_paper_account, get_paper_portfolio, 
@@ -23,8 +23,10 @@ from services.trade_recommendation_service import (
     fetch_trade_recommendation
 )
 from services.daily_summary.daily_summary_service import generate_daily_summary
-from services.historical_screener_service import get_historical_rankings
+from services.historical_screener_service import get_historical_rankings, INGESTION_MODES
+from services.cache_warmer_service import cache_warmer, WARMER_ENABLED
 from services.backtest_trade_simulator import simulate_trade
+from utils import clock
 from services.backtest_session_cache import (
     create_session, get_session, find_session_by_date,
     update_session, add_trade_to_session,
@@ -54,6 +56,18 @@ app.add_middleware(
 # Include routers
 # app.include_router(daily_summary_router)
 
+
+@app.on_event("startup")
+def start_cache_warmer():
+    # Opt-in (MIDAS_CACHE_WARMER=1) - with several workers, only one should warm (see scripts/warm_caches.py)
+    if WARMER_ENABLED:
+        cache_warmer.start()
+
+
+@app.on_event("shutdown")
+def stop_cache_warmer():
+    cache_warmer.stop()
+
 # ------------------------------
 # GPT / Reddit Endpoints
 # ------------------------------
@@ -139,6 +153,23 @@ def get_signal(asset: str, type: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/midas/asset/get_signals")
+def get_signals(
+    tickers: str = Query(..., description="Comma-separated tickers, e.g. AAPL,MSFT,TSLA"),
+    type: str = Query("stock", description="Asset type ('stock' or 'crypto')")
+):
+    """Signals for several tickers in one call - same per-ticker schema as /get_signal, keyed by ticker"""
+    try:
+        ticker_list = [ticker.strip() for ticker in tickers.split(",") if ticker.strip()]
+        if not ticker_list:
+            raise HTTPException(status_code=400, detail="No tickers given")
+        return calculate_technical_indicators_batch(ticker_list, type)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/midas/asset/purchase")
 async def purchase(request: Request):
     try:
@@ -240,7 +271,12 @@ def get_repeated_movers():
 
 
 @app.get("/midas/asset/volume")
-def get_asset_volume(ticker: str, range: str = "1M"):
+def get_asset_volume(
+    ticker: str,
+    range: str = "1M",
+    interval: str = Query("day", description="Bar size: 'day', 'week' or 'month' (resampled from local daily bars)"),
+    multiplier: int = Query(1, description="Intervals per bar, e.g. multiplier=5&interval=day for 5-session bars")
+):
     """
     Get volume data for a ticker over a specified time period.
     
@@ -251,13 +287,20 @@ def get_asset_volume(ticker: str, range: str = "1M"):
     - 3M: Last 3 months (90 days)
     - 6M: Last 6 months (180 days)
     - YTD: Year to date (from Jan 1 to today)
+    
+    Weekly and monthly volumes are summed from the daily bars, each dated by
+    the first session of its period.
     """
     try:
         from datetime import datetime, timedelta
-        from utils.polygon_client import get_price_history
+        from utils.polygon_client import get_aggregate_bars
+        from utils.resample import TIMESPANS
+        
+        if interval not in TIMESPANS or multiplier < 1:
+            raise HTTPException(status_code=400, detail=f"interval must be one of {', '.join(TIMESPANS)} and multiplier >= 1")
         
         # Calculate days based on range
-        today = datetime.now().date()
+        today = clock.today()
         
         if range == "1D":
             days = 1
@@ -283,29 +326,20 @@ def get_asset_volume(ticker: str, range: str = "1M"):
             days = 30
             start_date = today - timedelta(days=30)
         
-        # Fetch price history from Polygon (includes volume)
-        bars = get_price_history(ticker, days=days)
+        # Daily bars from the bar store / Polygon, resampled locally for longer intervals
+        end_date = today.strftime("%Y-%m-%d")
+        bars = get_aggregate_bars(ticker, multiplier, interval, (today - timedelta(days=days)).strftime("%Y-%m-%d"), end_date)
         
-        if not bars:
+        if not len(bars):
             return []
         
-        # Convert Polygon bars to volume data format
-        volume_data = []
-        for bar in bars:
-            # Polygon returns timestamps in milliseconds
-            timestamp_ms = bar.get('t', 0)
-            date_obj = datetime.fromtimestamp(timestamp_ms / 1000).date()
-            volume = bar.get('v', 0)
-            
-            volume_data.append({
-                "date": date_obj.strftime("%Y-%m-%d"),
-                "volume": int(volume)
-            })
-        
-        # Sort by date ascending
-        volume_data.sort(key=lambda x: x['date'])
-        
-        return volume_data
+        # Bars come back oldest first, one date per bar
+        return [
+            {"date": date, "volume": int(volume)}
+            for date, volume in zip(bars.date_strings(), bars.v.tolist())
+        ]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching volume for {ticker}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -618,7 +652,7 @@ def get_screener_info():
     """Get information about the stock screener's universe and capabilities"""
     try:
         from services.ticker_universe_service import ticker_universe
-        from services.stock_screener_service import SECTOR_TICKERS, get_available_sectors
+        from services.stock_screener_service import SECTOR_TICKERS, get_available_sectors, get_warmer_status
         
         # Get universe stats
         universe_stats = ticker_universe.get_universe_stats()
@@ -636,6 +670,7 @@ def get_screener_info():
                 "coverage_percentage": round((2000 / universe_stats.get("total_tickers", 1)) * 100, 1)
             },
             "sectors": available_sectors,
+            "cache_warmer": get_warmer_status(),
             "capabilities": {
                 "performance_filtering": True,
                 "price_range_filtering": True,
@@ -778,7 +813,10 @@ def get_historical_rankings_endpoint(
     enable_rate_limiting: bool = Query(True, description="Enable rate limiting between API calls"),
     # Parallel processing parameters (for Pro tier)
     max_workers: int = Query(5, description="Number of concurrent worker threads (default: 5, recommended: 5-10 for Pro tier)"),
-    rate_limit_per_minute: int = Query(200, description="API rate limit per minute (default: 200 for Pro tier, use 5 for free tier)")
+    rate_limit_per_minute: int = Query(200, description="API rate limit per minute (default: 200 for Pro tier, use 5 for free tier)"),
+    async_prefetch: bool = Query(False, description="Download all price histories up front with the async client (hundreds of requests in flight)"),
+    prefetch_concurrency: int = Query(100, description="Maximum requests in flight during the async prefetch"),
+    ingestion_mode: str = Query("per_ticker", description="'per_ticker' (one request per ticker), 'grouped' (one grouped daily request per date for the whole market) or 'precomputed' (read the indicator history table)")
 ):
     """
     Get historical stock rankings as they would have appeared at the reference_date.
@@ -795,13 +833,16 @@ def get_historical_rankings_endpoint(
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
         
         # Validate that reference_date is not in the future
-        now = datetime.now()
+        now = clock.now()
         if ref_date_obj > now:
             logger.error(f"❌ Reference date is in the future: {reference_date} (today is {now.strftime('%Y-%m-%d')})")
             raise HTTPException(status_code=400, detail=f"Reference date cannot be in the future. Today is {now.strftime('%Y-%m-%d')}")
         
         logger.info(f"✅ Date validation passed: {reference_date}")
         
+        if ingestion_mode not in INGESTION_MODES:
+            raise HTTPException(status_code=400, detail=f"ingestion_mode must be one of {', '.join(INGESTION_MODES)}")
+        
         filters = {}
         if min_price is not None:
             filters['min_price'] = min_price
@@ -839,6 +880,9 @@ def get_historical_rankings_endpoint(
         # Parallel processing parameters (for Pro tier)
         opt_params['max_workers'] = max_workers
         opt_params['rate_limit_per_minute'] = rate_limit_per_minute
+        opt_params['async_prefetch'] = async_prefetch
+        opt_params['prefetch_concurrency'] = prefetch_concurrency
+        opt_params['ingestion_mode'] = ingestion_mode
         
         # Check if session already exists
         filters_dict = {**filters}
@@ -996,7 +1040,10 @@ def get_historical_rankings_range_endpoint(
     max_universe_size: int = Query(None, description="Maximum number of stocks to process"),
     enable_rate_limiting: bool = Query(True, description="Enable rate limiting between API calls"),
     max_workers: int = Query(5, description="Number of concurrent worker threads"),
-    rate_limit_per_minute: int = Query(200, description="API rate limit per minute")
+    rate_limit_per_minute: int = Query(200, description="API rate limit per minute"),
+    async_prefetch: bool = Query(False, description="Download all price histories up front with the async client"),
+    prefetch_concurrency: int = Query(100, description="Maximum requests in flight during the async prefetch"),
+    ingestion_mode: str = Query("per_ticker", description="'per_ticker', 'grouped' (one grouped daily request per date for the whole market) or 'precomputed' (read the indicator history table)")
 ):
     """
     Get historical stock rankings for a date range.
@@ -1020,13 +1067,16 @@ def get_historical_rankings_range_endpoint(
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
         
         # Validate date range
-        now = datetime.now()
+        now = clock.now()
         if start_date_obj > now or end_date_obj > now:
             raise HTTPException(status_code=400, detail="Dates cannot be in the future")
         
         if start_date_obj > end_date_obj:
             raise HTTPException(status_code=400, detail="start_date must be before or equal to end_date")
         
+        if ingestion_mode not in INGESTION_MODES:
+            raise HTTPException(status_code=400, detail=f"ingestion_mode must be one of {', '.join(INGESTION_MODES)}")
+        
         # Generate list of dates based on interval
         dates = []
         current_date = start_date_obj
@@ -1076,7 +1126,10 @@ def get_historical_rankings_range_endpoint(
             'max_universe_size': max_universe_size,
             'enable_rate_limiting': enable_rate_limiting,
             'max_workers': max_workers,
-            'rate_limit_per_minute': rate_limit_per_minute
+            'rate_limit_per_minute': rate_limit_per_minute,
+            'async_prefetch': async_prefetch,
+            'prefetch_concurrency': prefetch_concurrency,
+            'ingestion_mode': ingestion_mode
         }
         
         # Run backtests for each date
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the screener indicator kernel.
+
+Times the per-ticker metric computation of the previous pandas routine
+(DataFrame build, iterrows ADR, separate rolling passes) against
+utils.indicators.compute_screener_metrics on synthetic bars, then the batch
+engine (utils.indicator_panel) over the whole universe at once, and checks
+that all of them produce the same screener fields. The recursive kernels
+(EMA, Wilder smoothing, rolling min/max, true range) are then timed on a
+long series under each available backend (numpy, and numba when installed);
+their equivalence with pandas / ta is covered by tests/test_indicator_kernels.py.
+
+Usage:
+    python3 scripts/benchmark_indicators.py [--tickers 500] [--days 180] [--series-length 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Allow running as `python3 scripts/benchmark_indicators.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import jit_kernels
+from utils.bars import Bars
+from utils.indicators import (
+    compute_screener_metrics,
+    ewm_mean,
+    ewm_recursive,
+    rolling_extreme,
+    true_range,
+    wilder_atr_last
+)
+from utils.indicator_panel import PricePanel, compute_panel_metrics
+from services.stock_screener_service import (
+    calculate_performance_percentage,
+    calculate_adr_percentage,
+    calculate_rsi,
+    calculate_macd,
+    calculate_stochastic_oscillator,
+    calculate_atr
+)
+
+DAY_MS = 86_400_000
+
+
+def generate_bars(rng: np.random.Generator, days: int) -> Bars:
+    """Random-walk daily bars starting 2024-01-02"""
+    close = 20 + np.cumsum(rng.normal(0, 0.5, days)).clip(-19)
+    spread = np.abs(rng.normal(0, 0.4, (2, days)))
+    return Bars(
+        t=1704171600000 + np.arange(days) * DAY_MS,
+        o=close + rng.normal(0, 0.2, days),
+        h=close + spread[0],
+        l=close - spread[1],
+        c=close,
+        v=rng.integers(10_000, 5_000_000, days).astype(np.float64)
+    )
+
+
+def pandas_metrics(bars: Bars) -> dict:
+    """The per-ticker metric routine the screeners used before the shared kernel"""
+    df = bars.to_frame()
+    current_price = df['Close'].iloc[-1]
+
+    performance = {}
+    for name, lookback in (("performance_1m", 30), ("performance_3m", 90), ("performance_6m", 180)):
+        if len(df) >= lookback:
+            performance[name] = calculate_performance_percentage(current_price, df['Close'].iloc[-lookback])
+        else:
+            performance[name] = 0
+
+    recent_df = df.tail(30)
+    adr_percentages = []
+    for _, row in recent_df.iterrows():
+        adr_percentages.append(calculate_adr_percentage(row['High'], row['Low'], row['Close']))
+    avg_adr_percentage = sum(adr_percentages) / len(adr_percentages) if adr_percentages else 0
+
+    rsi = calculate_rsi(df['Close'], window=14)
+    current_rsi = rsi.iloc[-1] if not rsi.empty else 50
+    macd_line, macd_signal_line = calculate_macd(df['Close'])
+    stochastic_osc = calculate_stochastic_oscillator(df)
+    atr = calculate_atr(df)
+
+    return {
+        "current_price": round(current_price, 2),
+        **{name: round(value, 2) for name, value in performance.items()},
+        "adr_percentage": round(avg_adr_percentage, 2),
+        "rsi": round(current_rsi, 2),
+        "macd": round(macd_line.iloc[-1], 2),
+        "macd_signal": round(macd_signal_line.iloc[-1], 2),
+        "stochastic_oscillator": round(stochastic_osc.iloc[-1], 2),
+        "atr": round(atr.iloc[-1], 2),
+        "volume_avg_30d": int(recent_df['Volume'].mean())
+    }
+
+
+def count_mismatches(before: dict, after: dict, label: str) -> int:
+    # Differences of one cent can appear when the unrounded values straddle a rounding boundary
+    mismatches = 0
+    for key, value in before.items():
+        if isinstance(value, (dict, str)):
+            matched = value == after[key]
+        else:
+            matched = np.isclose(value, after[key], atol=0.011, equal_nan=True)
+        if not matched:
+            mismatches += 1
+            print(f"❌ {key}: {label} {value} != {after[key]}")
+    return mismatches
+
+
+def time_per_ticker(fn, samples) -> float:
+    start = time.perf_counter()
+    for bars in samples:
+        fn(bars)
+    return (time.perf_counter() - start) / len(samples)
+
+
+def recursive_kernels(bars: Bars) -> dict:
+    """The recursive kernels over one series"""
+    return {
+        "ewm_mean": ewm_mean(bars.c, 12),
+        "ewm_recursive": ewm_recursive(bars.c, 1.0 / 14, 14),
+        "rolling_max": rolling_extreme(bars.h, 14, maximum=True),
+        "rolling_min": rolling_extreme(bars.l, 14, maximum=False),
+        "true_range": true_range(bars.h, bars.l, bars.c),
+        "wilder_atr": wilder_atr_last(bars.h, bars.l, bars.c)
+    }
+
+
+def time_backends(samples, series_length: int, rng: np.random.Generator):
+    """Time the recursive kernels on a long series under every available backend"""
+    backends = ["numpy"] + (["numba"] if jit_kernels.HAS_NUMBA else [])
+    configured = jit_kernels.backend_name()
+    long_series = generate_bars(rng, series_length)
+    try:
+        for backend in backends:
+            jit_kernels.set_backend(backend)
+            recursive_kernels(samples[0])  # Compile outside the timed section
+            start = time.perf_counter()
+            recursive_kernels(long_series)
+            print(f"   {backend:<6} kernels : {(time.perf_counter() - start) * 1000:8.1f} ms for {series_length} bars")
+    finally:
+        jit_kernels.set_backend(configured)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark screener indicator computation")
+    parser.add_argument("--tickers", type=int, default=500, help="Number of synthetic tickers")
+    parser.add_argument("--days", type=int, default=180, help="Bars per ticker")
+    parser.add_argument("--series-length", type=int, default=100_000,
+                        help="Bars in the long series used to time the recursive kernels")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    samples = [generate_bars(rng, args.days) for _ in range(args.tickers)]
+
+    # Equivalence: every field the old routine produced must match the kernel, and
+    # every kernel field must match the batch engine
+    panel = {f"T{i}": bars for i, bars in enumerate(samples)}
+    table_rows = {row["ticker"]: row for row in compute_panel_metrics(PricePanel.from_bars(panel)).rows()}
+    mismatches = 0
+    for ticker, bars in panel.items():
+        kernel = compute_screener_metrics(bars)
+        mismatches += count_mismatches(pandas_metrics(bars), kernel, "pandas vs kernel")
+        mismatches += count_mismatches(kernel, table_rows[ticker], "kernel vs panel")
+
+    before_s = time_per_ticker(pandas_metrics, samples)
+    after_s = time_per_ticker(compute_screener_metrics, samples)
+    panel_start = time.perf_counter()
+    compute_panel_metrics(PricePanel.from_bars(panel))
+    panel_s = (time.perf_counter() - panel_start) / len(samples)
+
+    print(f"📊 {args.tickers} tickers x {args.days} bars ({jit_kernels.backend_name()} backend)")
+    print(f"   pandas routine : {before_s * 1e6:8.1f} µs/ticker")
+    print(f"   numpy kernel   : {after_s * 1e6:8.1f} µs/ticker ({before_s / after_s:.1f}x faster)")
+    print(f"   panel engine   : {panel_s * 1e6:8.1f} µs/ticker ({before_s / panel_s:.1f}x faster, "
+          f"{panel_s * args.tickers * 1000:.1f} ms for the universe)")
+    time_backends(samples, args.series_length, rng)
+    print(f"{'✅' if mismatches == 0 else '❌'} {mismatches} mismatched fields")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
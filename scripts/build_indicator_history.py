@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Build the point-in-time indicator history used by historical rankings with
+ingestion_mode='precomputed'.
+
+Loads daily bars for the universe through the grouped daily endpoint (one
+request per date, skipped for dates already in the bar store), computes
+every screener metric as of each trading date and stores the rows keyed by
+(date, ticker).
+
+Usage:
+    python3 scripts/build_indicator_history.py --start 2024-01-01 [--end 2024-12-31]
+    python3 scripts/build_indicator_history.py --start 2024-01-01 --tickers AAPL,MSFT
+"""
+
+import argparse
+import os
+import sys
+
+# Allow running as `python3 scripts/build_indicator_history.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.bar_store import bar_store
+from utils.indicator_history import indicator_history_store, DEFAULT_LOOKBACK_DAYS
+from services.ticker_universe_service import ticker_universe
+from services.historical_screener_service import build_indicator_history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the daily screener indicator history")
+    parser.add_argument("--start", required=True, help="First as-of date (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="Last as-of date (default: last closed session)")
+    parser.add_argument("--lookback-days", type=int, default=DEFAULT_LOOKBACK_DAYS,
+                        help="Trading days in each as-of window")
+    parser.add_argument("--tickers", default=None, help="Comma-separated tickers (default: ticker universe)")
+    args = parser.parse_args()
+
+    end_date = args.end or bar_store.last_closed_date()
+    if args.tickers:
+        tickers = [ticker.strip().upper() for ticker in args.tickers.split(",") if ticker.strip()]
+    else:
+        tickers = ticker_universe.get_ticker_symbols()
+    if not tickers:
+        print("❌ No tickers to build (run scripts/fetch_ticker_universe.py first)")
+        return 1
+
+    print(f"🧮 Building indicator history for {len(tickers)} tickers, {args.start} to {end_date}")
+    rows = build_indicator_history(tickers, args.start, end_date, lookback_days=args.lookback_days)
+    first, last = indicator_history_store.get_date_range()
+    print(f"✅ Wrote {rows} rows - table now covers {first} to {last}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
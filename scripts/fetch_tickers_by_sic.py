@@ -4,14 +4,18 @@ Script to fetch all tickers belonging to specific SIC codes.
 Uses Polygon.io API to get ticker details and filters by SIC code.
 """
 
-import requests
 import csv
 import time
 import os
+import sys
 import json
 from datetime import datetime
 from typing import List, Dict, Optional, Set
 
+# Allow running as `python3 scripts/fetch_tickers_by_sic.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.polygon_session import polygon_session
+
 try:
     from dotenv import load_dotenv
     load_dotenv()  # Load environment variables from .env file
@@ -27,10 +31,9 @@ except ImportError:
     print("   Progress bar will be disabled. Using simple progress updates instead.")
 
 # Configuration - Load from .env file or environment variable
-POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
+POLYGON_API_KEY = polygon_session.api_key
 BASE_URL = "https://api.polygon.io/v3/reference/tickers"
 TICKER_DETAILS_URL = "https://api.polygon.io/v3/reference/tickers/{ticker}"
-RATE_LIMIT_DELAY = 0.2  # seconds between API calls (5 calls per second for Pro tier)
 OUTPUT_DIR = "data/sic_tickers"
 
 # SIC Code Definitions
@@ -75,9 +78,8 @@ def get_ticker_details(ticker: str) -> Optional[Dict]:
     """
     try:
         url = TICKER_DETAILS_URL.format(ticker=ticker)
-        params = {"apiKey": POLYGON_API_KEY}
         
-        response = requests.get(url, params=params, timeout=10)
+        response = polygon_session.get(url, timeout=10)
         
         if response.status_code == 200:
             return response.json().get('results', {})
@@ -145,7 +147,7 @@ def fetch_all_tickers() -> List[Dict]:
     
     while current_url:
         try:
-            response = requests.get(current_url, timeout=30)
+            response = polygon_session.get(current_url, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -172,7 +174,6 @@ def fetch_all_tickers() -> List[Dict]:
                     separator = '&' if '?' in next_url else '?'
                     current_url = f"{next_url}{separator}apiKey={POLYGON_API_KEY}"
                     page += 1
-                    time.sleep(RATE_LIMIT_DELAY)
                 else:
                     break
             elif response.status_code == 429:
@@ -295,7 +296,6 @@ def fetch_tickers_by_sic_codes() -> Dict[str, List[Dict]]:
                 )
             elif processed % 100 == 0:
                 print(f"📊 Progress: {processed}/{total} ({100*processed/total:.1f}%) | No SIC: {no_sic_count}")
-            time.sleep(RATE_LIMIT_DELAY)
             continue
         
         # Extract SIC code
@@ -345,7 +345,6 @@ def fetch_tickers_by_sic_codes() -> Dict[str, List[Dict]]:
                   f"Energy: {len(classified['energy'])}, "
                   f"Healthcare: {len(classified['healthcare'])}")
         
-        time.sleep(RATE_LIMIT_DELAY)
     
     # Close progress bar
     if HAS_TQDM:
@@ -6,10 +6,15 @@ Uses existing ticker universe and attempts to get SIC codes from multiple source
 
 import csv
 import os
+import sys
 import requests
 import time
 from typing import List, Dict, Set, Optional
 
+# Allow running as `python3 scripts/get_tickers_by_sic_simple.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.polygon_session import polygon_session
+
 try:
     from dotenv import load_dotenv
     load_dotenv()  # Load environment variables from .env file
@@ -93,7 +98,7 @@ def get_sic_from_polygon(ticker: str, api_key: str) -> Optional[int]:
         url = f"https://api.polygon.io/v3/reference/tickers/{ticker}"
         params = {"apiKey": api_key}
         
-        response = requests.get(url, params=params, timeout=5)
+        response = polygon_session.get(url, params=params, timeout=5)
         
         if response.status_code == 200:
             data = response.json().get('results', {})
@@ -103,8 +108,7 @@ def get_sic_from_polygon(ticker: str, api_key: str) -> Optional[int]:
                     return int(sic)
                 except (ValueError, TypeError):
                     return None
-        
-        time.sleep(0.2)  # Polygon rate limit
+
     except Exception:
         pass
     
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Keep the screener cache warm outside the API process.
+
+Refreshes the screener cache (ticker universe, SIC sector lists and the top
+movers' indicators) after each market close, throttled to a fraction of the
+Polygon budget, and reports progress to the screener cache store that the
+API reads. Use this instead of MIDAS_CACHE_WARMER=1 when the API runs with
+several workers.
+
+Usage:
+    python3 scripts/warm_caches.py                 # run forever, once per session
+    python3 scripts/warm_caches.py --once          # warm the latest closed session and exit
+    python3 scripts/warm_caches.py --once --session 2024-06-14 --budget-fraction 0.8
+"""
+
+import argparse
+import os
+import sys
+
+# Allow running as `python3 scripts/warm_caches.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.cache_warmer_service import CacheWarmer, WARMER_BUDGET_FRACTION, WARMER_DELAY_MINUTES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the screener cache after each market close")
+    parser.add_argument("--once", action="store_true", help="Warm one session and exit")
+    parser.add_argument("--session", default=None, help="Session to warm with --once (default: latest due session)")
+    parser.add_argument("--budget-fraction", type=float, default=WARMER_BUDGET_FRACTION,
+                        help="Share of the Polygon per-minute budget for per-ticker fetches")
+    parser.add_argument("--delay-minutes", type=int, default=WARMER_DELAY_MINUTES,
+                        help="Minutes after the 16:00 close before a session is warmed")
+    args = parser.parse_args()
+
+    if not 0 < args.budget_fraction <= 1:
+        print("❌ --budget-fraction must be in (0, 1]")
+        return 1
+
+    warmer = CacheWarmer(budget_fraction=args.budget_fraction, delay_minutes=args.delay_minutes)
+    if args.once:
+        status = warmer.run_once(args.session)
+        print(f"✅ Session {status['session']} warm: {status.get('fetched', 0)} fetched, {status.get('failed', 0)} failed")
+        return 0
+
+    try:
+        warmer.run_forever()
+    except KeyboardInterrupt:
+        print("🛑 Stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,11 @@
 # services/backtest_trade_simulator.py
 
-import pandas as pd
+import numpy as np
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional
-from utils.polygon_client import get_forward_price_history
+from typing import Dict, List, Optional, Union
+from utils.bars import Bars
+from utils.polygon_client import get_forward_price_bars
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,7 +19,8 @@ def simulate_trade(
     stop_loss: Optional[float] = None,
     take_profit: Optional[float] = None,
     exit_date: Optional[str] = None,  # YYYY-MM-DD format, optional forced exit
-    max_hold_days: Optional[int] = None
+    max_hold_days: Optional[int] = None,
+    bars: Optional[Union[Bars, List[dict]]] = None
 ) -> Dict:
     """
     Simulate a trade and track performance forward from entry date.
@@ -32,6 +34,7 @@ def simulate_trade(
         take_profit: Optional take profit price
         exit_date: Optional forced exit date (YYYY-MM-DD)
         max_hold_days: Optional maximum holding period in days
+        bars: Optional pre-loaded forward bars (Bars or list of bar dicts); fetched when not given
     
     Returns:
         Dictionary with trade simulation results
@@ -65,7 +68,10 @@ def simulate_trade(
         # Get forward price history (from entry_date forward)
         logger.info(f"📡 Fetching price history from {entry_date} to {end_date}...")
         fetch_start = time.time()
-        bars = get_forward_price_history(ticker, entry_date, end_date)
+        if bars is None:
+            bars = get_forward_price_bars(ticker, entry_date, end_date)
+        else:
+            bars = Bars.coerce(bars)
         fetch_time = time.time() - fetch_start
         logger.info(f"✅ Fetched {len(bars) if bars else 0} price bars in {fetch_time:.2f}s")
         
@@ -97,16 +103,15 @@ def simulate_trade(
                 "events": []
             }
         
-        # Convert to DataFrame
+        # Bars arrive as NumPy columns - no DataFrame needed to scan them
         logger.info(f"📊 Processing {len(bars)} price bars...")
-        df = pd.DataFrame(bars)
-        df = df.rename(columns={"o": "Open", "h": "High", "l": "Low", "c": "Close", "v": "Volume"})
-        df['Date'] = pd.to_datetime(df['t'], unit='ms')
-        df.set_index('Date', inplace=True)
-        df.sort_index(inplace=True)
+        order = np.argsort(bars.t, kind="stable")
+        bars = bars[order]
+        dates = bars.date_strings()
+        highs, lows, closes = bars.h, bars.l, bars.c
         
-        logger.info(f"   Date range: {df.index[0].strftime('%Y-%m-%d')} to {df.index[-1].strftime('%Y-%m-%d')}")
-        logger.info(f"   Price range: ${df['Low'].min():.2f} - ${df['High'].max():.2f}")
+        logger.info(f"   Date range: {dates[0]} to {dates[-1]}")
+        logger.info(f"   Price range: ${lows.min():.2f} - ${highs.max():.2f}")
         
         # Track trade
         total_cost = entry_price * quantity
@@ -115,23 +120,33 @@ def simulate_trade(
         exit_date_result = None
         events = []
         
-        logger.info(f"🔍 Checking {len(df)} days for exit conditions...")
-        # Check each day for exit conditions
-        for date_idx, (date, row) in enumerate(df.iterrows()):
-            if (date_idx + 1) % 10 == 0 or date_idx == 0:
-                logger.debug(f"   Day {date_idx + 1}/{len(df)}: {date.strftime('%Y-%m-%d')} - "
-                           f"High: ${row['High']:.2f}, Low: ${row['Low']:.2f}, Close: ${row['Close']:.2f}")
-            
-            date_str = date.strftime("%Y-%m-%d")
-            high = row['High']
-            low = row['Low']
-            close = row['Close']
+        logger.info(f"🔍 Checking {len(bars)} days for exit conditions...")
+        # Evaluate every exit condition for all days at once, then take the first day that triggers
+        no_exit = np.zeros(len(bars), dtype=bool)
+        # Stop loss triggers if low touches or goes below stop loss
+        stop_hit = lows <= stop_loss if stop_loss else no_exit
+        # Take profit triggers if high touches or goes above take profit
+        take_profit_hit = highs >= take_profit if take_profit else no_exit
+        if max_hold_days:
+            entry_day = np.datetime64(entry_date, "D")
+            days_held = (bars.dates().astype("datetime64[D]") - entry_day).astype(np.int64)
+            max_hold_hit = days_held >= max_hold_days
+        else:
+            max_hold_hit = no_exit
+        forced_exit_hit = np.array(dates) >= exit_date if exit_date else no_exit
+        
+        triggered = np.flatnonzero(stop_hit | take_profit_hit | max_hold_hit | forced_exit_hit)
+        if len(triggered):
+            i = triggered[0]
+            date_str = dates[i]
+            high = float(highs[i])
+            low = float(lows[i])
+            close = float(closes[i])
             
-            # Check stop loss (triggered if low touches or goes below stop loss)
-            if stop_loss and low <= stop_loss:
+            # Same priority as checking the conditions in order on that day
+            if stop_hit[i]:
                 exit_reason = "stop_loss"
                 exit_price = stop_loss  # Use stop loss price
-                exit_date_result = date_str
                 logger.info(f"🛑 STOP LOSS HIT on {date_str} at ${stop_loss:.2f} (low was ${low:.2f})")
                 events.append({
                     "date": date_str,
@@ -140,13 +155,9 @@ def simulate_trade(
                     "low": low,
                     "high": high
                 })
-                break
-            
-            # Check take profit (triggered if high touches or goes above take profit)
-            if take_profit and high >= take_profit:
+            elif take_profit_hit[i]:
                 exit_reason = "take_profit"
                 exit_price = take_profit  # Use take profit price
-                exit_date_result = date_str
                 logger.info(f"🎯 TAKE PROFIT HIT on {date_str} at ${take_profit:.2f} (high was ${high:.2f})")
                 events.append({
                     "date": date_str,
@@ -155,46 +166,32 @@ def simulate_trade(
                     "low": low,
                     "high": high
                 })
-                break
-            
-            # Check max hold days
-            if max_hold_days:
-                entry_date_obj = datetime.strptime(entry_date, "%Y-%m-%d")
-                current_date_obj = date.to_pydatetime()
-                days_held = (current_date_obj - entry_date_obj).days
-                
-                if days_held >= max_hold_days:
-                    exit_reason = "max_hold_days"
-                    exit_price = close  # Use closing price on max hold day
-                    exit_date_result = date_str
-                    logger.info(f"⏰ MAX HOLD DAYS reached on {date_str} ({days_held} days, price: ${close:.2f})")
-                    events.append({
-                        "date": date_str,
-                        "event": "max_hold_reached",
-                        "price": close,
-                        "days_held": days_held
-                    })
-                    break
-            
-            # Check forced exit date
-            if exit_date:
-                if date_str >= exit_date:
-                    exit_reason = "forced_exit"
-                    exit_price = close  # Use closing price on exit date
-                    exit_date_result = date_str
-                    logger.info(f"📅 FORCED EXIT on {date_str} (exit date reached, price: ${close:.2f})")
-                    events.append({
-                        "date": date_str,
-                        "event": "forced_exit",
-                        "price": close
-                    })
-                    break
+            elif max_hold_hit[i]:
+                exit_reason = "max_hold_days"
+                exit_price = close  # Use closing price on max hold day
+                logger.info(f"⏰ MAX HOLD DAYS reached on {date_str} ({int(days_held[i])} days, price: ${close:.2f})")
+                events.append({
+                    "date": date_str,
+                    "event": "max_hold_reached",
+                    "price": close,
+                    "days_held": int(days_held[i])
+                })
+            else:
+                exit_reason = "forced_exit"
+                exit_price = close  # Use closing price on exit date
+                logger.info(f"📅 FORCED EXIT on {date_str} (exit date reached, price: ${close:.2f})")
+                events.append({
+                    "date": date_str,
+                    "event": "forced_exit",
+                    "price": close
+                })
+            exit_date_result = date_str
         
         # If no exit condition was met, use final available price
         if exit_reason is None:
             exit_reason = "no_exit_triggered"
-            exit_price = df['Close'].iloc[-1]
-            exit_date_result = df.index[-1].strftime("%Y-%m-%d")
+            exit_price = float(closes[-1])
+            exit_date_result = dates[-1]
             logger.info(f"📊 No exit condition triggered. Using final price on {exit_date_result}: ${exit_price:.2f}")
             events.append({
                 "date": exit_date_result,
@@ -220,20 +217,17 @@ def simulate_trade(
         logger.info(f"   Total Proceeds: ${total_proceeds:.2f}")
         logger.info(f"   Profit/Loss: ${profit_loss:.2f} ({profit_loss_pct:+.2f}%)")
         
-        # Prepare price history (simplified - just close prices)
-        price_history = []
-        for date, row in df.iterrows():
-            date_str = date.strftime("%Y-%m-%d")
-            if date_str <= exit_date_result:
-                price_history.append({
-                    "date": date_str,
-                    "close": float(row['Close']),
-                    "high": float(row['High']),
-                    "low": float(row['Low']),
-                    "volume": int(row['Volume'])
-                })
-            else:
-                break  # Stop once we pass the exit date
+        # Prepare price history (simplified - just close prices), up to the exit date
+        price_history = [
+            {
+                "date": dates[i],
+                "close": float(closes[i]),
+                "high": float(highs[i]),
+                "low": float(lows[i]),
+                "volume": int(bars.v[i])
+            }
+            for i in range(len(dates)) if dates[i] <= exit_date_result
+        ]
         
         total_time = time.time() - start_time
         logger.info(f"✅ Trade simulation completed in {total_time:.2f}s")
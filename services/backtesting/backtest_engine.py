@@ -2,11 +2,13 @@
 
 import pandas as pd
 
+from utils.bars import raw_frame
+
 class BacktestEngine:
     def run(self, strategy, data, ticker):
         print(f"[BacktestEngine] Backtesting {strategy.__class__.__name__} on {ticker} with {len(data)} bars")
 
-        df = pd.DataFrame(data)
+        df = raw_frame(data)
         required_cols = {'o', 'h', 'l', 'c', 'v'}
         print(f' DF HEAD: {df.head}')
         if not required_cols.issubset(df.columns.str.lower()):
@@ -0,0 +1,226 @@
+# services/cache_warmer_service.py
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from utils.rate_limiter import TokenBucket, polygon_rate_limiter
+from utils.screener_cache import screener_cache_store
+from utils.trading_calendar import latest_closed_session, next_session, session_close
+from utils.bar_store import shift_date
+from services.ticker_universe_service import ticker_universe
+from services.top_mover_service import fetch_top_movers
+from services.stock_screener_service import (
+    CHECKPOINT_INTERVAL,
+    SECTOR_TICKERS,
+    SIC_SECTOR_MAPPING,
+    WARMER_HEARTBEAT_TIMEOUT_SECONDS,
+    WARMER_STATUS_KEY,
+    fetch_performance_data,
+    get_screener_table,
+    get_stale_tickers,
+    get_warmer_status,
+    load_tickers_from_sic_csv,
+    refresh_screener_cache,
+    save_cache
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Cache warmer configuration
+WARMER_ENABLED = os.getenv("MIDAS_CACHE_WARMER", "0").lower() in ("1", "true", "yes")  # Run inside the FastAPI process
+WARMER_BUDGET_FRACTION = float(os.getenv("MIDAS_WARMER_BUDGET_FRACTION", "0.5"))  # Share of the Polygon budget per-ticker fetches may use
+# Minutes after the 16:00 close before warming - daily bars keep changing through after-hours trading (until 20:00)
+WARMER_DELAY_MINUTES = int(os.getenv("MIDAS_WARMER_DELAY_MINUTES", "255"))
+WARMER_POLL_SECONDS = 60  # Heartbeat interval while waiting for the next close
+WARMER_RETRY_MINUTES = 15  # Wait after a failed run before trying the same session again
+
+
+def _sector_tickers() -> List[str]:
+    """Tickers of every predefined and SIC-based sector, so sector screens hit warm rows"""
+    tickers = [ticker for sector_tickers in SECTOR_TICKERS.values() for ticker in sector_tickers]
+    for config in SIC_SECTOR_MAPPING.values():
+        tickers.extend(load_tickers_from_sic_csv(config["csv_file"]))
+    return list(dict.fromkeys(tickers))
+
+
+def _mover_tickers() -> List[str]:
+    tickers = []
+    for mover_type in ("gainers", "losers"):
+        try:
+            tickers.extend(mover["ticker"] for mover in fetch_top_movers(mover_type) if mover.get("ticker"))
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to fetch top {mover_type}: {e}")
+    return list(dict.fromkeys(tickers))
+
+
+def warm_caches(session_date: Optional[str] = None, budget_fraction: float = WARMER_BUDGET_FRACTION,
+                status: Optional[Dict] = None, stop_event: Optional[threading.Event] = None) -> Dict:
+    """
+    Bring the screener cache up to date for a closed session.
+
+    1. The ticker universe is refreshed incrementally from grouped daily bars
+       (refresh_screener_cache - one request per new session for the whole
+       market, so it only goes through the shared limiter).
+    2. Sector tickers (predefined and SIC lists) and today's top gainers and
+       losers that are missing or stale under the refresh policy are fetched
+       per ticker, with at most budget_fraction of the Polygon plan budget,
+       leaving the rest for interactive requests.
+
+    Progress is written to the screener cache store after every step and
+    every CHECKPOINT_INTERVAL tickers (see get_warmer_status).
+
+    Args:
+        session_date: Session to warm (default: the latest closed session)
+        budget_fraction: Share of the plan's per-minute budget for per-ticker fetches
+        status: Status dict to update in place (the warmer thread passes its own)
+        stop_event: Stops the per-ticker step early when set (the session is then not marked warm)
+
+    Returns:
+        The final status dict
+    """
+    session_date = session_date or latest_closed_session()
+    status = status if status is not None else dict(get_warmer_status() or {})
+    status.update({
+        "state": "running",
+        "session": session_date,
+        "started_at": datetime.now().isoformat(),
+        "finished_at": None,
+        "error": None,
+        "done": 0,
+        "total": 0
+    })
+    start_time = time.time()
+
+    def report(step: str, **fields):
+        status.update(step=step, heartbeat=time.time(), **fields)
+        screener_cache_store.set_meta(WARMER_STATUS_KEY, json.dumps(status))
+
+    logger.info(f"🔥 Warming caches for session {session_date} ({budget_fraction:.0%} of the API budget)")
+    report("universe")
+    universe = ticker_universe.get_ticker_symbols()
+    if universe:
+        refresh_screener_cache(universe, end_date=session_date)
+
+    report("sectors")
+    extra_tickers = _sector_tickers()
+    report("top_movers")
+    extra_tickers = list(dict.fromkeys(extra_tickers + _mover_tickers()))
+
+    # Universe tickers missing after the refresh have too little history - only sector and mover tickers are fetched when missing
+    table = get_screener_table()
+    stale = get_stale_tickers()
+    universe_set = set(universe)
+    to_fetch = [ticker for ticker in dict.fromkeys(universe + extra_tickers)
+                if ticker in stale or (ticker not in table and ticker not in universe_set)]
+    report("tickers", total=len(to_fetch))
+
+    limiter = TokenBucket(polygon_rate_limiter.rate_per_minute * budget_fraction)
+    new_data = {}
+    fetched = failed = 0
+    for i, (ticker, stock_data) in enumerate(fetch_performance_data(to_fetch, limiter=limiter)):
+        if stop_event is not None and stop_event.is_set():
+            save_cache(new_data)
+            status.update(state="stopped", finished_at=datetime.now().isoformat())
+            report("tickers", done=i)
+            logger.info(f"🛑 Cache warming for {session_date} stopped after {i}/{len(to_fetch)} tickers")
+            return status
+        if stock_data:
+            new_data[ticker] = stock_data
+            fetched += 1
+        else:
+            failed += 1
+        if (i + 1) % CHECKPOINT_INTERVAL == 0:
+            save_cache(new_data)
+            new_data = {}
+            report("tickers", done=i + 1)
+    save_cache(new_data)
+
+    status.update(state="idle", last_session=session_date, finished_at=datetime.now().isoformat(),
+                  fetched=fetched, failed=failed)
+    report("done", done=len(to_fetch))
+    logger.info(f"✅ Warmed session {session_date}: {len(universe)} universe tickers refreshed, "
+                f"{fetched} fetched, {failed} failed in {(time.time() - start_time) / 60:.1f}min")
+    return status
+
+
+class CacheWarmer:
+    """
+    Background thread that runs warm_caches once per session, WARMER_DELAY_MINUTES
+    after the close, and sleeps until the next close in between. It
+    heartbeats into the screener cache store, so interactive screens (in any
+    process sharing the store) know the stale rows are being taken care of.
+    """
+
+    def __init__(self, budget_fraction: float = WARMER_BUDGET_FRACTION, delay_minutes: int = WARMER_DELAY_MINUTES):
+        self.budget_fraction = budget_fraction
+        self.delay = timedelta(minutes=delay_minutes)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def due_session(self, now: Optional[datetime] = None) -> str:
+        """Latest session whose close was at least `delay` ago - the one that should be warm"""
+        return latest_closed_session((now or datetime.now(timezone.utc)) - self.delay)
+
+    def next_run_at(self, session_date: str) -> datetime:
+        """When the session after session_date becomes due"""
+        return session_close(next_session(shift_date(session_date, 1))) + self.delay
+
+    def _heartbeat(self, status: Dict):
+        status.update(owner=self.owner, heartbeat=time.time())
+        screener_cache_store.set_meta(WARMER_STATUS_KEY, json.dumps(status))
+
+    def _other_warmer_running(self, status: Dict) -> bool:
+        return (status.get("state") == "running" and status.get("owner") != self.owner
+                and time.time() - status.get("heartbeat", 0) < WARMER_HEARTBEAT_TIMEOUT_SECONDS)
+
+    def run_once(self, session_date: Optional[str] = None) -> Dict:
+        status = dict(get_warmer_status() or {})
+        status["owner"] = self.owner
+        return warm_caches(session_date or self.due_session(), self.budget_fraction, status, self._stop_event)
+
+    def run_forever(self):
+        logger.info(f"🔥 Cache warmer started ({self.owner}, {self.budget_fraction:.0%} of the API budget, "
+                    f"{self.delay.total_seconds() / 60:.0f}min after the close)")
+        while not self._stop_event.is_set():
+            session_date = self.due_session()
+            status = dict(get_warmer_status() or {})
+            wait_seconds = WARMER_POLL_SECONDS
+            if (status.get("last_session") or "") >= session_date:
+                wait_seconds = min(wait_seconds, (self.next_run_at(session_date) - datetime.now(timezone.utc)).total_seconds())
+                self._heartbeat(status)
+            elif not self._other_warmer_running(status):
+                try:
+                    self.run_once(session_date)
+                    continue
+                except Exception as e:
+                    logger.error(f"❌ Cache warming for {session_date} failed: {e}")
+                    status = dict(get_warmer_status() or {})
+                    status.update(state="failed", error=str(e), finished_at=datetime.now().isoformat())
+                    self._heartbeat(status)
+                    wait_seconds = WARMER_RETRY_MINUTES * 60
+            self._stop_event.wait(max(1.0, wait_seconds))
+        logger.info("🛑 Cache warmer stopped")
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+# Global instance
+cache_warmer = CacheWarmer()
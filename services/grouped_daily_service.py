@@ -0,0 +1,103 @@
+# services/grouped_daily_service.py
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from utils.bar_store import bar_store
+from utils.bars import Bars
+from utils.corporate_actions import sync_corporate_actions
+from utils.polygon_client import get_grouped_daily
+from utils.trading_calendar import sessions_between
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Grouped daily ingestion configuration
+DEFAULT_INGEST_WORKERS = 5
+
+
+def _calendar_days(start_date: str, end_date: str) -> List[str]:
+    days = []
+    current = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    while current <= end:
+        days.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+    return days
+
+
+def ingest_grouped_days(start_date: str, end_date: str, max_workers: int = DEFAULT_INGEST_WORKERS) -> int:
+    """
+    Pull Polygon's grouped daily aggregates (every U.S. ticker for one date
+    per request) for each date in [start_date, end_date] that is not already
+    in the bar store. A six-month window costs ~125 requests (one per session) regardless of
+    how many tickers are ranked afterwards.
+
+    Args:
+        start_date: First date in YYYY-MM-DD format
+        end_date: Last date in YYYY-MM-DD format
+        max_workers: Number of dates fetched concurrently
+
+    Returns:
+        Number of grouped daily requests made
+
+    Raises:
+        RuntimeError: If any date could not be fetched. The dates that were
+        fetched are stored; the failed ones stay uningested and are retried
+        by the next call.
+    """
+    ingested = bar_store.get_grouped_days(start_date, end_date)
+    pending = [d for d in _calendar_days(start_date, end_date) if d not in ingested]
+
+    # Weekends and exchange holidays never have stock bars - record them without spending a request
+    sessions = set(sessions_between(start_date, end_date))
+    closed_days = [d for d in pending if d not in sessions]
+    for day in closed_days:
+        bar_store.put_grouped_day(day, [])
+    to_fetch = [d for d in pending if d in sessions]
+
+    if not to_fetch:
+        logger.info(f"📦 Grouped daily bars for {start_date} to {end_date} already ingested")
+        return 0
+
+    logger.info(f"📡 Ingesting grouped daily bars for {len(to_fetch)} dates ({start_date} to {end_date})")
+    start_time = time.time()
+    requests_made = 0
+    failed_days = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_day = {executor.submit(get_grouped_daily, day): day for day in to_fetch}
+        for future in as_completed(future_to_day):
+            day = future_to_day[future]
+            requests_made += 1
+            try:
+                bar_store.put_grouped_day(day, future.result())
+            except Exception as e:
+                failed_days.append(day)
+                logger.warning(f"⚠️  Failed to ingest grouped daily bars for {day}: {e}")
+
+    if failed_days:
+        raise RuntimeError(f"Grouped daily bars missing for {len(failed_days)} sessions: {', '.join(sorted(failed_days))}")
+    logger.info(f"✅ Ingested {requests_made} grouped daily dates in {time.time() - start_time:.1f}s")
+    return requests_made
+
+
+def load_price_panel(tickers: List[str], start_date: str, end_date: str) -> Dict[str, Bars]:
+    """
+    Build the (ticker x date) panel for [start_date, end_date], ingesting any
+    missing grouped daily dates and the window's split factors first.
+
+    Returns:
+        Dictionary mapping ticker to its Bars (oldest first); tickers with no
+        bars in the window are omitted
+
+    Raises:
+        RuntimeError: If a session in the window could not be ingested - a
+        panel missing a session would give wrong indicators
+    """
+    ingest_grouped_days(start_date, end_date)
+    sync_corporate_actions(start_date, end_date)
+    return bar_store.get_panel(tickers, start_date, end_date)
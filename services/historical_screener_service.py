@@ -1,29 +1,31 @@
 # services/historical_screener_service.py
 
-import pandas as pd
 import logging
 import time
 import random
 import threading
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
-from utils.polygon_client import get_price_history_at_date
+from utils.polygon_client import get_session_bars
+from utils.bars import Bars
+from utils.polygon_session import polygon_session
+from utils.rate_limiter import polygon_rate_limiter
+from utils.async_polygon_client import prefetch_price_histories, DEFAULT_MAX_CONCURRENCY
+from utils.trading_calendar import session_window_start
+from services.grouped_daily_service import load_price_panel
 from services.ticker_universe_service import ticker_universe
 from services.backtest_session_cache import (
     create_session, get_session, find_session_by_date,
     update_session, add_trade_to_session
 )
 
-# Import calculation functions from stock_screener_service
+from utils.indicators import compute_screener_metrics
+from utils.indicator_panel import PricePanel, compute_panel_metrics
+from utils.indicator_history import indicator_history_store, metric_history
+
+# Import sector configuration from stock_screener_service
 from services.stock_screener_service import (
-    calculate_performance_percentage,
-    calculate_adr_percentage,
-    calculate_rsi,
-    calculate_macd,
-    calculate_stochastic_oscillator,
-    calculate_atr,
     SECTOR_TICKERS,
     SIC_SECTOR_MAPPING,
     PREDEFINED_TO_SIC_MAPPING,
@@ -38,8 +40,11 @@ logger = logging.getLogger(__name__)
 DEFAULT_RATE_LIMIT_CALLS_PER_MINUTE = 5  # Conservative default
 PRO_TIER_RATE_LIMIT = 200  # Pro tier allows much higher rates
 
+INGESTION_MODES = ("per_ticker", "grouped", "precomputed")
+
 
-def get_historical_stock_data(ticker: str, reference_date: str, lookback_days: int = 180) -> Optional[Dict]:
+def get_historical_stock_data(ticker: str, reference_date: str, lookback_days: int = 180,
+                              bars: Optional[Union[Bars, List[dict]]] = None) -> Optional[Dict]:
     """
     Get stock performance data calculated using only data up to the reference date.
     This simulates what the data would have looked like at that point in time.
@@ -47,15 +52,18 @@ def get_historical_stock_data(ticker: str, reference_date: str, lookback_days: i
     Args:
         ticker: Stock ticker symbol
         reference_date: Reference date in YYYY-MM-DD format
-        lookback_days: Number of days to look back from reference_date
+        lookback_days: Number of trading days (bars) up to reference_date
+        bars: Optional pre-loaded Bars (or list of bar dicts) ending at reference_date
+              (e.g. from a grouped daily panel); fetched from Polygon when not given
     
     Returns:
         Dictionary with stock data as it would have appeared at reference_date, or None if insufficient data
     """
     try:
         # Get price history up to (and including) reference_date
-        logger.debug(f"   Fetching data for {ticker} (reference: {reference_date}, lookback: {lookback_days} days)")
-        bars = get_price_history_at_date(ticker, reference_date, days_back=lookback_days)
+        if bars is None:
+            logger.debug(f"   Fetching data for {ticker} (reference: {reference_date}, lookback: {lookback_days} sessions)")
+            bars = get_session_bars(ticker, lookback_days, end_date=reference_date)
         
         if not bars or len(bars) < 30:
             logger.debug(f"   ⚠️  Insufficient data for {ticker}: {len(bars) if bars else 0} bars (need 30+)")
@@ -63,106 +71,9 @@ def get_historical_stock_data(ticker: str, reference_date: str, lookback_days: i
         
         logger.debug(f"   ✅ Got {len(bars)} bars for {ticker}")
         
-        # Convert to DataFrame
-        df = pd.DataFrame(bars)
-        df = df.rename(columns={"o": "Open", "h": "High", "l": "Low", "c": "Close", "v": "Volume"})
-        df['Date'] = pd.to_datetime(df['t'], unit='ms')
-        df.set_index('Date', inplace=True)
-        df.sort_index(inplace=True)
-        
-        # Get "current" price (most recent close up to reference_date)
-        current_price = df['Close'].iloc[-1]
-        
-        # Calculate performance periods using only data up to reference_date
-        # 1 month (30 days)
-        if len(df) >= 30:
-            price_1m_ago = df['Close'].iloc[-30]
-            performance_1m = calculate_performance_percentage(current_price, price_1m_ago)
-        else:
-            performance_1m = 0
-            
-        # 3 months (90 days)
-        if len(df) >= 90:
-            price_3m_ago = df['Close'].iloc[-90]
-            performance_3m = calculate_performance_percentage(current_price, price_3m_ago)
-        else:
-            performance_3m = 0
-            
-        # 6 months (180 days)
-        if len(df) >= 180:
-            price_6m_ago = df['Close'].iloc[-180]
-            performance_6m = calculate_performance_percentage(current_price, price_6m_ago)
-        else:
-            performance_6m = 0
-        
-        # Calculate ADR% (Average Daily Range) for last 30 days available
-        recent_df = df.tail(30)
-        adr_percentages = []
-        for _, row in recent_df.iterrows():
-            adr_pct = calculate_adr_percentage(row['High'], row['Low'], row['Close'])
-            adr_percentages.append(adr_pct)
-        
-        avg_adr_percentage = sum(adr_percentages) / len(adr_percentages) if adr_percentages else 0
-        
-        # Calculate RSI (14-day)
-        rsi = calculate_rsi(df['Close'], window=14)
-        current_rsi = rsi.iloc[-1] if not rsi.empty else 50
-        
-        # Determine RSI signal
-        if current_rsi < 30:
-            rsi_signal = "OVERSOLD"
-        elif current_rsi > 70:
-            rsi_signal = "OVERBOUGHT"
-        else:
-            rsi_signal = "NEUTRAL"
-        
-        # Calculate additional technical indicators
-        macd_line, macd_signal_line = calculate_macd(df['Close'])
-        stochastic_osc = calculate_stochastic_oscillator(df)
-        atr = calculate_atr(df)
-        
-        # Get latest values
-        current_macd = macd_line.iloc[-1] if not macd_line.empty else 0
-        current_macd_signal = macd_signal_line.iloc[-1] if not macd_signal_line.empty else 0
-        current_stochastic = stochastic_osc.iloc[-1] if not stochastic_osc.empty else 50
-        current_atr = atr.iloc[-1] if not atr.empty else 0
-        
-        # Calculate indicator scores
-        indicator_scores = {
-            "MACD": 1 if current_macd > current_macd_signal else -1,
-            "RSI": 1 if current_rsi < 30 else -1 if current_rsi > 70 else 0,
-            "SO": 1 if current_stochastic < 20 else -1 if current_stochastic > 80 else 0,
-            "PRC": 1 if performance_1m > 0 else -1
-        }
-        
-        # Calculate overall signal
-        weights = {"MACD": 0.5, "PRC": 0.3, "RSI": 0.2, "SO": 0.4}
-        overall_score = sum(indicator_scores[k] * weights[k] for k in indicator_scores)
-        
-        if overall_score > 0:
-            overall_signal = "BULLISH"
-        elif overall_score < 0:
-            overall_signal = "BEARISH"
-        else:
-            overall_signal = "NEUTRAL"
-        
         return {
             "ticker": ticker,
-            "current_price": round(current_price, 2),
-            "performance_1m": round(performance_1m, 2),
-            "performance_3m": round(performance_3m, 2),
-            "performance_6m": round(performance_6m, 2),
-            "adr_percentage": round(avg_adr_percentage, 2),
-            "rsi": round(current_rsi, 2),
-            "rsi_signal": rsi_signal,
-            "macd": round(current_macd, 2),
-            "macd_signal": round(current_macd_signal, 2),
-            "stochastic_oscillator": round(current_stochastic, 2),
-            "atr": round(current_atr, 2),
-            "indicator_scores": indicator_scores,
-            "overall_signal": overall_signal,
-            "overall_score": round(overall_score, 2),
-            "volume_avg_30d": int(recent_df['Volume'].mean()),
+            **compute_screener_metrics(Bars.coerce(bars)),
             "last_updated": reference_date  # Use reference date, not current date
         }
         
@@ -171,6 +82,69 @@ def get_historical_stock_data(ticker: str, reference_date: str, lookback_days: i
         return None
 
 
+def get_panel_stock_data(price_panel: Dict[str, Bars], reference_date: str) -> Dict[str, Dict]:
+    """
+    Batch version of get_historical_stock_data for a grouped daily panel.
+    
+    Args:
+        price_panel: {ticker: Bars} ending at reference_date (from load_price_panel)
+        reference_date: Reference date in YYYY-MM-DD format
+    
+    Returns:
+        {ticker: stock data} for every ticker with at least 30 bars
+    """
+    table = compute_panel_metrics(PricePanel.from_bars(price_panel))
+    table = table.filter(table.columns["bars"] >= 30)
+    return {row["ticker"]: {**row, "last_updated": reference_date} for row in table.rows()}
+
+
+def build_indicator_history(tickers: List[str], start_date: str, end_date: str,
+                            lookback_days: int = 180) -> int:
+    """
+    Compute the daily time series of every screener metric for each ticker
+    once and store it keyed by (date, ticker), so rankings as of any date in
+    [start_date, end_date] become a slice lookup (ingestion_mode='precomputed').
+    
+    Args:
+        tickers: Tickers to build
+        start_date: First as-of date in YYYY-MM-DD format
+        end_date: Last as-of date in YYYY-MM-DD format
+        lookback_days: Trading days in each as-of window (same as get_historical_stock_data)
+    
+    Returns:
+        Number of (date, ticker) rows written
+    """
+    start_time = time.time()
+    history_start = session_window_start(start_date, lookback_days)
+    price_panel = load_price_panel(tickers, history_start, end_date)
+    logger.info(f"📦 Loaded bars for {len(price_panel)}/{len(tickers)} tickers ({history_start} to {end_date})")
+    
+    rows_written = 0
+    for i, (ticker, bars) in enumerate(price_panel.items(), 1):
+        dates, columns = metric_history(bars, lookback_days, start_date=start_date)
+        indicator_history_store.put_history(ticker, dates, columns)
+        rows_written += len(dates)
+        if i % 500 == 0:
+            logger.info(f"🧮 Indicator history: {i}/{len(price_panel)} tickers, {rows_written} rows")
+    
+    logger.info(f"✅ Stored {rows_written} indicator history rows for {len(price_panel)} tickers in {time.time() - start_time:.1f}s")
+    return rows_written
+
+
+def get_precomputed_stock_data(reference_date: str, tickers: List[str]) -> Dict[str, Dict]:
+    """
+    Stock data for every ticker as of reference_date from the precomputed
+    indicator history (see build_indicator_history). Empty when the session
+    of that date (or the one before a non-trading date) hasn't been built.
+    """
+    day, table = indicator_history_store.get_slice(reference_date, tickers)
+    if day is None:
+        return {}
+    if day != reference_date:
+        logger.info(f"📅 Using indicator history of {day} (last session before {reference_date})")
+    return {row["ticker"]: {**row, "last_updated": day} for row in table.rows()}
+
+
 def get_historical_rankings(
     reference_date: str,
     top_n: int = 50,
@@ -196,7 +170,12 @@ def get_historical_rankings(
     enable_rate_limiting: bool = True,
     # Parallel processing parameters
     max_workers: int = 5,  # Number of concurrent threads (default: 5 for Pro tier)
-    rate_limit_per_minute: int = PRO_TIER_RATE_LIMIT  # API rate limit (default: 200 for Pro tier)
+    rate_limit_per_minute: int = PRO_TIER_RATE_LIMIT,  # API rate limit (default: 200 for Pro tier)
+    # Async bulk fetch parameters
+    async_prefetch: bool = False,
+    prefetch_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    # Data ingestion mode
+    ingestion_mode: str = "per_ticker"
 ) -> List[Dict]:
     """
     Get historical stock rankings as they would have appeared at the reference_date.
@@ -217,17 +196,26 @@ def get_historical_rankings(
         max_6m_performance: Optional maximum 6-month performance filter (%)
         sort_by: Field to sort by ('adr', 'rsi', 'performance_1m', etc.)
         sort_order: 'asc' or 'desc'
-        lookback_days: Days to look back for calculations
+        lookback_days: Trading days to look back for calculations
         use_sample: If True, use sampling for faster results (trades accuracy for speed)
         sample_size: Number of stocks to sample if use_sample=True
         max_universe_size: Maximum number of stocks to process (None = no limit)
-        enable_rate_limiting: If True, add delays between API calls to respect rate limits
+        enable_rate_limiting: If True, size the worker pool to fit rate_limit_per_minute (calls are always
+                              throttled by the process-wide Polygon limiter, see utils/rate_limiter.py)
         max_workers: Number of concurrent worker threads (default: 5, set higher for Pro tier)
         rate_limit_per_minute: API rate limit per minute (default: 200 for Pro tier)
+        async_prefetch: If True, download all price histories up front with the async client
+        prefetch_concurrency: Maximum requests in flight during the async prefetch
+        ingestion_mode: 'per_ticker' fetches each ticker's history separately; 'precomputed' reads the
+                        indicator history table (falls back to 'per_ticker' when the date isn't built); 'grouped' builds a
+                        (ticker x date) panel from grouped daily bars (one request per date)
     
     Returns:
         List of stock data dictionaries, ranked and filtered
     """
+    if ingestion_mode not in INGESTION_MODES:
+        raise ValueError(f"Unknown ingestion_mode '{ingestion_mode}' (expected one of {', '.join(INGESTION_MODES)})")
+    
     logger.info(f"📊 Getting historical rankings for {reference_date}")
     logger.info(f"🔍 Filters: 1M: {min_1m_performance}%-{max_1m_performance}%, "
                f"3M: {min_3m_performance}%-{max_3m_performance}%, "
@@ -361,47 +349,18 @@ def get_historical_rankings(
         effective_workers = min(max_workers, max(1, rate_limit_per_minute // 20))  # Conservative: divide by 20
         estimated_time = (total_tickers / effective_workers) * rate_limit_delay / 60
         logger.info(f"🚀 Processing {total_tickers} tickers with {effective_workers} concurrent workers")
-        logger.info(f"⚡ Rate limit: {rate_limit_per_minute} calls/minute (~{rate_limit_delay:.2f}s between calls)")
+        logger.info(f"⚡ Rate limit: {rate_limit_per_minute} calls/minute (~{rate_limit_delay:.2f}s between calls), "
+                    f"shared limiter budget: {polygon_rate_limiter.rate_per_minute:g} calls/minute")
         logger.info(f"⏱️  Estimated time: ~{estimated_time:.1f} minutes (parallel processing)")
     else:
         effective_workers = max_workers
         estimated_time = (total_tickers / effective_workers) * 0.5 / 60
-        logger.info(f"🚀 Processing {total_tickers} tickers with {effective_workers} concurrent workers (no rate limiting)")
+        logger.info(f"🚀 Processing {total_tickers} tickers with {effective_workers} concurrent workers (worker count not capped by rate limit)")
         logger.info(f"⏱️  Estimated time: ~{estimated_time:.1f} minutes (parallel processing)")
         rate_limit_delay = 0
     
-    # Thread-safe rate limiter
-    class RateLimiter:
-        def __init__(self, calls_per_minute: int):
-            self.calls_per_minute = calls_per_minute
-            self.min_interval = 60.0 / calls_per_minute if calls_per_minute > 0 else 0
-            self.last_call_times = []
-            self.lock = Lock()
-        
-        def wait_if_needed(self):
-            """Wait if necessary to respect rate limit"""
-            if not enable_rate_limiting or self.min_interval == 0:
-                return
-            
-            with self.lock:
-                now = time.time()
-                # Remove old call times (older than 1 minute)
-                self.last_call_times = [t for t in self.last_call_times if now - t < 60.0]
-                
-                # If we've hit the rate limit, wait
-                if len(self.last_call_times) >= self.calls_per_minute:
-                    oldest_call = min(self.last_call_times)
-                    wait_time = 60.0 - (now - oldest_call) + 0.1  # Small buffer
-                    if wait_time > 0:
-                        time.sleep(wait_time)
-                        # Clean up again after waiting
-                        now = time.time()
-                        self.last_call_times = [t for t in self.last_call_times if now - t < 60.0]
-                
-                # Record this call
-                self.last_call_times.append(time.time())
-    
-    rate_limiter = RateLimiter(rate_limit_per_minute) if enable_rate_limiting else None
+    # Give every worker its own keep-alive connection in the shared Polygon pool
+    polygon_session.ensure_pool_size(effective_workers)
     
     # Worker progress tracking
     worker_progress = {}  # {worker_id: {'completed': count, 'start_time': time}}
@@ -421,11 +380,12 @@ def get_historical_rankings(
                 }
         
         try:
-            # Rate limiting (thread-safe)
-            if rate_limiter:
-                rate_limiter.wait_if_needed()
-            
-            stock_data = get_historical_stock_data(ticker, reference_date, lookback_days)
+            if panel_metrics is not None:
+                # Metrics already computed for the whole grouped daily panel - no API call needed
+                stock_data = panel_metrics.get(ticker)
+            else:
+                # API calls are throttled by the shared Polygon rate limiter
+                stock_data = get_historical_stock_data(ticker, reference_date, lookback_days)
             
             if not stock_data:
                 filter_reason = "no data"
@@ -467,6 +427,38 @@ def get_historical_rankings(
                 if worker_id in worker_progress:
                     worker_progress[worker_id]['completed'] += 1
     
+    panel_metrics = None
+    # Precomputed mode: one slice read of the indicator history table
+    if ingestion_mode == "precomputed":
+        lookup_start = time.time()
+        panel_metrics = get_precomputed_stock_data(reference_date, ticker_list) or None
+        if panel_metrics is None:
+            logger.warning(f"⚠️  No indicator history stored for {reference_date} - computing per ticker "
+                           f"(run scripts/build_indicator_history.py to precompute)")
+        else:
+            logger.info(f"📚 Loaded precomputed indicators for {len(panel_metrics)} tickers in {time.time() - lookup_start:.2f}s")
+    
+    # Grouped mode: one request per date for the whole market, then rank from the local panel
+    elif ingestion_mode == "grouped":
+        panel_start_date = session_window_start(reference_date, lookback_days)
+        panel_start = time.time()
+        price_panel = load_price_panel(ticker_list, panel_start_date, reference_date)
+        logger.info(f"📦 Built price panel for {len(price_panel)}/{total_tickers} tickers in {time.time() - panel_start:.1f}s")
+        
+        # Indicators for the whole panel in a few matrix passes instead of one pass per ticker
+        metrics_start = time.time()
+        panel_metrics = get_panel_stock_data(price_panel, reference_date)
+        logger.info(f"🧮 Computed indicators for {len(panel_metrics)} tickers in {time.time() - metrics_start:.2f}s")
+    
+    # Warm the bar store for the whole ticker list with the async client so the
+    # worker threads below compute from local bars instead of waiting on HTTP
+    elif async_prefetch:
+        prefetch_start_date = session_window_start(reference_date, lookback_days)
+        logger.info(f"📡 Async prefetch: {total_tickers} tickers, {prefetch_concurrency} requests in flight")
+        prefetch_start = time.time()
+        fetched = prefetch_price_histories(ticker_list, prefetch_start_date, reference_date, max_concurrency=prefetch_concurrency)
+        logger.info(f"✅ Prefetched {fetched}/{total_tickers} price histories in {time.time() - prefetch_start:.1f}s")
+    
     # Process tickers in parallel using ThreadPoolExecutor
     logger.info(f"🔄 Starting parallel processing with {effective_workers} workers...")
     last_log_time = time.time()
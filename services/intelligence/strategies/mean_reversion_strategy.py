@@ -1,6 +1,9 @@
 # services/intelligence/strategies/mean_reversion_strategy.py
 
 import pandas as pd
+from typing import Union
+
+from utils.bars import Bars, raw_frame
 from ..interfaces.strategy_interface import StrategyInterface
 
 
@@ -21,8 +24,8 @@ class MeanReversionStrategy(StrategyInterface):
     #
     #     return self.apply(df, ticker)
 
-    def generate_trade_plan(self, historical_data: list[dict], ticker: str) -> dict:
-        df = pd.DataFrame(historical_data)
+    def generate_trade_plan(self, historical_data: Union[Bars, list[dict]], ticker: str) -> dict:
+        df = raw_frame(historical_data)
         df.columns = df.columns.str.lower()
         print(f'MEAN REV COLUMNS {df.columns}')
         # Log raw timestamp values from Polygon
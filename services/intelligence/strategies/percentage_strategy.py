@@ -1,6 +1,9 @@
 # services/intelligence/strategies/percentage_strategy.py
 
 import pandas as pd
+from typing import Union
+
+from utils.bars import Bars, raw_frame
 from ..interfaces.strategy_interface import StrategyInterface
 
 class PercentageStrategy(StrategyInterface):
@@ -8,8 +11,8 @@ class PercentageStrategy(StrategyInterface):
         self.profit_pct = profit_pct
         self.loss_pct = loss_pct
 
-    def generate_trade_plan(self, historical_data: list[dict], ticker: str) -> dict:
-        df = pd.DataFrame(historical_data)
+    def generate_trade_plan(self, historical_data: Union[Bars, list[dict]], ticker: str) -> dict:
+        df = raw_frame(historical_data)
         df.columns = df.columns.str.lower()
         return self.apply(df, ticker)
 
@@ -1,13 +1,18 @@
 import pandas as pd
+from typing import Union
+
+from utils.bars import Bars
+from utils.indicators import true_range
 
 class VolatilityStrategy:
     def __init__(self, atr_multiplier_profit=3.0, atr_multiplier_loss=2.0):
         self.atr_profit = atr_multiplier_profit
         self.atr_loss = atr_multiplier_loss
 
-    def generate_trade_plan(self, historical_data: list[dict], ticker: str) -> dict:
-        atr = self._calculate_atr(historical_data)
-        entry_price = historical_data[-1]['c']
+    def generate_trade_plan(self, historical_data: Union[Bars, list[dict]], ticker: str) -> dict:
+        bars = Bars.coerce(historical_data)
+        atr = self._calculate_atr(bars)
+        entry_price = float(bars.c[-1])
         stop_loss = round(entry_price - self.atr_loss * atr, 2)
         take_profit = round(entry_price + self.atr_profit * atr, 2)
 
@@ -20,15 +25,12 @@ class VolatilityStrategy:
             "atr": round(atr, 2),
         }
 
-    def _calculate_atr(self, data: list[dict], period=14) -> float:
-        trs = []
-        for i in range(1, min(len(data), period + 1)):
-            high = data[i]['h']
-            low = data[i]['l']
-            prev_close = data[i - 1]['c']
-            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            trs.append(tr)
-        return sum(trs) / len(trs) if trs else 0.0
+    def _calculate_atr(self, data: Union[Bars, list[dict]], period=14) -> float:
+        # True range of the first `period` bars after the first one
+        bars = Bars.coerce(data)[:period + 1]
+        if len(bars) < 2:
+            return 0.0
+        return float(true_range(bars.h, bars.l, bars.c)[1:].mean())
 
     def apply(self, df: pd.DataFrame, ticker: str):
         if len(df) < 2:
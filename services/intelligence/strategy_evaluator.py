@@ -1,6 +1,5 @@
-import pandas as pd
 # from services.market_data.polygon_service import fetch_polygon_ohlcv
-from utils.polygon_client import get_price_history
+from utils.polygon_client import get_price_bars
 
 from services.backtesting.backtest_engine import BacktestEngine
 from services.intelligence.strategies.mean_reversion_strategy import MeanReversionStrategy
@@ -17,7 +16,7 @@ class StrategyEvaluator:
         self.backtest_engine = BacktestEngine()
 
     def run_all_backtests(self, ticker: str, days: int = 60):
-        historical_data = get_price_history(ticker, days=days)
+        historical_data = get_price_bars(ticker, days=days)
 
         if not historical_data or len(historical_data) < 20:
             print(f"[Evaluator] Not enough data for {ticker}")
@@ -1,5 +1,8 @@
 # services/intelligence/strategies/volatility_strategy.py
 
+from utils.bars import Bars
+from utils.indicators import true_range
+
 class VolatilityStrategy:
     def __init__(self, atr_multiplier_profit=3.0, atr_multiplier_loss=2.0):
         self.atr_profit = atr_multiplier_profit
@@ -25,11 +28,8 @@ class VolatilityStrategy:
         }
 
     def _calculate_atr(self, data: list[dict], period=14) -> float:
-        trs = []
-        for i in range(1, min(len(data), period + 1)):
-            high = data[i]['h']
-            low = data[i]['l']
-            prev_close = data[i - 1]['c']
-            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            trs.append(tr)
-        return sum(trs) / len(trs) if trs else 0.0
+        # True range of the first `period` bars after the first one
+        bars = Bars.coerce(data)[:period + 1]
+        if len(bars) < 2:
+            return 0.0
+        return float(true_range(bars.h, bars.l, bars.c)[1:].mean())
@@ -2,9 +2,19 @@
 
 import time
 import csv
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from utils.polygon_client import get_price_history, get_market_snapshot
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from utils.polygon_client import get_session_bars, get_market_snapshot_columns
+from utils.indicators import compute_screener_metrics
+from utils.indicator_state import TickerIndicatorState, indicator_state_store, DEFAULT_HISTORY_DAYS
+from utils.bar_store import bar_store, bar_date, shift_date
+from utils.screener_cache import screener_cache_store, stale_tickers
+from utils.screener_table import ScreenerTable
+from utils.trading_calendar import latest_closed_session, previous_session, session_window_start
+from utils.corporate_actions import sync_corporate_actions
+from utils.polygon_session import polygon_session
+from utils.rate_limiter import TokenBucket, polygon_rate_limiter
 import pandas as pd
 import json
 import os
@@ -13,101 +23,161 @@ import logging
 
 # Import ticker universe service
 from services.ticker_universe_service import ticker_universe
+from services.grouped_daily_service import load_price_panel
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Cache configuration
-CACHE_DURATION_HOURS = 48  # Temporarily increased to 48 hours  
-CACHE_FILE = "cache/stock_screener_cache.json"
-CHECKPOINT_FILE = "cache/screener_checkpoint.json"
+CACHE_DURATION_HOURS = 48  # Row TTL for the "ttl" refresh policy, and checkpoint lifetime
+SCREENER_REFRESH_POLICY = os.getenv("MIDAS_SCREENER_REFRESH_POLICY", "session")  # See utils/screener_cache.py
+LEGACY_CACHE_FILE = "cache/stock_screener_cache.json"  # Whole-file JSON cache used before the SQLite store
 CHECKPOINT_INTERVAL = 50  # Save checkpoint every N tickers
+SCREENER_FETCH_WORKERS = int(os.getenv("MIDAS_SCREENER_FETCH_WORKERS", "10"))  # Concurrent fetch + compute workers
+WARMER_STATUS_KEY = "warmer_status"  # Meta key the cache warmer reports progress under (services/cache_warmer_service.py)
+WARMER_HEARTBEAT_TIMEOUT_SECONDS = 300  # A warmer silent for longer is considered gone
+
+# (store generation, ScreenerTable) - see get_screener_table()
+_screener_table = None
+
+def _import_legacy_cache():
+    """One-time import of the old JSON cache file into the store, keeping its timestamp"""
+    if screener_cache_store.get_meta("legacy_imported") or not os.path.exists(LEGACY_CACHE_FILE):
+        return
+    try:
+        with open(LEGACY_CACHE_FILE, 'r') as f:
+            cache_data = json.load(f)
+        cache_time = datetime.fromisoformat(cache_data.get('timestamp', '1970-01-01')).timestamp()
+        screener_cache_store.put(cache_data.get('stock_data', {}), updated_at=cache_time)
+        logger.info(f"📦 Imported {len(cache_data.get('stock_data', {}))} stocks from {LEGACY_CACHE_FILE}")
+    except Exception as e:
+        logger.warning(f"⚠️ Error importing {LEGACY_CACHE_FILE}: {e}")
+    screener_cache_store.set_meta("legacy_imported", datetime.now().isoformat())
 
 def load_cache() -> Dict:
-    """Load cached stock data"""
+    """Load cached stock data (stale rows included - see get_stale_tickers)"""
     try:
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, 'r') as f:
-                cache_data = json.load(f)
-                
-            # Check if cache is still valid
-            cache_time = datetime.fromisoformat(cache_data.get('timestamp', '1970-01-01'))
-            if datetime.now() - cache_time < timedelta(hours=CACHE_DURATION_HOURS):
-                print(f"📦 Using cached data (age: {datetime.now() - cache_time})")
-                return cache_data.get('stock_data', {})
-            else:
-                print(f"⏰ Cache expired (age: {datetime.now() - cache_time})")
-                return {}
+        _import_legacy_cache()
+        stock_data = screener_cache_store.get_all()
+        print(f"📦 Using cached data ({len(stock_data)} stocks)")
+        return stock_data
     except Exception as e:
         print(f"⚠️ Error loading cache: {e}")
     return {}
 
 def save_cache(stock_data: Dict):
-    """Save stock data to cache"""
+    """Upsert stock data into the cache (only the given tickers are written)"""
     try:
-        # Create cache directory if it doesn't exist
-        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
-        
-        cache_data = {
-            'timestamp': datetime.now().isoformat(),
-            'stock_data': stock_data
-        }
-        
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(cache_data, f, indent=2)
-        
-        print(f"💾 Cached {len(stock_data)} stocks for {CACHE_DURATION_HOURS} hours")
+        screener_cache_store.put(stock_data)
+        print(f"💾 Cached {len(stock_data)} stocks")
     except Exception as e:
         print(f"⚠️ Error saving cache: {e}")
 
 
+def get_screener_table() -> ScreenerTable:
+    """
+    Columnar view (utils/screener_table.py) of the screener cache. The rows
+    are read again only when the store's generation moved, so repeated
+    screens with different filters work off the warm table and checking
+    costs one metadata read.
+    """
+    global _screener_table
+    try:
+        _import_legacy_cache()
+        generation = screener_cache_store.generation()
+    except Exception as e:
+        logger.warning(f"⚠️ Error reading screener cache: {e}")
+        return ScreenerTable.empty()
+    cached = _screener_table
+    if cached is None or cached[0] != generation:
+        cached = (generation, ScreenerTable.from_records(screener_cache_store.get_all()))
+        _screener_table = cached
+    return cached[1]
+
+
+def get_stale_tickers(policy: str = SCREENER_REFRESH_POLICY) -> Set[str]:
+    """
+    Cached tickers due for a refetch under the refresh policy ("session":
+    a newer session has closed since the row was written; "ttl": the row is
+    older than CACHE_DURATION_HOURS). Reads only the per-ticker as_of and
+    write time, never the row data.
+    """
+    try:
+        return stale_tickers(screener_cache_store.get_freshness(), policy, CACHE_DURATION_HOURS)
+    except Exception as e:
+        logger.warning(f"⚠️ Error checking screener cache freshness: {e}")
+        return set()
+
+
+def get_cached_stock_data(tickers: List[str]) -> Dict[str, Dict]:
+    """Fresh cached screener rows for the tickers that have one (stale and missing tickers are left out)"""
+    table = get_screener_table()
+    stale = get_stale_tickers()
+    return {
+        ticker: table.records[table.index[ticker]]
+        for ticker in tickers
+        if ticker in table and ticker not in stale
+    }
+
+
+def get_warmer_status() -> Optional[Dict]:
+    """Latest progress report of the cache warmer, or None if none has run against this cache"""
+    try:
+        status = screener_cache_store.get_meta(WARMER_STATUS_KEY)
+        return json.loads(status) if status else None
+    except Exception as e:
+        logger.warning(f"⚠️ Error reading cache warmer status: {e}")
+        return None
+
+
+def warmer_is_current() -> bool:
+    """
+    Whether a live cache warmer (heartbeat within WARMER_HEARTBEAT_TIMEOUT_SECONDS)
+    has warmed the session before the latest closed one or later. Stale rows
+    are then at most one session old and the warmer is about to refresh them,
+    so interactive screens serve them instead of refetching inline.
+    """
+    status = get_warmer_status()
+    if not status or time.time() - status.get("heartbeat", 0) > WARMER_HEARTBEAT_TIMEOUT_SECONDS:
+        return False
+    latest = latest_closed_session()
+    return (status.get("last_session") or "") >= previous_session(shift_date(latest, -1))
+
+
 def load_checkpoint() -> Optional[Dict]:
     """Load checkpoint data for batch mode resume"""
     try:
-        if os.path.exists(CHECKPOINT_FILE):
-            with open(CHECKPOINT_FILE, 'r') as f:
-                checkpoint_data = json.load(f)
-            
+        checkpoint_data = screener_cache_store.get_checkpoint()
+        if checkpoint_data:
             # Check if checkpoint is still valid (not older than cache duration)
-            checkpoint_time = datetime.fromisoformat(checkpoint_data.get('timestamp', '1970-01-01'))
+            checkpoint_time = datetime.fromtimestamp(checkpoint_data['timestamp'])
             if datetime.now() - checkpoint_time < timedelta(hours=CACHE_DURATION_HOURS):
                 logger.info(f"📋 Found valid checkpoint from {checkpoint_time}")
                 return checkpoint_data
             else:
                 logger.info(f"⏰ Checkpoint expired (age: {datetime.now() - checkpoint_time})")
+                # Drop it so its tickers don't leak into the next scan's checkpoint
+                screener_cache_store.clear_checkpoint()
                 return None
     except Exception as e:
         logger.warning(f"⚠️ Error loading checkpoint: {e}")
     return None
 
 
-def save_checkpoint(processed_tickers: List[str], filters_hash: str, batch_id: str, stats: Dict):
-    """Save checkpoint data for batch mode resume"""
+def save_checkpoint(new_tickers: List[str], filters_hash: str, batch_id: str, stats: Dict):
+    """Add tickers processed since the last save to the checkpoint for batch mode resume"""
     try:
-        os.makedirs(os.path.dirname(CHECKPOINT_FILE), exist_ok=True)
-        
-        checkpoint_data = {
-            'timestamp': datetime.now().isoformat(),
-            'batch_id': batch_id,
-            'filters_hash': filters_hash,
-            'processed_tickers': processed_tickers,
-            'stats': stats
-        }
-        
-        with open(CHECKPOINT_FILE, 'w') as f:
-            json.dump(checkpoint_data, f, indent=2)
-        
-        logger.debug(f"💾 Checkpoint saved: {len(processed_tickers)} tickers processed")
+        screener_cache_store.save_checkpoint(new_tickers, filters_hash, batch_id, stats)
+        logger.debug(f"💾 Checkpoint saved: {len(new_tickers)} more tickers processed")
     except Exception as e:
         logger.error(f"⚠️ Error saving checkpoint: {e}")
 
 
 def clear_checkpoint():
-    """Clear checkpoint file"""
+    """Clear checkpoint"""
     try:
-        if os.path.exists(CHECKPOINT_FILE):
-            os.remove(CHECKPOINT_FILE)
+        if screener_cache_store.clear_checkpoint():
             logger.info("🗑️  Checkpoint cleared")
     except Exception as e:
         logger.error(f"⚠️ Error clearing checkpoint: {e}")
@@ -255,114 +325,19 @@ def calculate_atr(df: pd.DataFrame, window: int = 14):
     atr = true_range.rolling(window=window).mean()
     return atr
 
-def get_stock_performance_data(ticker: str, days_back: int = 180) -> Optional[Dict]:
-    """Get stock performance data for screening"""
+def get_stock_performance_data(ticker: str, days_back: int = DEFAULT_HISTORY_DAYS) -> Optional[Dict]:
+    """Get stock performance data for screening (days_back counts trading days)"""
     try:
-        # Get price history for 6 months
-        bars = get_price_history(ticker, days=days_back)
+        # Get the last 180 sessions so the 6-month performance lookback has its bar
+        bars = get_session_bars(ticker, days_back)
         if not bars or len(bars) < 30:
             return None
         
-        # Convert to DataFrame
-        df = pd.DataFrame(bars)
-        df = df.rename(columns={"o": "Open", "h": "High", "l": "Low", "c": "Close", "v": "Volume"})
-        df['Date'] = pd.to_datetime(df['t'], unit='ms')
-        df.set_index('Date', inplace=True)
-        df.sort_index(inplace=True)
-        
-        # Get current price (most recent close)
-        current_price = df['Close'].iloc[-1]
-        
-        # Calculate performance periods
-        # 1 month (30 days)
-        if len(df) >= 30:
-            price_1m_ago = df['Close'].iloc[-30]
-            performance_1m = calculate_performance_percentage(current_price, price_1m_ago)
-        else:
-            performance_1m = 0
-            
-        # 3 months (90 days)
-        if len(df) >= 90:
-            price_3m_ago = df['Close'].iloc[-90]
-            performance_3m = calculate_performance_percentage(current_price, price_3m_ago)
-        else:
-            performance_3m = 0
-            
-        # 6 months (180 days)
-        if len(df) >= 180:
-            price_6m_ago = df['Close'].iloc[-180]
-            performance_6m = calculate_performance_percentage(current_price, price_6m_ago)
-        else:
-            performance_6m = 0
-        
-        # Calculate ADR% (Average Daily Range) for last 30 days
-        recent_df = df.tail(30)
-        adr_percentages = []
-        for _, row in recent_df.iterrows():
-            adr_pct = calculate_adr_percentage(row['High'], row['Low'], row['Close'])
-            adr_percentages.append(adr_pct)
-        
-        avg_adr_percentage = sum(adr_percentages) / len(adr_percentages) if adr_percentages else 0
-        
-        # Calculate RSI (14-day)
-        rsi = calculate_rsi(df['Close'], window=14)
-        current_rsi = rsi.iloc[-1] if not rsi.empty else 50
-        
-        # Determine RSI signal
-        if current_rsi < 30:
-            rsi_signal = "OVERSOLD"
-        elif current_rsi > 70:
-            rsi_signal = "OVERBOUGHT"
-        else:
-            rsi_signal = "NEUTRAL"
-        
-        # Calculate additional technical indicators
-        macd_line, macd_signal_line = calculate_macd(df['Close'])
-        stochastic_osc = calculate_stochastic_oscillator(df)
-        atr = calculate_atr(df)
-        
-        # Get latest values
-        current_macd = macd_line.iloc[-1] if not macd_line.empty else 0
-        current_macd_signal = macd_signal_line.iloc[-1] if not macd_signal_line.empty else 0
-        current_stochastic = stochastic_osc.iloc[-1] if not stochastic_osc.empty else 50
-        current_atr = atr.iloc[-1] if not atr.empty else 0
-        
-        # Calculate indicator scores (same logic as technical_indicator_service)
-        indicator_scores = {
-            "MACD": 1 if current_macd > current_macd_signal else -1,
-            "RSI": 1 if current_rsi < 30 else -1 if current_rsi > 70 else 0,
-            "SO": 1 if current_stochastic < 20 else -1 if current_stochastic > 80 else 0,
-            "PRC": 1 if performance_1m > 0 else -1
-        }
-        
-        # Calculate overall signal
-        weights = {"MACD": 0.5, "PRC": 0.3, "RSI": 0.2, "SO": 0.4}
-        overall_score = sum(indicator_scores[k] * weights[k] for k in indicator_scores)
-        
-        if overall_score > 0:
-            overall_signal = "BULLISH"
-        elif overall_score < 0:
-            overall_signal = "BEARISH"
-        else:
-            overall_signal = "NEUTRAL"
-        
+        # A bar from a session still trading is provisional - as_of is the last closed session it covers
         return {
             "ticker": ticker,
-            "current_price": round(current_price, 2),
-            "performance_1m": round(performance_1m, 2),
-            "performance_3m": round(performance_3m, 2),
-            "performance_6m": round(performance_6m, 2),
-            "adr_percentage": round(avg_adr_percentage, 2),
-            "rsi": round(current_rsi, 2),
-            "rsi_signal": rsi_signal,
-            "macd": round(current_macd, 2),
-            "macd_signal": round(current_macd_signal, 2),
-            "stochastic_oscillator": round(current_stochastic, 2),
-            "atr": round(current_atr, 2),
-            "indicator_scores": indicator_scores,
-            "overall_signal": overall_signal,
-            "overall_score": round(overall_score, 2),
-            "volume_avg_30d": int(recent_df['Volume'].mean()),
+            **compute_screener_metrics(bars),
+            "as_of": min(bar_date(int(bars.t[-1])), latest_closed_session()),
             "last_updated": datetime.now().isoformat()
         }
         
@@ -370,6 +345,139 @@ def get_stock_performance_data(ticker: str, days_back: int = 180) -> Optional[Di
         print(f"Error getting data for {ticker}: {e}")
         return None
 
+def fetch_performance_data(tickers: List[str], max_workers: int = SCREENER_FETCH_WORKERS,
+                           limiter: Optional[TokenBucket] = None) -> Iterator[Tuple[str, Optional[Dict]]]:
+    """
+    get_stock_performance_data for many tickers, yielding (ticker, data or
+    None) in completion order.
+
+    Workers fetch and compute concurrently; at most 2 x max_workers tickers
+    are in flight, so the caller can stop (or checkpoint) at any point and
+    only the yielded tickers have been done. Every request still goes
+    through the shared Polygon rate limiter, which sets the actual pace.
+
+    Args:
+        tickers: Tickers to process
+        max_workers: Concurrent fetch + compute workers
+        limiter: Optional extra budget (e.g. a background job's share of the
+                 plan); one token is taken before each ticker is started
+    """
+    if not tickers:
+        return
+    workers = max(1, min(max_workers, len(tickers)))
+    polygon_session.ensure_pool_size(workers)
+    pending_tickers = iter(tickers)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screener") as executor:
+        in_flight = {}
+
+        def submit_next() -> bool:
+            ticker = next(pending_tickers, None)
+            if ticker is None:
+                return False
+            if limiter is not None:
+                limiter.acquire()
+            in_flight[executor.submit(get_stock_performance_data, ticker)] = ticker
+            return True
+
+        for _ in range(2 * workers):
+            if not submit_next():
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker = in_flight.pop(future)
+                try:
+                    stock_data = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Error processing {ticker}: {e}")
+                    stock_data = None
+                submit_next()
+                yield ticker, stock_data
+
+def estimated_fetch_minutes(ticker_count: int, max_workers: int = SCREENER_FETCH_WORKERS) -> float:
+    """Worst-case minutes to fetch ticker_count uncached tickers under the shared rate limit"""
+    if polygon_rate_limiter.rate_per_minute > 0:
+        return ticker_count / polygon_rate_limiter.rate_per_minute
+    return ticker_count / max(1, max_workers) / 60  # Unlimited plan: ~1s per request per worker
+
+def refresh_screener_cache(tickers: Optional[List[str]] = None, end_date: Optional[str] = None) -> Dict:
+    """
+    Incremental (nightly) refresh of the screener cache.
+    
+    Each ticker keeps a streaming indicator state (utils/indicator_state.py),
+    so a refresh only ingests the grouped daily bars since the last run (one
+    request per new date for the whole market) and folds each ticker's new
+    bars into its state in O(1) per bar, instead of re-fetching and
+    recomputing 180 trading days of history per ticker. Tickers without a saved
+    state are bootstrapped from the full lookback window, and so are states
+    that can no longer be advanced exactly: a split stored since the state
+    was built, a last bar older than the window, or stored bars the state
+    missed (e.g. the ticker was left out of earlier refreshes).
+    
+    Only tickers with a bar for the latest session get a row; the others
+    keep their cached row (see stale_tickers).
+    
+    Args:
+        tickers: Tickers to refresh (default: the ticker universe)
+        end_date: Last date to include in YYYY-MM-DD format (default: last closed session)
+    
+    Returns:
+        Refreshed stock data keyed by ticker (also merged into the screener cache)
+    """
+    start_time = time.time()
+    tickers = tickers or ticker_universe.get_ticker_symbols()
+    end_date = end_date or bar_store.last_closed_date()
+    latest_session = previous_session(end_date)
+    window_start = session_window_start(end_date, DEFAULT_HISTORY_DAYS)
+    
+    # Compare each state with the factor table rather than with what this sync reports:
+    # a split synced earlier by another caller (screen_stocks, the signal lookups) is reported only once
+    sync_corporate_actions(window_start, end_date)
+    latest_splits = {ticker: adjustments[-1][0] for ticker, adjustments in bar_store.get_adjustments(tickers).items()}
+    states = {
+        ticker: state for ticker, state in indicator_state_store.get_states(tickers).items()
+        if state.split_ex_date == latest_splits.get(ticker) and bar_date(state.last_t) >= window_start
+    }
+    changed = {}
+    
+    if states:
+        # Known tickers only need the bars after the newest state; a state behind it may
+        # only join if the ticker has no stored bars in between (it didn't trade)
+        frontier = max(bar_date(state.last_t) for state in states.values())
+        lagging = {ticker: state for ticker, state in states.items() if bar_date(state.last_t) < frontier}
+        if lagging:
+            lag_start = shift_date(min(bar_date(state.last_t) for state in lagging.values()), 1)
+            for ticker, bars in bar_store.get_panel(lagging, lag_start, frontier, adjusted=False).items():
+                if (bars.t > lagging[ticker].last_t).any():
+                    del states[ticker]
+        
+        since = shift_date(frontier, 1)
+        if since <= end_date:
+            for ticker, bars in load_price_panel(list(states), since, end_date).items():
+                if states[ticker].update_bars(bars):
+                    changed[ticker] = states[ticker]
+    
+    new_tickers = [ticker for ticker in tickers if ticker not in states]
+    if new_tickers:
+        logger.info(f"🧮 Bootstrapping indicator state for {len(new_tickers)} tickers")
+        for ticker, bars in load_price_panel(new_tickers, window_start, end_date).items():
+            if len(bars):
+                states[ticker] = changed[ticker] = TickerIndicatorState.from_bars(
+                    bars, split_ex_date=latest_splits.get(ticker)
+                )
+    
+    indicator_state_store.put_states(changed)
+    
+    now = datetime.now().isoformat()
+    stock_data = {
+        ticker: {"ticker": ticker, **state.metrics(), "as_of": latest_session, "last_updated": now}
+        for ticker, state in states.items()
+        if state.bar_count >= 30 and bar_date(state.last_t) == latest_session
+    }
+    save_cache(stock_data)
+    logger.info(f"✅ Refreshed {len(stock_data)} stocks ({len(changed)} states updated) in {time.time() - start_time:.1f}s")
+    return stock_data
+
 def screen_stocks(filters: Dict) -> List[Dict]:
     """Main screening function"""
     start_time = time.time()
@@ -421,7 +529,7 @@ def screen_stocks(filters: Dict) -> List[Dict]:
                 else:
                     tickers = all_tickers
                     logger.info(f"📊 UNIVERSE MODE: Processing all {len(tickers)} stocks from universe")
-                    logger.info(f"⏱️  Estimated time: ~60 minutes (first run), instant (if cached)")
+                    logger.info(f"⏱️  Estimated time: ~{estimated_fetch_minutes(len(tickers)):.0f} minutes (first run), instant (if cached)")
             else:
                 # Fallback to all predefined sectors
                 tickers = []
@@ -488,7 +596,7 @@ def screen_stocks(filters: Dict) -> List[Dict]:
                     # Process all tickers to ensure accurate top X rankings
                     tickers = all_tickers
                     logger.info(f"📊 FULL SCAN MODE: Processing all {len(tickers)} stocks for accurate ranking")
-                    logger.info(f"⏱️  Estimated time: ~60 minutes (first run with API calls), instant (if cached)")
+                    logger.info(f"⏱️  Estimated time: ~{estimated_fetch_minutes(len(tickers)):.0f} minutes (first run with API calls), instant (if cached)")
                     logger.info(f"💡 Cache duration: {CACHE_DURATION_HOURS} hours - subsequent runs will be fast!")
             else:
                 # Fallback to predefined sectors
@@ -535,14 +643,15 @@ def screen_stocks(filters: Dict) -> List[Dict]:
     # Store original ticker list for completion tracking
     original_ticker_list = tickers.copy()
     original_ticker_count = len(original_ticker_list)
+    original_ticker_set = set(original_ticker_list)  # Membership checks on 10k+ tickers
     filters_hash = get_filters_hash(filters)
     batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Try to load from cache first
+    # Warm columnar view of the cache - rebuilt only when the cache store changes
     logger.info("=" * 80)
     logger.info("💾 LOADING CACHE")
-    cached_data = load_cache()
-    logger.info(f"✅ Loaded {len(cached_data)} stocks from cache")
+    table = get_screener_table()
+    logger.info(f"✅ Loaded {len(table)} stocks from cache")
     
     # Automatically check for existing checkpoint and resume if valid
     logger.info("=" * 80)
@@ -556,7 +665,7 @@ def screen_stocks(filters: Dict) -> List[Dict]:
         if checkpoint.get('filters_hash') == filters_hash:
             checkpoint_processed = set(checkpoint.get('processed_tickers', []))
             # Only count tickers that are in the current original list (avoid double counting from different runs)
-            processed_tickers = set([t for t in checkpoint_processed if t in original_ticker_list])
+            processed_tickers = set([t for t in checkpoint_processed if t in original_ticker_set])
             checkpoint_stats = checkpoint.get('stats', checkpoint_stats)
             batch_id = checkpoint.get('batch_id', batch_id)  # Use existing batch_id
             logger.info(f"📋 RESUMING: Found checkpoint with {len(checkpoint_processed)} tickers ({(len(processed_tickers))} in current universe)")
@@ -577,183 +686,140 @@ def screen_stocks(filters: Dict) -> List[Dict]:
     else:
         logger.info("🆕 No existing checkpoint - starting fresh")
     
-    logger.info("=" * 80)
-    logger.info("🔍 SCREENING STOCKS")
-    logger.info(f"📊 Total tickers to process: {len(tickers)}")
-    if processed_tickers:
-        logger.info(f"🔧 Batch ID: {batch_id} | Resuming from checkpoint")
-    
     # Track how many were processed at the start (from checkpoint, only in current universe)
-    processed_at_start = len([t for t in processed_tickers if t in original_ticker_list])
+    processed_at_start = len([t for t in processed_tickers if t in original_ticker_set])
     
-    screened_stocks = []
-    new_data = {}
     cached_count = checkpoint_stats.get("cached_count", 0)
     fetched_count = checkpoint_stats.get("fetched_count", 0)
     failed_count = checkpoint_stats.get("failed_count", 0)
     
-    for i, ticker in enumerate(tickers):
-        try:
-            # Progress indicator every 10 stocks
-            if i % 10 == 0 and i > 0:
-                elapsed = time.time() - start_time
-                rate = i / elapsed
-                eta = (len(tickers) - i) / rate if rate > 0 else 0
-                # Use processed_at_start (calculated once at start) + current progress (i)
-                # This avoids double-counting since processed_tickers grows during the loop
-                total_processed = processed_at_start + i
-                logger.info(f"⚡ Progress: {i}/{len(tickers)} ({i/len(tickers)*100:.1f}%) | "
-                          f"Total: {total_processed}/{original_ticker_count} | "
-                          f"Cached: {cached_count} | Fetched: {fetched_count} | Failed: {failed_count} | "
-                          f"ETA: {eta/60:.1f}min")
-            
-            # Check cache first
-            if ticker in cached_data:
-                stock_data = cached_data[ticker]
-                cached_count += 1
-            else:
-                # Light rate limiting to avoid overwhelming the API
-                # With unlimited calls, we can be more aggressive
-                if i % 50 == 0 and i > 0:
-                    time.sleep(0.1)  # Small pause every 50 requests
-                
-                stock_data = get_stock_performance_data(ticker)
-                if stock_data:
-                    new_data[ticker] = stock_data
-                    fetched_count += 1
-            
-            if not stock_data:
-                failed_count += 1
-                # Mark as processed (even if failed) so we don't retry on resume
-                processed_tickers.add(ticker)
-                continue
-            
-            # Mark ticker as processed (always track for resume capability)
-            processed_tickers.add(ticker)
-            
-            # Incremental cache save and checkpoint (automatic checkpointing)
-            if (i + 1) % CHECKPOINT_INTERVAL == 0:
-                # Merge new data into cache
-                updated_cache = {**cached_data, **new_data}
-                save_cache(updated_cache)
-                cached_data = updated_cache  # Update local cache reference
-                
-                # Save checkpoint
-                checkpoint_stats = {
-                    "cached_count": cached_count,
-                    "fetched_count": fetched_count,
-                    "failed_count": failed_count
-                }
-                save_checkpoint(list(processed_tickers), filters_hash, batch_id, checkpoint_stats)
-                logger.info(f"💾 Checkpoint saved: {len(processed_tickers)}/{original_ticker_count} tickers processed, "
-                          f"{len(new_data)} new items cached")
-                new_data = {}  # Clear new_data since it's now in cache
-            
-            # Apply filters
-            rsi = stock_data.get("rsi", 50)
-            rsi_signal_value = stock_data.get("rsi_signal", "NEUTRAL")
-            
-            # Check RSI signal filter
-            rsi_signal_match = (rsi_signal == "all" or 
-                              (rsi_signal == "oversold" and rsi_signal_value == "OVERSOLD") or
-                              (rsi_signal == "overbought" and rsi_signal_value == "OVERBOUGHT") or
-                              (rsi_signal == "neutral" and rsi_signal_value == "NEUTRAL"))
-            
-            adr = stock_data.get("adr_percentage", 0)
-            
-            # Apply all filters
-            if (stock_data["current_price"] >= min_price and 
-                stock_data["current_price"] <= max_price and
-                stock_data["performance_1m"] >= min_1m and
-                stock_data["performance_1m"] <= max_1m and
-                stock_data["performance_3m"] >= min_3m and
-                stock_data["performance_3m"] <= max_3m and
-                stock_data["performance_6m"] >= min_6m and
-                stock_data["performance_6m"] <= max_6m and
-                rsi >= min_rsi and
-                rsi <= max_rsi and
-                adr >= min_adr and
-                adr <= max_adr and
-                rsi_signal_match):
-                
-                screened_stocks.append(stock_data)
-                logger.info(f"✅ MATCH: {ticker} - {stock_data['performance_1m']}% 1M, "
-                          f"{stock_data['performance_3m']}% 3M, {stock_data['performance_6m']}% 6M, "
-                          f"RSI: {rsi:.1f} ({rsi_signal_value}), Signal: {stock_data['overall_signal']}")
-            
-        except Exception as e:
-            logger.error(f"❌ Error processing {ticker}: {e}")
+    # Fresh cached tickers need no work - only missing and stale ones go to Polygon.
+    # While the background warmer keeps up, stale rows are served and left to it
+    stale = set() if warmer_is_current() else get_stale_tickers()
+    to_fetch = [ticker for ticker in tickers if ticker not in table or ticker in stale]
+    cached_count += len(tickers) - len(to_fetch)
+    unsaved_tickers = [ticker for ticker in tickers if ticker in table and ticker not in stale]  # Processed, not yet in the checkpoint
+    processed_tickers.update(unsaved_tickers)
+    
+    logger.info("=" * 80)
+    logger.info("🔍 SCREENING STOCKS")
+    stale_count = sum(ticker in table for ticker in to_fetch)
+    logger.info(f"📊 Total tickers to process: {len(tickers)} ({len(to_fetch) - stale_count} not cached, "
+                f"{stale_count} stale under the '{SCREENER_REFRESH_POLICY}' policy)")
+    if processed_at_start:
+        logger.info(f"🔧 Batch ID: {batch_id} | Resuming from checkpoint")
+    
+    new_data = {}
+    fetch_start = time.time()
+    
+    workers = max(1, min(SCREENER_FETCH_WORKERS, len(to_fetch)))
+    if to_fetch:
+        logger.info(f"⚡ Fetching with {workers} workers, shared limiter budget: "
+                    f"{polygon_rate_limiter.rate_per_minute:g} calls/minute "
+                    f"(~{estimated_fetch_minutes(len(to_fetch), workers):.1f}min worst case)")
+    
+    # Workers fetch bars and compute metrics; results are merged, counted and
+    # checkpointed here in completion order, so the checkpoint only ever lists
+    # tickers that are actually done
+    for i, (ticker, stock_data) in enumerate(fetch_performance_data(to_fetch, workers)):
+        # Progress indicator every 10 stocks
+        if i % 10 == 0 and i > 0:
+            elapsed = time.time() - fetch_start
+            rate = i / elapsed
+            eta = (len(to_fetch) - i) / rate if rate > 0 else 0
+            logger.info(f"⚡ Progress: {i}/{len(to_fetch)} ({i/len(to_fetch)*100:.1f}%) | "
+                      f"Total: {len(processed_tickers)}/{original_ticker_count} | "
+                      f"Cached: {cached_count} | Fetched: {fetched_count} | Failed: {failed_count} | "
+                      f"ETA: {eta/60:.1f}min")
+        
+        if stock_data:
+            new_data[ticker] = stock_data
+            fetched_count += 1
+        else:
             failed_count += 1
-            continue
+        
+        # Mark as processed (even if failed) so we don't retry on resume
+        processed_tickers.add(ticker)
+        unsaved_tickers.append(ticker)
+        
+        # Incremental cache save and checkpoint (automatic checkpointing)
+        if (i + 1) % CHECKPOINT_INTERVAL == 0:
+            # Upsert just the new rows into the cache
+            save_cache(new_data)
+            
+            # Save checkpoint
+            checkpoint_stats = {
+                "cached_count": cached_count,
+                "fetched_count": fetched_count,
+                "failed_count": failed_count
+            }
+            save_checkpoint(unsaved_tickers, filters_hash, batch_id, checkpoint_stats)
+            unsaved_tickers = []
+            logger.info(f"💾 Checkpoint saved: {len(processed_tickers)}/{original_ticker_count} tickers processed, "
+                      f"{len(new_data)} new items cached")
+            new_data = {}  # Clear new_data since it's now in cache
     
     # Final statistics
     # Count only tickers that are in the original list (to avoid double counting)
-    total_processed = len([t for t in processed_tickers if t in original_ticker_list])
+    total_processed = len([t for t in processed_tickers if t in original_ticker_set])
     processed_this_run = total_processed - processed_at_start
     logger.info("=" * 80)
     logger.info("📊 SCREENING COMPLETE")
-    # Calculate how many were processed in THIS run
-    processed_this_run = total_processed - processed_at_start
     logger.info(f"✅ Total processed in this run: {processed_this_run}")
     logger.info(f"📋 Total processed overall: {total_processed}/{original_ticker_count}")
     logger.info(f"📦 From cache: {cached_count}")
     logger.info(f"🔄 Newly fetched: {fetched_count}")
     logger.info(f"❌ Failed: {failed_count}")
-    logger.info(f"🎯 Matches found: {len(screened_stocks)}")
     
-    # Save final cache and checkpoint
+    # Save final cache (the warm table reloads on the next read)
     if new_data:
         logger.info("💾 SAVING FINAL CACHE")
-        # Merge new data with existing cache
-        updated_cache = {**cached_data, **new_data}
-        save_cache(updated_cache)
-        logger.info(f"✅ Cached {len(updated_cache)} total stocks")
-    
-    # Save final checkpoint (always enabled)
-    checkpoint_stats = {
-        "cached_count": cached_count,
-        "fetched_count": fetched_count,
-        "failed_count": failed_count
-    }
-    save_checkpoint(list(processed_tickers), filters_hash, batch_id, checkpoint_stats)
-    logger.info(f"💾 Final checkpoint saved: {total_processed}/{original_ticker_count} tickers processed")
+        save_cache(new_data)
+    if to_fetch:
+        table = get_screener_table()
     
     # Check if complete (all tickers processed)
     is_complete = len(processed_tickers) >= original_ticker_count
     if is_complete:
         logger.info("✅ COMPLETE - All tickers processed!")
         clear_checkpoint()
-        logger.info("🗑️  Checkpoint cleared (processing complete)")
     else:
+        checkpoint_stats = {
+            "cached_count": cached_count,
+            "fetched_count": fetched_count,
+            "failed_count": failed_count
+        }
+        save_checkpoint(unsaved_tickers, filters_hash, batch_id, checkpoint_stats)
+        logger.info(f"💾 Final checkpoint saved: {total_processed}/{original_ticker_count} tickers processed")
         logger.info(f"⏸️  IN PROGRESS - {original_ticker_count - total_processed} tickers remaining")
         logger.info(f"💡 Call again to resume from checkpoint")
     
-    # Sort ALL filtered stocks by specified field and order
-    # This ensures accurate rankings - we process all tickers, filter them all, 
-    # sort them all, then return the top X (not just top X from a sample)
-    sort_key_map = {
-        "adr": "adr_percentage",
-        "rsi": "rsi",
-        "performance_1m": "performance_1m",
-        "performance_3m": "performance_3m",
-        "performance_6m": "performance_6m"
+    # Filter every ticker of the request with one mask over the cached columns and
+    # pick the top X by partial selection - rankings still cover the whole list
+    screen_start = time.time()
+    bounds = {
+        "current_price": (min_price, max_price),
+        "performance_1m": (min_1m, max_1m),
+        "performance_3m": (min_3m, max_3m),
+        "performance_6m": (min_6m, max_6m),
+        "rsi": (min_rsi, max_rsi),
+        "adr_percentage": (min_adr, max_adr)
     }
+    screened_stocks, match_count = table.screen(
+        original_ticker_list, bounds, rsi_signal, sort_by,
+        descending=(sort_order.lower() == "desc"), limit=limit
+    )
     
-    sort_key = sort_key_map.get(sort_by, "adr_percentage")
-    reverse_order = (sort_order.lower() == "desc")
-    
-    # Ensure sort key exists in data, default to 0 if missing
-    screened_stocks.sort(key=lambda x: x.get(sort_key, 0), reverse=reverse_order)
-    
-    # Return top X results from the complete sorted list
     total_time = time.time() - start_time
+    logger.info(f"🎯 Matches found: {match_count} (filtered and ranked in {(time.time() - screen_start) * 1000:.1f}ms)")
     logger.info(f"⏱️  Total execution time: {total_time:.2f}s ({total_time/60:.2f}min)")
-    logger.info(f"📊 Filtered matches: {len(screened_stocks)} | Returning top {min(limit, len(screened_stocks))} by ADR%")
+    logger.info(f"📊 Returning top {len(screened_stocks)} by {sort_by} ({sort_order})")
     logger.info("=" * 80)
     
-    return screened_stocks[:limit]
+    return screened_stocks
 
-def get_market_snapshot_data(tickers: Optional[List[str]] = None, include_otc: bool = False) -> Dict:
+def get_market_snapshot_data(tickers: Optional[List[str]] = None, include_otc: bool = False,
+                             columnar: bool = False) -> Dict:
     """
     Get a comprehensive market snapshot for the entire U.S. stock market
     
@@ -761,6 +827,8 @@ def get_market_snapshot_data(tickers: Optional[List[str]] = None, include_otc: b
         tickers: Optional list of specific tickers to get snapshots for.
                  If None or empty, returns all tickers (10,000+).
         include_otc: Whether to include OTC securities. Default is False.
+        columnar: If True, return tickers as {field: [values...]} columns instead of
+                  one dict per ticker (much smaller and faster for full-market requests)
     
     Returns:
         Dictionary containing formatted snapshot data with market-wide statistics
@@ -777,106 +845,23 @@ def get_market_snapshot_data(tickers: Optional[List[str]] = None, include_otc: b
         if include_otc:
             logger.info("📈 Including OTC securities")
         
-        # Call the Polygon API
-        snapshot_data = get_market_snapshot(tickers=tickers, include_otc=include_otc)
-        
-        # Extract tickers from response
-        tickers_data = snapshot_data.get("tickers", [])
+        # Call the Polygon API - decoded in one pass into per-field arrays
+        snapshot = get_market_snapshot_columns(tickers=tickers, include_otc=include_otc)
         
-        logger.info(f"✅ Received {len(tickers_data)} tickers")
-        
-        # Format the data for easier consumption
-        formatted_tickers = []
-        for ticker_data in tickers_data:
-            day_data = ticker_data.get("day", {})
-            prev_day_data = ticker_data.get("prevDay", {})
-            last_trade = ticker_data.get("lastTrade", {})
-            
-            formatted_ticker = {
-                "ticker": ticker_data.get("ticker"),
-                "current_price": day_data.get("c", 0),
-                "open": day_data.get("o", 0),
-                "high": day_data.get("h", 0),
-                "low": day_data.get("l", 0),
-                "close": day_data.get("c", 0),
-                "volume": day_data.get("v", 0),
-                "vwap": day_data.get("vw", 0),  # Volume-weighted average price
-                "todays_change": ticker_data.get("todaysChange", 0),
-                "todays_change_perc": ticker_data.get("todaysChangePerc", 0),
-                "prev_day": {
-                    "close": prev_day_data.get("c", 0),
-                    "high": prev_day_data.get("h", 0),
-                    "low": prev_day_data.get("l", 0),
-                    "open": prev_day_data.get("o", 0),
-                    "volume": prev_day_data.get("v", 0)
-                },
-                "last_trade": {
-                    "price": last_trade.get("p", 0),
-                    "size": last_trade.get("s", 0),
-                    "timestamp": last_trade.get("t", 0)
-                },
-                "updated": ticker_data.get("updated", 0)
-            }
-            
-            formatted_tickers.append(formatted_ticker)
+        logger.info(f"✅ Received {len(snapshot)} tickers")
         
         # Calculate market-wide statistics
-        if formatted_tickers:
-            total_volume = sum(t["volume"] for t in formatted_tickers)
-            gainers = sum(1 for t in formatted_tickers if t["todays_change_perc"] > 0)
-            losers = sum(1 for t in formatted_tickers if t["todays_change_perc"] < 0)
-            unchanged = len(formatted_tickers) - gainers - losers
-            
-            # Find top movers
-            sorted_by_change = sorted(formatted_tickers, 
-                                    key=lambda x: x["todays_change_perc"], 
-                                    reverse=True)
-            
-            market_stats = {
-                "total_tickers": len(formatted_tickers),
-                "total_volume": total_volume,
-                "gainers": gainers,
-                "losers": losers,
-                "unchanged": unchanged,
-                "top_gainers": [
-                    {
-                        "ticker": t["ticker"],
-                        "change_perc": round(t["todays_change_perc"], 2),
-                        "price": t["current_price"],
-                        "volume": t["volume"]
-                    }
-                    for t in sorted_by_change[:10]
-                ],
-                "top_losers": [
-                    {
-                        "ticker": t["ticker"],
-                        "change_perc": round(t["todays_change_perc"], 2),
-                        "price": t["current_price"],
-                        "volume": t["volume"]
-                    }
-                    for t in sorted_by_change[-10:][::-1]
-                ]
-            }
-        else:
-            market_stats = {
-                "total_tickers": 0,
-                "total_volume": 0,
-                "gainers": 0,
-                "losers": 0,
-                "unchanged": 0,
-                "top_gainers": [],
-                "top_losers": []
-            }
+        market_stats = snapshot.statistics()
         
         logger.info(f"📈 Gainers: {market_stats['gainers']}, Losers: {market_stats['losers']}, Unchanged: {market_stats['unchanged']}")
         logger.info(f"📊 Total Volume: {market_stats['total_volume']:,}")
         logger.info("=" * 80)
         
         return {
-            "status": snapshot_data.get("status", "OK"),
-            "count": len(formatted_tickers),
+            "status": snapshot.status,
+            "count": len(snapshot),
             "market_statistics": market_stats,
-            "tickers": formatted_tickers
+            "tickers": snapshot.to_columns() if columnar else snapshot.rows()
         }
         
     except Exception as e:
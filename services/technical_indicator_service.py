@@ -1,85 +1,223 @@
 # services/technical_indicator_service.py
 
-from utils.polygon_client import get_price_history
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from utils.polygon_client import get_price_bars
+from utils.polygon_session import polygon_session
+from utils.bars import Bars
+from utils.memo import ByteBudgetLRU
+from utils.indicator_panel import PricePanel
+from utils.indicators import stochastic_last, ta_macd_last, wilder_rsi_last, roc_last, wilder_atr_last
 import numpy as np
-import pandas as pd
-import ta
-
-from utils.polygon_client import get_price_history
-import pandas as pd
-import ta
-from utils.ti_utils import (
-    stochastic_oscillator,
-    price_rate_of_change,
-    relative_strength_index,
-    calculate_macd,
-    calculate_atr,
-    round_to_sf
+
+logger = logging.getLogger(__name__)
+
+# Indicator memo configuration
+INDICATOR_HISTORY_DAYS = 60
+# Part of every memo key, so changing a window invalidates results computed with the old one
+INDICATOR_PARAMS = (
+    ("history_days", INDICATOR_HISTORY_DAYS),
+    ("macd", 26, 12, 9),
+    ("rsi", 14),
+    ("roc", 14),
+    ("so", 14),
+    ("atr", 14)
 )
+INDICATOR_MEMO_MAX_BYTES = int(os.getenv("MIDAS_INDICATOR_MEMO_MAX_BYTES", 8 * 1024 * 1024))
+# How long the newest bar seen for a ticker is trusted before its bars are fetched again
+INDICATOR_MEMO_TTL_SECONDS = float(os.getenv("MIDAS_INDICATOR_MEMO_TTL_SECONDS", 300))
+# Concurrent bar fetches for the batched signal endpoint
+DEFAULT_BATCH_WORKERS = 10
+
+# Global instance
+indicator_memo = ByteBudgetLRU(INDICATOR_MEMO_MAX_BYTES)
+_latest_bar_seen = {}  # ticker -> (last bar key, time.monotonic() when seen)
+
+
+def _last_bar_key(bars: Bars) -> tuple:
+    """
+    Identity of the newest bar. The close and volume are included because
+    today's bar keeps its timestamp while it updates during the session; the
+    oldest close changes when a new split factor rescales the window.
+    """
+    return int(bars.t[-1]), float(bars.c[-1]), float(bars.v[-1]), float(bars.c[0])
+
+
+def _copy_result(result: dict) -> dict:
+    # Callers get their own dicts so they can't modify the memoized result
+    return {**result, "indicator_scores": dict(result["indicator_scores"])}
+
+
+def _recent_memo_result(ticker: str) -> Optional[dict]:
+    """Memoized result for the newest bar seen within INDICATOR_MEMO_TTL_SECONDS, without fetching"""
+    seen = _latest_bar_seen.get(ticker)
+    if seen is not None and time.monotonic() - seen[1] < INDICATOR_MEMO_TTL_SECONDS:
+        result = indicator_memo.get((ticker, seen[0], INDICATOR_PARAMS))
+        if result is not None:
+            return _copy_result(result)
+    return None
+
+
 def calculate_technical_indicators(ticker: str, asset_type: str = "stock"):
     """
     Calculate technical indicators using Polygon and generate a trading signal.
+
+    Results are memoized by (ticker, newest bar, indicator parameters): views
+    of the same ticker within INDICATOR_MEMO_TTL_SECONDS skip the fetch, and
+    later views recompute only when a new or updated bar has arrived.
     """
 
     if asset_type.lower() == "crypto":
         ticker = f"X:{ticker.upper()}USD"
 
+    result = _recent_memo_result(ticker)
+    if result is not None:
+        return result
+
     try:
-        bars = get_price_history(ticker, days=60)
+        bars = get_price_bars(ticker, days=INDICATOR_HISTORY_DAYS)
         if not bars or len(bars) < 30:
             return {"error": "Not enough data."}
 
-        # Convert bars to DataFrame
-        df = pd.DataFrame(bars)
-        df = df.rename(columns={"o": "Open", "h": "High", "l": "Low", "c": "Close", "v": "Volume"})
-        df['Date'] = pd.to_datetime(df['t'], unit='ms')
-        df.set_index('Date', inplace=True)
-        df.sort_index(inplace=True)
-
-        close_prices = df['Close'].values[::-1]  # Reverse for consistency
-
-        # Compute technical indicators
-        df['macd'] = ta.trend.MACD(df['Close']).macd()
-        df['macd_signal'] = ta.trend.MACD(df['Close']).macd_signal()
-        df['rsi'] = ta.momentum.RSIIndicator(df['Close']).rsi()
-        df['roc'] = ta.momentum.ROCIndicator(df['Close'], window=14).roc()
-        df['so'] = stochastic_oscillator(df)
-        df['atr'] = ta.volatility.AverageTrueRange(df['High'], df['Low'], df['Close'], window=14).average_true_range()
-
-        # Get latest values
-        macd_line = df['macd'].iloc[-1]
-        signal_line = df['macd_signal'].iloc[-1]
-        rsi = df['rsi'].iloc[-1]
-        prc = df['roc'].iloc[-1]
-        so = df['so'].iloc[-1]
-        atr = df['atr'].iloc[-1]
-
-        indicator_scores = {
-            "MACD": 1 if macd_line > signal_line else -1,
-            "RSI": 1 if rsi < 30 else -1 if rsi > 70 else 0,
-            "SO": 1 if so < 20 else -1 if so > 80 else 0,
-            "PRC": 1 if prc > 0 else -1
-        }
-        print('INDICATOR SCORES ',indicator_scores)
-        signal = compute_signal(indicator_scores, ticker)
-
-        return {
-            "ticker": ticker,
-            "market_price": round_to_sf(close_prices[0], 2),
-            "macd": round_to_sf(macd_line, 2),
-            "macd_signal": round_to_sf(signal_line, 2),
-            "rsi": round_to_sf(rsi, 2),
-            "stochastic_oscillator": round_to_sf(so, 2),
-            "price_rate_of_change": round_to_sf(prc, 2),
-            "atr": round_to_sf(atr, 2),
-            "indicator_scores": indicator_scores,
-            "signal": signal
-        }
+        bar_key = _last_bar_key(bars)
+        _latest_bar_seen[ticker] = (bar_key, time.monotonic())
+        memo_key = (ticker, bar_key, INDICATOR_PARAMS)
+        result = indicator_memo.get(memo_key)
+        if result is None:
+            result = _compute_indicators_batch({ticker: bars})[ticker]
+            if "error" in result:
+                return result
+            logger.debug(f"📐 Indicator scores for {ticker}: {result['indicator_scores']}")
+            indicator_memo.put(memo_key, result)
+        return _copy_result(result)
 
     except Exception as e:
         return {"error": str(e)}
 
 
+def _format_result(ticker: str, market_price, macd_line, signal_line, rsi, so, prc, atr) -> dict:
+    indicator_scores = {
+        "MACD": 1 if macd_line > signal_line else -1,
+        "RSI": 1 if rsi < 30 else -1 if rsi > 70 else 0,
+        "SO": 1 if so < 20 else -1 if so > 80 else 0,
+        "PRC": 1 if prc > 0 else -1
+    }
+    signal = compute_signal(indicator_scores, ticker)
+
+    return {
+        "ticker": ticker,
+        "market_price": round_to_sf(market_price, 2),
+        "macd": round_to_sf(macd_line, 2),
+        "macd_signal": round_to_sf(signal_line, 2),
+        "rsi": round_to_sf(rsi, 2),
+        "stochastic_oscillator": round_to_sf(so, 2),
+        "price_rate_of_change": round_to_sf(prc, 2),
+        "atr": round_to_sf(atr, 2),
+        "indicator_scores": indicator_scores,
+        "signal": signal
+    }
+
+
+def calculate_technical_indicators_batch(tickers: List[str], asset_type: str = "stock",
+                                         max_workers: int = DEFAULT_BATCH_WORKERS) -> Dict[str, dict]:
+    """
+    calculate_technical_indicators for many tickers at once (e.g. a watchlist).
+
+    Memoized results are used as-is; the remaining tickers' bars are fetched
+    concurrently and their latest indicator values computed together in one
+    vectorized pass over a (tickers x days) panel, using the same formulas
+    as the ta indicators in calculate_technical_indicators.
+
+    Args:
+        tickers: Ticker symbols as requested
+        asset_type: 'stock' or 'crypto'
+        max_workers: Concurrent bar fetches
+
+    Returns:
+        {requested ticker: result}, in request order, each result in the
+        calculate_technical_indicators schema (or {"error": ...})
+    """
+    symbols = {
+        ticker: f"X:{ticker.upper()}USD" if asset_type.lower() == "crypto" else ticker
+        for ticker in tickers
+    }
+    results = {}
+    for ticker, symbol in symbols.items():
+        result = _recent_memo_result(symbol)
+        if result is not None:
+            results[ticker] = result
+
+    pending = [ticker for ticker in symbols if ticker not in results]
+    if pending:
+        workers = max(1, min(max_workers, len(pending)))
+        polygon_session.ensure_pool_size(workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                ticker: executor.submit(get_price_bars, symbols[ticker], INDICATOR_HISTORY_DAYS)
+                for ticker in pending
+            }
+
+        to_compute = {}
+        for ticker, future in futures.items():
+            symbol = symbols[ticker]
+            try:
+                bars = future.result()
+            except Exception as e:
+                results[ticker] = {"error": str(e)}
+                continue
+            if not bars or len(bars) < 30:
+                results[ticker] = {"error": "Not enough data."}
+                continue
+
+            bar_key = _last_bar_key(bars)
+            _latest_bar_seen[symbol] = (bar_key, time.monotonic())
+            result = indicator_memo.get((symbol, bar_key, INDICATOR_PARAMS))
+            if result is not None:
+                results[ticker] = _copy_result(result)
+            else:
+                to_compute[ticker] = bars
+
+        computed = _compute_indicators_batch({symbols[ticker]: bars for ticker, bars in to_compute.items()})
+        for ticker, bars in to_compute.items():
+            symbol = symbols[ticker]
+            result = computed[symbol]
+            if "error" not in result:
+                indicator_memo.put((symbol, _last_bar_key(bars), INDICATOR_PARAMS), result)
+            results[ticker] = _copy_result(result) if "error" not in result else result
+
+    return {ticker: results[ticker] for ticker in symbols}
+
+
+def _compute_indicators_batch(bars_by_ticker: Dict[str, Bars]) -> Dict[str, dict]:
+    """
+    Latest indicator values, scores and signal for each ticker's bars (oldest first),
+    computed for all tickers in one pass of the vectorized kernels. The kernels
+    follow the ta library's MACD, RSI, ROC and ATR formulas.
+    """
+    if not bars_by_ticker:
+        return {}
+
+    panel = PricePanel.from_bars(bars_by_ticker)
+    high, low, close, _, _, _ = panel.right_aligned()
+    macd_line, signal_line = ta_macd_last(close)
+    rsi = wilder_rsi_last(close)
+    prc = roc_last(close, 14)
+    so = stochastic_last(high, low, close, 14)
+    atr = wilder_atr_last(high, low, close, 14)
+
+    results = {}
+    for i, ticker in enumerate(panel.tickers.tolist()):
+        try:
+            results[ticker] = _format_result(ticker, close[i, -1], macd_line[i], signal_line[i],
+                                             rsi[i], so[i], prc[i], atr[i])
+        except Exception as e:
+            results[ticker] = {"error": str(e)}
+    return results
+
+
 def compute_signal(score_map, ticker):
     weights = {
         "MACD": 0.5,
@@ -104,9 +242,3 @@ def round_to_sf(value, sig_figs):
     power = sig_figs - int(d)
     magnitude = 10 ** power
     return round(value * magnitude) / magnitude
-
-def stochastic_oscillator(df, window=14):
-    low_min = df['Low'].rolling(window=window).min()
-    high_max = df['High'].rolling(window=window).max()
-    so = 100 * ((df['Close'] - low_min) / (high_max - low_min))
-    return so
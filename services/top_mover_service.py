@@ -1,19 +1,17 @@
 # services/top_movers_service.py
-import os
 
-import requests
 import pandas as pd
 import datetime
 import sqlite3  # (or Postgres later)
+from utils.polygon_session import polygon_session
 
 # Constants
-POLYGON_API_KEY = os.getenv("POLYGON_API_KEY","default_secret_key")
 POLYGON_TOP_MOVERS_URL = "https://api.polygon.io/v2/snapshot/locale/us/markets/stocks/gainers"
 
 DB_FILE = "watchlist.db"  # Simple SQLite file for now
 
 # Import for technical indicators
-from services.stock_screener_service import get_stock_performance_data
+from services.stock_screener_service import get_cached_stock_data, get_stock_performance_data, DEFAULT_HISTORY_DAYS
 
 
 # -------------------------
@@ -36,8 +34,7 @@ def fetch_top_movers(mover_type: str, include_indicators: bool = False):
     else:
         url = "https://api.polygon.io/v2/snapshot/locale/us/markets/stocks/gainers"
 
-    params = {"apiKey": POLYGON_API_KEY}
-    response = requests.get(url, params=params)
+    response = polygon_session.get(url)
 
     if response.status_code != 200:
         raise Exception("Failed to fetch movers")
@@ -45,6 +42,14 @@ def fetch_top_movers(mover_type: str, include_indicators: bool = False):
     data = response.json()
     movers = []
 
+    # Indicators come from the screener cache when it holds a fresh row (kept warm by the cache warmer)
+    cached = {}
+    if include_indicators:
+        try:
+            cached = get_cached_stock_data([info.get('ticker') for info in data.get('tickers', [])])
+        except Exception as e:
+            print(f"Warning: Failed to read cached indicators: {e}")
+
     for ticker_info in data.get('tickers', []):
         day = ticker_info.get('day', {})
         ticker = ticker_info.get('ticker')
@@ -67,7 +72,8 @@ def fetch_top_movers(mover_type: str, include_indicators: bool = False):
         # Add technical indicators if requested
         if include_indicators:
             try:
-                stock_data = get_stock_performance_data(ticker, days_back=60)
+                # Same history window as the cached rows, so every mover's performance/indicators mean the same thing
+                stock_data = cached.get(ticker) or get_stock_performance_data(ticker, days_back=DEFAULT_HISTORY_DAYS)
                 if stock_data:
                     mover_data.update({
                         "rsi": stock_data.get("rsi", 50),
@@ -0,0 +1,52 @@
+# tests/conftest.py
+
+import importlib
+import os
+import tempfile
+
+import pytest
+
+# Keep the module-level stores (created at import) away from the project's cache/ directory
+_CACHE_DIR = tempfile.mkdtemp(prefix="midas-tests-")
+for _name, _file in [("MIDAS_BAR_STORE_FILE", "bar_store.db"),
+                     ("MIDAS_SCREENER_CACHE_FILE", "screener_cache.db"),
+                     ("MIDAS_INDICATOR_STATE_FILE", "indicator_state.db"),
+                     ("MIDAS_INDICATOR_HISTORY_FILE", "indicator_history.db")]:
+    os.environ.setdefault(_name, os.path.join(_CACHE_DIR, _file))
+os.environ.setdefault("POLYGON_CASSETTE_DIR", os.path.join(_CACHE_DIR, "polygon_cassettes"))
+os.environ.setdefault("POLYGON_API_KEY", "test")
+os.environ.setdefault("POLYGON_RATE_LIMIT_PER_MINUTE", "0")  # Fakes answer instantly - no throttling
+
+# Modules holding their own reference to the global bar store
+BAR_STORE_USERS = (
+    "utils.bar_store",
+    "utils.corporate_actions",
+    "utils.polygon_client",
+    "services.grouped_daily_service",
+    "services.stock_screener_service",
+)
+
+
+def use_bar_store(monkeypatch, db_path: str):
+    """Swap a BarStore on db_path in for the global instance everywhere it is used"""
+    from utils.bar_store import BarStore
+    store = BarStore(db_path)
+    for module_name in BAR_STORE_USERS:
+        monkeypatch.setattr(importlib.import_module(module_name), "bar_store", store)
+    return store
+
+
+@pytest.fixture
+def bar_store(tmp_path, monkeypatch):
+    """A fresh BarStore in place of the global one"""
+    return use_bar_store(monkeypatch, str(tmp_path / "bar_store.db"))
+
+
+def make_bar(day: str, close: float, volume: float = 1000.0, ticker: str = None) -> dict:
+    """A Polygon daily bar dict for day (YYYY-MM-DD) around close"""
+    from datetime import datetime, timezone
+    t = int(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+    bar = {"t": t, "o": close, "h": close * 1.02, "l": close * 0.98, "c": close, "v": volume, "vw": close, "n": 10}
+    if ticker is not None:
+        bar["T"] = ticker
+    return bar
@@ -0,0 +1,75 @@
+# tests/test_corporate_actions.py
+
+import pytest
+
+import utils.corporate_actions as corporate_actions
+from tests.conftest import make_bar
+from utils.corporate_actions import sync_corporate_actions
+
+LATEST_SESSION = "2024-06-28"
+
+
+@pytest.fixture
+def splits(bar_store, monkeypatch):
+    """Fake reference endpoint: records the requested ranges and serves the listed splits"""
+    listed = []
+    requested = []
+
+    def get_splits(start_date, end_date):
+        requested.append((start_date, end_date))
+        return [split for split in listed if start_date <= split["execution_date"] <= end_date]
+
+    monkeypatch.setattr(corporate_actions, "get_splits", get_splits)
+    monkeypatch.setattr(corporate_actions, "latest_closed_session", lambda: LATEST_SESSION)
+    return listed, requested
+
+
+def test_sync_runs_through_latest_session(splits, bar_store):
+    listed, requested = splits
+    listed.append({"ticker": "AAPL", "execution_date": "2024-06-20", "split_from": 1, "split_to": 4})
+
+    # A window ending before the split still learns about it
+    assert sync_corporate_actions("2024-06-03", "2024-06-07") == {"AAPL"}
+    assert requested == [("2024-06-03", LATEST_SESSION)]
+    assert bar_store.get_adjustment_sync("split") == ("2024-06-03", LATEST_SESSION)
+
+
+def test_sync_requests_only_unsynced_ranges(splits, bar_store):
+    _, requested = splits
+    sync_corporate_actions("2024-06-10", "2024-06-14")
+    sync_corporate_actions("2024-06-12", "2024-06-20")
+    sync_corporate_actions("2024-06-03", "2024-06-14")
+    assert requested == [("2024-06-10", LATEST_SESSION), ("2024-06-03", "2024-06-09")]
+
+
+def test_changed_is_reported_once(splits, bar_store):
+    listed, _ = splits
+    listed.append({"ticker": "NVDA", "execution_date": "2024-06-10", "split_from": 1, "split_to": 10})
+    assert sync_corporate_actions("2024-06-03", "2024-06-28") == {"NVDA"}
+    # The second caller only finds the range synced - the factor table is the lasting record
+    assert sync_corporate_actions("2024-06-03", "2024-06-28") == set()
+    assert bar_store.get_adjustments(["NVDA"]) == {"NVDA": [("2024-06-10", "split", 0.1)]}
+
+
+def test_get_bars_applies_split_factors(bar_store):
+    bar_store.put_bars("NVDA", [make_bar("2024-06-07", 1200.0, 100.0), make_bar("2024-06-10", 121.0, 1000.0)])
+    bar_store.put_adjustments([("NVDA", "2024-06-10", "split", 0.1), ("AAPL", "2020-08-31", "split", 0.25)])
+
+    adjusted = bar_store.get_bars("NVDA", "2024-06-01", "2024-06-30")
+    assert [bar["c"] for bar in adjusted] == pytest.approx([120.0, 121.0])
+    assert [bar["v"] for bar in adjusted] == pytest.approx([1000.0, 1000.0])
+
+    raw = bar_store.get_bars("NVDA", "2024-06-01", "2024-06-30", adjusted=False)
+    assert [bar["c"] for bar in raw] == [1200.0, 121.0]
+
+
+def test_get_adjustments_filters_tickers(bar_store):
+    bar_store.put_adjustments([
+        ("NVDA", "2024-06-10", "split", 0.1),
+        ("AAPL", "2020-08-31", "split", 0.25),
+        ("AAPL", "2024-05-10", "dividend", 0.99)
+    ])
+    assert bar_store.get_adjustments(["AAPL"]) == {"AAPL": [("2020-08-31", "split", 0.25)]}
+    assert bar_store.get_adjustments(["AAPL"], dividends=True)["AAPL"][-1] == ("2024-05-10", "dividend", 0.99)
+    assert bar_store.get_adjustments(["MSFT"]) == {}
+    assert set(bar_store.get_adjustments()) == {"AAPL", "NVDA"}
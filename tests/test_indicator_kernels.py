@@ -0,0 +1,97 @@
+# tests/test_indicator_kernels.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+from services.intelligence.strategies.volatility_strategy import VolatilityStrategy
+from services.intelligence.volatility_strategy import VolatilityStrategy as LegacyVolatilityStrategy
+from utils import jit_kernels
+from utils.bars import Bars
+from utils.indicators import ewm_mean, ewm_recursive, rolling_extreme, true_range, wilder_atr_last
+from utils.ti_utils import calculate_atr
+
+DAY_MS = 86_400_000
+BACKENDS = [
+    "numpy",
+    pytest.param("numba", marks=pytest.mark.skipif(not jit_kernels.HAS_NUMBA, reason="numba not installed"))
+]
+
+
+def generate_bars(seed: int, days: int) -> Bars:
+    """Random-walk daily bars starting 2024-01-02"""
+    rng = np.random.default_rng(seed)
+    close = 20 + np.cumsum(rng.normal(0, 0.5, days)).clip(-19)
+    spread = np.abs(rng.normal(0, 0.4, (2, days)))
+    return Bars(
+        t=1704171600000 + np.arange(days) * DAY_MS,
+        o=close + rng.normal(0, 0.2, days),
+        h=close + spread[0],
+        l=close - spread[1],
+        c=close,
+        v=rng.integers(10_000, 5_000_000, days).astype(np.float64)
+    )
+
+
+def loop_atr(results: list, period: int = 14) -> float:
+    """The per-bar loop VolatilityStrategy._calculate_atr used before the true_range kernel"""
+    trs = []
+    for i in range(1, min(len(results), period + 1)):
+        high, low, prev_close = results[i]['h'], results[i]['l'], results[i - 1]['c']
+        trs.append(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+    return sum(trs) / len(trs) if trs else 0.0
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    configured = jit_kernels.backend_name()
+    jit_kernels.set_backend(request.param)
+    yield request.param
+    jit_kernels.set_backend(configured)
+
+
+@pytest.fixture(params=[(1, 180), (2, 30), (3, 1000)], ids=["180-bars", "30-bars", "1000-bars"])
+def bars(request):
+    return generate_bars(*request.param)
+
+
+def test_ewm_mean_matches_pandas(backend, bars):
+    expected = pd.Series(bars.c).ewm(span=12).mean().to_numpy()
+    np.testing.assert_allclose(ewm_mean(bars.c, 12), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_wilder_smoothing_matches_pandas(backend, bars):
+    expected = pd.Series(bars.c).ewm(alpha=1.0 / 14, adjust=False, min_periods=14).mean().to_numpy()
+    np.testing.assert_allclose(ewm_recursive(bars.c, 1.0 / 14, 14), expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("maximum", [True, False], ids=["max", "min"])
+def test_rolling_extreme_matches_pandas(backend, bars, maximum):
+    series = pd.Series(bars.h if maximum else bars.l).rolling(14)
+    expected = (series.max() if maximum else series.min()).to_numpy()
+    values = rolling_extreme(bars.h if maximum else bars.l, 14, maximum=maximum)
+    np.testing.assert_allclose(values, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_true_range_matches_pandas(backend, bars):
+    df = bars.to_frame()
+    prev_close = df['Close'].shift()
+    expected = pd.concat([df['High'] - df['Low'], (df['High'] - prev_close).abs(),
+                          (df['Low'] - prev_close).abs()], axis=1).max(axis=1).to_numpy()
+    np.testing.assert_allclose(true_range(bars.h, bars.l, bars.c), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_wilder_atr_matches_ta(backend, bars):
+    df = bars.to_frame()
+    expected = ta.volatility.AverageTrueRange(df['High'], df['Low'], df['Close'], window=14).average_true_range().iloc[-1]
+    assert wilder_atr_last(bars.h, bars.l, bars.c) == pytest.approx(expected, rel=1e-9)
+
+
+@pytest.mark.parametrize("days", [1, 2, 10, 15, 60])
+def test_volatility_strategy_atr_matches_loop(backend, days):
+    results = generate_bars(days, days).to_results()
+    for strategy in (VolatilityStrategy(), LegacyVolatilityStrategy()):
+        assert strategy._calculate_atr(results) == pytest.approx(loop_atr(results), rel=1e-12)
+    if days >= 14:
+        assert calculate_atr(results, 14) == pytest.approx(loop_atr(results, 13), rel=1e-12)
@@ -0,0 +1,45 @@
+# tests/test_market_snapshot.py
+
+import json
+
+import pytest
+
+from utils.market_snapshot import MarketSnapshot
+
+PAYLOAD = {
+    "status": "OK",
+    "tickers": [
+        {"ticker": "AAA", "todaysChange": 1.5, "todaysChangePerc": 3.0, "updated": 1718400000000000000,
+         "day": {"o": 50.0, "h": 52.0, "l": 49.5, "c": 51.5, "v": 12345, "vw": 51.1},
+         "prevDay": {"o": 49.0, "h": 50.5, "l": 48.0, "c": 50.0, "v": 23456, "vw": 49.7},
+         "lastTrade": {"p": 51.5, "s": 100, "t": 1718399999000000000}},
+        {"ticker": "BBB", "todaysChange": -0.25, "todaysChangePerc": -1.0,
+         "day": {"o": 25.0, "h": 25.5, "l": 24.5, "c": 24.75, "v": 1000.5, "vw": 24.9},
+         "prevDay": {"c": 25.0}}
+    ]
+}
+
+
+@pytest.fixture(params=["payload", "results"])
+def snapshot(request):
+    if request.param == "payload":
+        return MarketSnapshot.from_payload(json.dumps(PAYLOAD).encode())
+    return MarketSnapshot.from_results(PAYLOAD["tickers"], PAYLOAD["status"])
+
+
+def test_rows_keep_share_counts_as_sent(snapshot):
+    aaa, bbb = snapshot.rows()
+    assert aaa["volume"] == 12345 and type(aaa["volume"]) is int
+    assert type(aaa["prev_day"]["volume"]) is int and type(aaa["last_trade"]["size"]) is int
+    assert type(aaa["last_trade"]["timestamp"]) is int
+    # Fractional volumes pass through, missing values are 0
+    assert bbb["volume"] == 1000.5
+    assert bbb["prev_day"]["volume"] == 0 and type(bbb["prev_day"]["volume"]) is int
+    assert bbb["last_trade"] == {"price": 0.0, "size": 0, "timestamp": 0}
+
+
+def test_statistics_volumes(snapshot):
+    stats = snapshot.statistics()
+    assert stats["total_volume"] == 13345.5
+    assert [(mover["ticker"], mover["volume"]) for mover in stats["top_gainers"]] == [("AAA", 12345), ("BBB", 1000.5)]
+    assert type(stats["top_gainers"][0]["volume"]) is int
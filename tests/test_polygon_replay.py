@@ -0,0 +1,97 @@
+# tests/test_polygon_replay.py
+
+import json
+import os
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+import utils.clock as clock
+import utils.polygon_replay as polygon_replay
+from tests.conftest import make_bar, use_bar_store
+from utils.polygon_client import get_price_history
+from utils.polygon_replay import CassetteStore, RecordingAdapter, ReplayAdapter, ReplayPolicy
+from utils.polygon_session import polygon_session
+from utils.trading_calendar import sessions_between
+
+RECORDED_AT = "2024-06-14T21:30:00+00:00"
+
+
+def fake_polygon(adapter, request, **kwargs):
+    """Stand-in for the live HTTPAdapter.send: daily aggregates for any range, no splits, 429 on demand"""
+    response = requests.Response()
+    response.url = request.url
+    response.request = request
+    path = urlsplit(request.url).path
+    if "rate_limited" in path:
+        response.status_code, body = 429, '{"status":"ERROR"}'
+    elif path.startswith("/v2/aggs/ticker/"):
+        start_date, end_date = path.split("/")[-2:]
+        bars = [make_bar(day, 100.0 + i) for i, day in enumerate(sessions_between(start_date, end_date))]
+        response.status_code, body = 200, json.dumps({"results": bars})
+    else:
+        response.status_code, body = 200, '{"results":[]}'
+    response._content = body.encode("utf-8")
+    return response
+
+
+def mount(monkeypatch, adapter):
+    session = requests.Session()
+    session.mount("https://", adapter)
+    monkeypatch.setattr(polygon_session, "_session", session)
+
+
+@pytest.fixture
+def cassettes(tmp_path, monkeypatch):
+    store = CassetteStore(str(tmp_path / "cassettes"))
+    monkeypatch.setattr(HTTPAdapter, "send", fake_polygon)
+    return store
+
+
+def record(cassettes, tmp_path, monkeypatch):
+    """Record get_price_history with the clock pinned to RECORDED_AT"""
+    monkeypatch.setattr(polygon_replay, "REPLAY_NOW", RECORDED_AT)
+    monkeypatch.setattr(clock, "PINNED_NOW", datetime.fromisoformat(RECORDED_AT))
+    use_bar_store(monkeypatch, str(tmp_path / "record.db"))
+    mount(monkeypatch, RecordingAdapter(cassettes))
+    return get_price_history("AAPL", 30)
+
+
+def start_replay(cassettes, tmp_path, monkeypatch, pin: bool = True):
+    """Replay mode on a later day: fresh bar store, and the clock resolved as at startup"""
+    monkeypatch.setattr(polygon_replay, "REPLAY_NOW", None)
+    monkeypatch.setattr(clock, "REPLAY_NOW", None)
+    monkeypatch.setattr(clock, "POLYGON_MODE", "replay" if pin else "live")
+    monkeypatch.setattr(clock, "CassetteStore", lambda: cassettes)
+    monkeypatch.setattr(clock, "PINNED_NOW", clock._pinned_now())
+    use_bar_store(monkeypatch, str(tmp_path / "replay.db"))
+    mount(monkeypatch, ReplayAdapter(cassettes, ReplayPolicy(latency_ms=0, rate_limit_rate=0)))
+
+
+def test_replay_on_a_later_day_serves_the_recording(cassettes, tmp_path, monkeypatch):
+    recorded = record(cassettes, tmp_path, monkeypatch)
+    assert recorded and cassettes.recorded_at() == RECORDED_AT
+
+    start_replay(cassettes, tmp_path, monkeypatch)
+    assert clock.today().isoformat() == "2024-06-14"
+    assert get_price_history("AAPL", 30) == recorded
+
+
+def test_replay_without_the_recorded_clock_misses(cassettes, tmp_path, monkeypatch):
+    record(cassettes, tmp_path, monkeypatch)
+
+    # Today's date windows were never recorded
+    start_replay(cassettes, tmp_path, monkeypatch, pin=False)
+    with pytest.raises(Exception, match="No recorded response"):
+        get_price_history("AAPL", 30)
+
+
+def test_transient_errors_are_not_recorded(cassettes, monkeypatch):
+    mount(monkeypatch, RecordingAdapter(cassettes))
+    assert polygon_session.get("/v2/rate_limited").status_code == 429
+    assert polygon_session.get("/v3/reference/tickers").status_code == 200
+    recorded = [name for name in os.listdir(cassettes.cassette_dir) if name != polygon_replay.CLOCK_FILE]
+    assert len(recorded) == 1
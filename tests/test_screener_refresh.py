@@ -0,0 +1,185 @@
+# tests/test_screener_refresh.py
+
+import numpy as np
+import pytest
+
+import services.grouped_daily_service as grouped_daily_service
+import services.stock_screener_service as screener
+import utils.corporate_actions as corporate_actions
+from tests.conftest import make_bar
+from utils.corporate_actions import sync_corporate_actions
+from utils.bar_store import bar_date
+from utils.indicator_state import IndicatorStateStore
+from utils.screener_cache import ScreenerCacheStore
+from utils.trading_calendar import session_window_start, sessions_between
+
+TICKERS = ["AAA", "BBB", "CCC"]
+SESSIONS = sessions_between("2023-06-01", "2024-08-30")
+
+# Fields a streamed state reproduces exactly (its MACD EMAs run over the whole streamed history)
+EXACT_FIELDS = ("current_price", "performance_1m", "performance_3m", "performance_6m", "adr_percentage",
+                "rsi", "stochastic_oscillator", "atr", "volume_avg_30d")
+REBUILT_FIELDS = EXACT_FIELDS + ("macd", "macd_signal")
+
+
+class FakeMarket:
+    """Grouped daily payloads and splits served in place of Polygon"""
+
+    def __init__(self, seed: int = 7):
+        rng = np.random.RandomState(seed)
+        self.closes = {
+            ticker: 50 * np.exp(np.cumsum(rng.normal(0, 0.02, len(SESSIONS))))
+            for ticker in TICKERS
+        }
+        self.halted = {}  # {ticker: first session without a bar}
+        self.splits = []
+        self.requested_days = []
+        self.failing = set()  # Sessions whose request errors
+
+    def grouped_daily(self, day: str):
+        self.requested_days.append(day)
+        if day in self.failing:
+            raise Exception("[Polygon] Failed to fetch grouped daily bars: 502")
+        if day not in SESSIONS:
+            return []  # Before any of the tickers listed
+        index = SESSIONS.index(day)
+        bars = []
+        for ticker, closes in self.closes.items():
+            if day >= self.halted.get(ticker, "9999"):
+                continue
+            bars.append(make_bar(day, float(closes[index]), 1000.0 + index, ticker=ticker))
+        return bars
+
+    def get_splits(self, start_date: str, end_date: str):
+        return [split for split in self.splits if start_date <= split["execution_date"] <= end_date]
+
+    def split(self, ticker: str, ex_date: str, ratio: int):
+        """A ratio-for-1 split: raw prices from ex_date on drop by the ratio"""
+        self.splits.append({"ticker": ticker, "execution_date": ex_date, "split_from": 1, "split_to": ratio})
+        index = SESSIONS.index(ex_date)
+        self.closes[ticker][index:] /= ratio
+
+
+@pytest.fixture
+def market(bar_store, monkeypatch):
+    market = FakeMarket()
+    monkeypatch.setattr(grouped_daily_service, "get_grouped_daily", market.grouped_daily)
+    monkeypatch.setattr(corporate_actions, "get_splits", market.get_splits)
+    # Sync exactly the windows asked for, as if each refresh ran on its end date
+    monkeypatch.setattr(corporate_actions, "latest_closed_session", lambda: SESSIONS[0])
+    return market
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    state_store = IndicatorStateStore(str(tmp_path / "indicator_state.db"))
+    cache_store = ScreenerCacheStore(str(tmp_path / "screener_cache.db"))
+    monkeypatch.setattr(screener, "indicator_state_store", state_store)
+    monkeypatch.setattr(screener, "screener_cache_store", cache_store)
+    return state_store, cache_store
+
+
+@pytest.fixture
+def panel_loads(monkeypatch):
+    """(sorted tickers, start_date, end_date) of every panel the refresh loads"""
+    loads = []
+
+    def load_price_panel(tickers, start_date, end_date):
+        loads.append((sorted(tickers), start_date, end_date))
+        return grouped_daily_service.load_price_panel(tickers, start_date, end_date)
+
+    monkeypatch.setattr(screener, "load_price_panel", load_price_panel)
+    return loads
+
+
+def recompute(tickers, end_date, tmp_path, monkeypatch):
+    """Rows a refresh produces from scratch (every state bootstrapped from the window)"""
+    monkeypatch.setattr(screener, "indicator_state_store", IndicatorStateStore(str(tmp_path / "fresh_state.db")))
+    return screener.refresh_screener_cache(tickers, end_date)
+
+
+def assert_rows_match(rows, expected, fields=EXACT_FIELDS):
+    assert set(rows) == set(expected)
+    for ticker in rows:
+        for field in fields:
+            assert rows[ticker][field] == pytest.approx(expected[ticker][field]), (ticker, field)
+
+
+def test_incremental_refresh_matches_recompute(market, stores, tmp_path, monkeypatch):
+    screener.refresh_screener_cache(TICKERS, "2024-06-03")
+    market.requested_days.clear()
+
+    rows = screener.refresh_screener_cache(TICKERS, "2024-06-07")
+    # Only the new sessions were requested
+    assert sorted(market.requested_days) == sessions_between("2024-06-04", "2024-06-07")
+    assert {row["as_of"] for row in rows.values()} == {"2024-06-07"}
+    assert_rows_match(rows, recompute(TICKERS, "2024-06-07", tmp_path, monkeypatch))
+
+
+def test_state_left_out_of_refreshes_is_rebuilt(market, stores, panel_loads, tmp_path, monkeypatch):
+    screener.refresh_screener_cache(["AAA", "BBB"], "2024-06-03")
+    screener.refresh_screener_cache(["AAA"], "2024-06-14")
+    panel_loads.clear()
+
+    # BBB missed 2024-06-04..14 - it is rebuilt, and doesn't hold AAA's incremental load back
+    rows = screener.refresh_screener_cache(["AAA", "BBB"], "2024-06-21")
+    assert panel_loads == [
+        (["AAA"], "2024-06-15", "2024-06-21"),
+        (["BBB"], session_window_start("2024-06-21", screener.DEFAULT_HISTORY_DAYS), "2024-06-21")
+    ]
+    expected = recompute(["AAA", "BBB"], "2024-06-21", tmp_path, monkeypatch)
+    assert_rows_match(rows, expected)
+    assert_rows_match({"BBB": rows["BBB"]}, {"BBB": expected["BBB"]}, REBUILT_FIELDS)
+
+
+def test_state_older_than_window_is_rebuilt(market, stores, panel_loads, tmp_path, monkeypatch):
+    screener.refresh_screener_cache(TICKERS, "2023-12-01")
+    panel_loads.clear()
+
+    rows = screener.refresh_screener_cache(TICKERS, "2024-08-30")
+    assert panel_loads == [(TICKERS, session_window_start("2024-08-30", screener.DEFAULT_HISTORY_DAYS), "2024-08-30")]
+    assert_rows_match(rows, recompute(TICKERS, "2024-08-30", tmp_path, monkeypatch), REBUILT_FIELDS)
+
+
+def test_halted_ticker_gets_no_row(market, stores, tmp_path, monkeypatch):
+    screener.refresh_screener_cache(TICKERS, "2024-06-03")
+    market.halted["CCC"] = "2024-06-05"
+
+    rows = screener.refresh_screener_cache(TICKERS, "2024-06-07")
+    assert set(rows) == {"AAA", "BBB"}
+    assert {row["as_of"] for row in rows.values()} == {"2024-06-07"}
+
+    # Trading resumes: nothing was missed, so the state simply continues
+    market.halted.clear()
+    rows = screener.refresh_screener_cache(TICKERS, "2024-06-14")
+    assert rows["CCC"]["as_of"] == "2024-06-14"
+
+
+def test_split_synced_by_another_caller_rebuilds_state(market, stores, tmp_path, monkeypatch):
+    screener.refresh_screener_cache(TICKERS, "2024-06-03")
+    market.split("BBB", "2024-06-05", 4)
+
+    # Someone else syncs first and is the only one told about the split
+    assert sync_corporate_actions("2024-06-01", "2024-06-07") == {"BBB"}
+
+    rows = screener.refresh_screener_cache(TICKERS, "2024-06-07")
+    expected = recompute(TICKERS, "2024-06-07", tmp_path, monkeypatch)
+    assert_rows_match(rows, expected)
+    assert_rows_match({"BBB": rows["BBB"]}, {"BBB": expected["BBB"]}, REBUILT_FIELDS)
+    assert rows["BBB"]["performance_1m"] > -50  # Adjusted history, not a 75% drop
+
+
+def test_failed_session_is_refetched_before_states_advance(market, stores, tmp_path, monkeypatch):
+    screener.refresh_screener_cache(TICKERS, "2024-06-03")
+    market.failing.add("2024-06-05")
+
+    with pytest.raises(RuntimeError, match="2024-06-05"):
+        screener.refresh_screener_cache(TICKERS, "2024-06-07")
+    # No state streamed past the missing session
+    assert {bar_date(state.last_t) for state in stores[0].get_states(TICKERS).values()} == {"2024-06-03"}
+
+    market.failing.clear()
+    market.requested_days.clear()
+    rows = screener.refresh_screener_cache(TICKERS, "2024-06-07")
+    assert market.requested_days == ["2024-06-05"]
+    assert_rows_match(rows, recompute(TICKERS, "2024-06-07", tmp_path, monkeypatch))
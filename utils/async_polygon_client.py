@@ -0,0 +1,167 @@
+# utils/async_polygon_client.py
+
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
+
+import httpx
+
+from utils.bar_store import bar_store
+from utils.corporate_actions import sync_corporate_actions
+from utils.fast_json import response_json
+from utils.polygon_client import plan_daily_fetch, store_daily_fetch
+from utils.polygon_session import (
+    POLYGON_BASE_URL,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    polygon_session
+)
+from utils.polygon_replay import build_async_transport
+from utils.rate_limiter import polygon_rate_limiter
+from utils.single_flight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Bulk fetch configuration
+DEFAULT_MAX_CONCURRENCY = 100  # Requests kept in flight at once
+MAX_RETRIES = 3  # Retries on HTTP 429 before giving up on a ticker
+
+
+class AsyncPolygonClient:
+    """
+    Asyncio counterpart to utils/polygon_client built on httpx.
+
+    A single event loop can keep hundreds of requests in flight, which a
+    5-10 worker thread pool cannot. Concurrency is bounded by a semaphore
+    and by the size of the connection pool, and throughput by the same
+    process-wide rate limiter the synchronous client uses. Fetched bars go into the same
+    local bar store as the synchronous client, so either one can serve
+    ranges the other has downloaded.
+
+    Use as an async context manager:
+
+        async with AsyncPolygonClient() as client:
+            bars = await client.fetch_price_history("AAPL", "2024-01-01", "2024-06-30")
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, api_key: Optional[str] = None):
+        self.max_concurrency = max_concurrency
+        self._api_key = api_key
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = AsyncSingleFlight()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._api_key or polygon_session.api_key
+
+    async def __aenter__(self) -> "AsyncPolygonClient":
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency
+        )
+        self._client = httpx.AsyncClient(
+            base_url=POLYGON_BASE_URL,
+            limits=limits,
+            transport=build_async_transport(limits),
+            timeout=httpx.Timeout(DEFAULT_READ_TIMEOUT, connect=DEFAULT_CONNECT_TIMEOUT)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+
+    async def get(self, url: str, params: Optional[dict] = None) -> httpx.Response:
+        """
+        GET a Polygon endpoint, backing off and retrying on HTTP 429.
+        Concurrent identical requests share one HTTP call.
+        """
+        params = dict(params or {})
+        params.setdefault("apiKey", self.api_key)
+
+        key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+        return await self._in_flight.do(key, lambda: self._send(url, params))
+
+    async def _send(self, url: str, params: dict) -> httpx.Response:
+        async with self._semaphore:
+            for attempt in range(MAX_RETRIES + 1):
+                await polygon_rate_limiter.acquire_async()
+                response = await self._client.get(url, params=params)
+                if response.status_code != 429 or attempt == MAX_RETRIES:
+                    return response
+                await asyncio.sleep(2 ** attempt)
+        return response
+
+    async def fetch_price_history(self, ticker: str, start_date: str, end_date: str) -> List[dict]:
+        """Get daily bars for [start_date, end_date], going to Polygon only for the gaps the bar store lacks"""
+        # Planning may sync corporate actions (a blocking request and limiter wait) - keep it off the event loop
+        ranges = await asyncio.to_thread(plan_daily_fetch, ticker, start_date, end_date)
+        for fetch_start, fetch_end in ranges:
+            url = f"/v2/aggs/ticker/{ticker}/range/1/day/{fetch_start}/{fetch_end}"
+            response = await self.get(url, params={"adjusted": "false", "sort": "asc"})
+            if response.status_code != 200:
+                raise Exception(f"[Polygon] Failed to fetch price history: {response.text}")
+
+            bars = response_json(response).get("results", [])
+            store_daily_fetch(ticker, bars, fetch_start, fetch_end)
+            if (fetch_start, fetch_end) == (start_date, end_date):
+                return bar_store.adjust_results(ticker, bars)
+
+        return bar_store.get_bars(ticker, start_date, end_date)
+
+
+async def fetch_many_price_histories(
+    tickers: List[str],
+    start: str,
+    end: str,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> AsyncIterator[Tuple[str, Optional[List[dict]]]]:
+    """
+    Fetch daily bars for many tickers concurrently, yielding (ticker, bars)
+    pairs as each request completes. bars is None when the fetch failed.
+
+    Args:
+        tickers: Ticker symbols to fetch
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format
+        max_concurrency: Maximum number of requests in flight at once
+    """
+    # Sync split factors once up front, so the per-ticker planning steps find them synced
+    # instead of racing to request the same range
+    await asyncio.to_thread(sync_corporate_actions, start, end)
+
+    async with AsyncPolygonClient(max_concurrency=max_concurrency) as client:
+
+        async def fetch_one(ticker: str) -> Tuple[str, Optional[List[dict]]]:
+            try:
+                return ticker, await client.fetch_price_history(ticker, start, end)
+            except Exception as e:
+                logger.warning(f"⚠️  Async fetch failed for {ticker}: {e}")
+                return ticker, None
+
+        for next_done in asyncio.as_completed([fetch_one(t) for t in tickers]):
+            yield await next_done
+
+
+def prefetch_price_histories(
+    tickers: List[str],
+    start: str,
+    end: str,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> int:
+    """
+    Blocking helper that warms the bar store for [start, end] across many
+    tickers. Must not be called from inside a running event loop.
+
+    Returns:
+        Number of tickers fetched successfully
+    """
+    async def run() -> int:
+        fetched = 0
+        async for _, bars in fetch_many_price_histories(tickers, start, end, max_concurrency):
+            if bars is not None:
+                fetched += 1
+        return fetched
+
+    return asyncio.run(run())
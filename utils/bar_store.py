@@ -0,0 +1,483 @@
+# utils/bar_store.py
+
+import math
+import os
+import sqlite3
+import threading
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils import clock
+from utils.bars import Bars, panel_from_rows
+from utils.trading_calendar import sessions_between
+
+# Local bar store configuration
+BAR_STORE_FILE = os.getenv("MIDAS_BAR_STORE_FILE", "cache/bar_store.db")
+# Version 2 stores raw (unadjusted) bars; older files held split-adjusted bars and are rebuilt
+BAR_STORE_VERSION = 2
+
+DAY_MS = 86_400_000
+
+
+def bar_date(timestamp_ms: int) -> str:
+    """Trading date (YYYY-MM-DD) of a Polygon daily bar timestamp"""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def shift_date(day: str, days: int) -> str:
+    """Add days to a YYYY-MM-DD date string"""
+    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def apply_adjustments(bars: Bars, adjustments: List[Tuple[str, str, float]]) -> Bars:
+    """
+    Scale raw bars by (ex_date, kind, factor) corporate actions: each bar's
+    prices take the product of the factors whose ex_date is after it, and
+    its volume is divided by the split part of that product.
+    """
+    ex_days = np.array([np.datetime64(ex_date, "D").astype(np.int64) for ex_date, _, _ in adjustments])
+    factors = np.array([factor for _, _, factor in adjustments])
+    is_split = np.array([kind == "split" for _, kind, _ in adjustments])
+    order = np.argsort(ex_days, kind="stable")
+    ex_days, factors, is_split = ex_days[order], factors[order], is_split[order]
+
+    # Suffix products: entry i holds the product of factors i.. (events on or after it)
+    price_suffix = np.append(np.cumprod(factors[::-1])[::-1], 1.0)
+    split_suffix = np.append(np.cumprod(np.where(is_split, factors, 1.0)[::-1])[::-1], 1.0)
+    first_after = np.searchsorted(ex_days, bars.t // DAY_MS, side="right")
+    price_factor = price_suffix[first_after]
+    volume_factor = split_suffix[first_after]
+
+    return Bars(bars.t, bars.o * price_factor, bars.h * price_factor, bars.l * price_factor,
+                bars.c * price_factor, bars.v / volume_factor, bars.vw * price_factor, bars.n)
+
+
+def _has_session(start_date: str, end_date: str) -> bool:
+    try:
+        return bool(sessions_between(start_date, end_date))
+    except ValueError:
+        return True  # Outside the trading calendar - assume it may hold bars
+
+
+class BarStore:
+    """
+    On-disk store of daily OHLCV bars keyed by (ticker, trading date).
+
+    Bars are kept in a clustered SQLite table so a ticker's history is read
+    back with a single range scan. A separate coverage table records which
+    date ranges have already been requested from Polygon for each ticker, so
+    weekends, holidays and pre-IPO dates are not re-requested just because
+    they have no bars. Dates ingested through the grouped daily endpoint
+    (every traded U.S. stock for one date) count as covered for the tickers
+    that appear in them.
+
+    Bars are stored as traded (Polygon adjusted=false). Splits and dividends
+    live in a small per-ticker factor table and are applied when bars are
+    read, so a split only adds a factor row instead of invalidating every
+    stored window of the ticker.
+    """
+
+    def __init__(self, db_path: str = BAR_STORE_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            if not self._initialized:
+                self._create_tables(conn)
+                self._initialized = True
+        return conn
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < BAR_STORE_VERSION:
+            # Bars cached by older versions are split-adjusted - drop them (and their coverage) to refetch raw
+            for table in ("daily_bars", "bar_coverage", "grouped_days"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"PRAGMA user_version = {BAR_STORE_VERSION}")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS daily_bars (
+                ticker TEXT NOT NULL,
+                date TEXT NOT NULL,
+                t INTEGER NOT NULL,
+                o REAL,
+                h REAL,
+                l REAL,
+                c REAL,
+                v REAL,
+                vw REAL,
+                n INTEGER,
+                PRIMARY KEY (ticker, date)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS bar_coverage (
+                ticker TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                PRIMARY KEY (ticker, start_date)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS grouped_days (
+                date TEXT PRIMARY KEY,
+                ticker_count INTEGER,
+                fetched_at TEXT
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS adjustment_factors (
+                ticker TEXT NOT NULL,
+                ex_date TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                factor REAL NOT NULL,
+                PRIMARY KEY (ticker, ex_date, kind)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS adjustment_sync (
+                kind TEXT PRIMARY KEY,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_bars_date ON daily_bars (date)")
+        conn.commit()
+
+    def put_adjustments(self, rows: List[Tuple[str, str, str, float]]) -> Set[str]:
+        """
+        Store (ticker, ex_date, kind, factor) corporate actions. kind is
+        'split' or 'dividend'; factor multiplies the prices of bars dated
+        before ex_date (a 4-for-1 split is 0.25, a 1% dividend 0.99).
+
+        Returns:
+            Tickers whose factors changed
+        """
+        if not rows:
+            return set()
+        conn = self._connect()
+        with self._write_lock:
+            changed = set()
+            for ticker, ex_date, kind, factor in rows:
+                stored = conn.execute(
+                    "SELECT factor FROM adjustment_factors WHERE ticker = ? AND ex_date = ? AND kind = ?",
+                    (ticker, ex_date, kind)
+                ).fetchone()
+                if stored is None or not math.isclose(stored[0], factor):
+                    changed.add(ticker)
+            conn.executemany(
+                "INSERT OR REPLACE INTO adjustment_factors (ticker, ex_date, kind, factor) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+        return changed
+
+    def get_adjustment_sync(self, kind: str) -> Optional[Tuple[str, str]]:
+        """(start_date, end_date) range of corporate actions of this kind already pulled from Polygon"""
+        conn = self._connect()
+        return conn.execute(
+            "SELECT start_date, end_date FROM adjustment_sync WHERE kind = ?", (kind,)
+        ).fetchone()
+
+    def mark_adjustment_sync(self, kind: str, start_date: str, end_date: str):
+        """Extend the synced range of a corporate action kind to include [start_date, end_date]"""
+        synced = self.get_adjustment_sync(kind)
+        if synced is not None:
+            start_date, end_date = min(start_date, synced[0]), max(end_date, synced[1])
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute(
+                "INSERT OR REPLACE INTO adjustment_sync (kind, start_date, end_date) VALUES (?, ?, ?)",
+                (kind, start_date, end_date)
+            )
+            conn.commit()
+
+    def get_adjustments(self, tickers: Optional[Iterable[str]] = None,
+                        dividends: bool = False) -> Dict[str, List[Tuple[str, str, float]]]:
+        """{ticker: [(ex_date, kind, factor), ...] oldest first} for the given tickers (default: all)"""
+        kinds = ("split", "dividend") if dividends else ("split",)
+        kind_filter = f"kind IN ({', '.join('?' * len(kinds))})"
+        conn = self._connect()
+        if tickers is None:
+            rows = conn.execute(
+                f"SELECT ticker, ex_date, kind, factor FROM adjustment_factors WHERE {kind_filter} ORDER BY ticker, ex_date",
+                kinds
+            ).fetchall()
+        else:
+            # Primary key lookups per ticker, chunked to stay under SQLite's bound-parameter limit
+            tickers = list(tickers)
+            rows = []
+            for i in range(0, len(tickers), 500):
+                chunk = tickers[i:i + 500]
+                rows.extend(conn.execute(
+                    f"SELECT ticker, ex_date, kind, factor FROM adjustment_factors "
+                    f"WHERE ticker IN ({','.join('?' * len(chunk))}) AND {kind_filter} ORDER BY ticker, ex_date",
+                    (*chunk, *kinds)
+                ).fetchall())
+        adjustments: Dict[str, List[Tuple[str, str, float]]] = {}
+        for ticker, ex_date, kind, factor in rows:
+            adjustments.setdefault(ticker, []).append((ex_date, kind, factor))
+        return adjustments
+
+    def last_close_before(self, ticker: str, day: str) -> Optional[float]:
+        """Raw close of the ticker's latest stored bar dated before day"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT c FROM daily_bars WHERE ticker = ? AND date < ? ORDER BY date DESC LIMIT 1",
+            (ticker, day)
+        ).fetchone()
+        return row[0] if row else None
+
+    def adjust(self, ticker: str, bars: Bars, dividends: bool = False,
+               adjustments: Optional[List[Tuple[str, str, float]]] = None) -> Bars:
+        """
+        Apply the stored factors to raw bars. Prices of a bar are multiplied
+        by every factor whose ex_date is after the bar's date; volume is
+        divided by the split factors, matching Polygon's adjusted=true.
+        """
+        if adjustments is None:
+            adjustments = self.get_adjustments([ticker], dividends).get(ticker, [])
+        if not adjustments or not len(bars):
+            return bars
+        return apply_adjustments(bars, adjustments)
+
+    def adjust_results(self, ticker: str, results: List[dict]) -> List[dict]:
+        """adjust() for a list of Polygon bar dicts, e.g. a raw fetch returned straight to the caller"""
+        adjustments = self.get_adjustments([ticker]).get(ticker, [])
+        if not adjustments or not results:
+            return results
+        return apply_adjustments(Bars.from_results(results), adjustments).to_results()
+
+    def get_bars(self, ticker: str, start_date: str, end_date: str, adjusted: bool = True) -> List[dict]:
+        """Return stored bars for ticker between start_date and end_date (inclusive), oldest first"""
+        adjustments = self.get_adjustments([ticker]).get(ticker) if adjusted else None
+        if adjustments:
+            bars = self.get_bar_arrays(ticker, start_date, end_date, adjusted=False)
+            return self.adjust(ticker, bars, adjustments=adjustments).to_results()
+
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT t, o, h, l, c, v, vw, n FROM daily_bars "
+            "WHERE ticker = ? AND date >= ? AND date <= ? ORDER BY date",
+            (ticker, start_date, end_date)
+        ).fetchall()
+
+        bars = []
+        for t, o, h, l, c, v, vw, n in rows:
+            bar = {"t": t, "o": o, "h": h, "l": l, "c": c, "v": v}
+            if vw is not None:
+                bar["vw"] = vw
+            if n is not None:
+                bar["n"] = n
+            bars.append(bar)
+        return bars
+
+    def get_bar_arrays(self, ticker: str, start_date: str, end_date: str, adjusted: bool = True,
+                       dividends: bool = False) -> Bars:
+        """
+        Same as get_bars, but read straight into NumPy arrays without building per-bar dicts.
+
+        Args:
+            adjusted: Apply split factors (Polygon's adjusted=true); False returns bars as traded
+            dividends: Also apply dividend factors (total-return prices)
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT t, o, h, l, c, v, vw, n FROM daily_bars "
+            "WHERE ticker = ? AND date >= ? AND date <= ? ORDER BY date",
+            (ticker, start_date, end_date)
+        ).fetchall()
+        bars = Bars.from_rows(rows)
+        return self.adjust(ticker, bars, dividends) if adjusted else bars
+
+    def put_bars(self, ticker: str, bars: List[dict]):
+        """Insert or replace bars for a ticker"""
+        if not bars:
+            return
+        rows = [
+            (ticker, bar_date(b["t"]), b["t"], b.get("o"), b.get("h"), b.get("l"),
+             b.get("c"), b.get("v"), b.get("vw"), b.get("n"))
+            for b in bars if "t" in b
+        ]
+        conn = self._connect()
+        with self._write_lock:
+            conn.executemany(
+                "INSERT OR REPLACE INTO daily_bars (ticker, date, t, o, h, l, c, v, vw, n) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+    def get_panel(self, tickers: Iterable[str], start_date: str, end_date: str, adjusted: bool = True,
+                  dividends: bool = False) -> Dict[str, Bars]:
+        """
+        Return stored bars for many tickers at once as {ticker: Bars (oldest first)}.
+        Reads the whole date range in one scan instead of one query per ticker;
+        the factor table is read once for all of them.
+        """
+        wanted = set(tickers)
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT ticker, t, o, h, l, c, v, vw, n FROM daily_bars "
+            "WHERE date >= ? AND date <= ? ORDER BY ticker, date",
+            (start_date, end_date)
+        ).fetchall()
+        panel = panel_from_rows([row for row in rows if row[0] in wanted])
+        if adjusted:
+            adjustments = self.get_adjustments(panel, dividends)
+            for ticker, ticker_adjustments in adjustments.items():
+                panel[ticker] = apply_adjustments(panel[ticker], ticker_adjustments)
+        return panel
+
+    def put_grouped_day(self, day: str, results: List[dict]):
+        """
+        Store one date of grouped daily bars (Polygon's `T` field holds the
+        ticker) and, once the date is final, record it as ingested.
+        """
+        rows = [
+            (r["T"], day, r["t"], r.get("o"), r.get("h"), r.get("l"),
+             r.get("c"), r.get("v"), r.get("vw"), r.get("n"))
+            for r in results if "T" in r and "t" in r
+        ]
+        conn = self._connect()
+        with self._write_lock:
+            conn.executemany(
+                "INSERT OR REPLACE INTO daily_bars (ticker, date, t, o, h, l, c, v, vw, n) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if day <= self.last_closed_date():
+                conn.execute(
+                    "INSERT OR REPLACE INTO grouped_days (date, ticker_count, fetched_at) VALUES (?, ?, ?)",
+                    (day, len(rows), datetime.now().isoformat())
+                )
+            conn.commit()
+
+    def get_grouped_days(self, start_date: str, end_date: str) -> Set[str]:
+        """Dates between start_date and end_date already ingested from the grouped daily endpoint"""
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT date FROM grouped_days WHERE date >= ? AND date <= ?",
+            (start_date, end_date)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def _grouped_days_for(self, ticker: str, start_date: str, end_date: str) -> List[str]:
+        """
+        Ingested grouped days on which ticker has a bar. The grouped endpoint
+        only lists U.S. stocks that traded, so a grouped day says nothing
+        about crypto, index or other tickers missing from its payload, and the
+        empty markers for weekends and holidays cover no ticker at all.
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT g.date FROM grouped_days g JOIN daily_bars b ON b.ticker = ? AND b.date = g.date "
+            "WHERE g.date >= ? AND g.date <= ? AND g.ticker_count > 0 ORDER BY g.date",
+            (ticker, start_date, end_date)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_coverage(self, ticker: str) -> List[Tuple[str, str]]:
+        """Return the (start_date, end_date) ranges already fetched for ticker, oldest first"""
+        conn = self._connect()
+        return conn.execute(
+            "SELECT start_date, end_date FROM bar_coverage WHERE ticker = ? ORDER BY start_date",
+            (ticker,)
+        ).fetchall()
+
+    def is_covered(self, ticker: str, start_date: str, end_date: str) -> bool:
+        """True if [start_date, end_date] lies inside one fetched range or is fully accounted for by grouped days"""
+        if start_date > end_date:
+            return True
+        if any(s <= start_date and end_date <= e for s, e in self.get_coverage(ticker)):
+            return True
+        return not self.missing_ranges(ticker, start_date, end_date)
+
+    def missing_ranges(self, ticker: str, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+        """
+        Minimal list of [start, end] intervals inside [start_date, end_date]
+        that neither a coverage range nor grouped daily ingestion accounts for.
+
+        Grouped days count only for tickers with a bar on them. For stock
+        tickers (no market prefix such as X: or I:), gaps without a single
+        NYSE session are dropped - no request could return a bar for them.
+        """
+        if start_date > end_date:
+            return []
+
+        held = [(s, e) for s, e in self.get_coverage(ticker) if s <= end_date and e >= start_date]
+
+        # Runs of consecutive grouped days with a bar for the ticker count as held ranges too
+        run_start = run_end = None
+        for day in self._grouped_days_for(ticker, start_date, end_date):
+            if run_end is not None and day == shift_date(run_end, 1):
+                run_end = day
+                continue
+            if run_start is not None:
+                held.append((run_start, run_end))
+            run_start = run_end = day
+        if run_start is not None:
+            held.append((run_start, run_end))
+
+        gaps = []
+        cursor = start_date
+        for s, e in sorted(held):
+            if s > cursor:
+                gaps.append((cursor, shift_date(s, -1)))
+            if e >= cursor:
+                cursor = shift_date(e, 1)
+            if cursor > end_date:
+                break
+        if cursor <= end_date:
+            gaps.append((cursor, end_date))
+        if ":" not in ticker:
+            gaps = [(s, e) for s, e in gaps if _has_session(s, e)]
+        return gaps
+
+    def mark_covered(self, ticker: str, start_date: str, end_date: str):
+        """Record [start_date, end_date] as fetched, merging it with touching ranges"""
+        if start_date > end_date:
+            return
+        conn = self._connect()
+        with self._write_lock:
+            # Ranges that overlap or are adjacent (end + 1 day == start) collapse into one
+            rows = conn.execute(
+                "SELECT start_date, end_date FROM bar_coverage "
+                "WHERE ticker = ? AND start_date <= ? AND end_date >= ?",
+                (ticker, shift_date(end_date, 1), shift_date(start_date, -1))
+            ).fetchall()
+            new_start = min([start_date] + [s for s, _ in rows])
+            new_end = max([end_date] + [e for _, e in rows])
+            conn.executemany(
+                "DELETE FROM bar_coverage WHERE ticker = ? AND start_date = ?",
+                [(ticker, s) for s, _ in rows]
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO bar_coverage (ticker, start_date, end_date) VALUES (?, ?, ?)",
+                (ticker, new_start, new_end)
+            )
+            conn.commit()
+
+    def last_closed_date(self, today: Optional[date] = None) -> str:
+        """
+        Latest date whose bar is final. Today's bar keeps changing while the
+        market is open, so it is stored but never marked as covered.
+        """
+        today = today or clock.today()
+        return (today - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+# Global instance
+bar_store = BarStore()
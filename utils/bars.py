@@ -0,0 +1,176 @@
+# utils/bars.py
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+class Bars:
+    """
+    Daily OHLCV bars held as contiguous NumPy arrays (one per field) instead
+    of a list of per-bar dicts.
+
+    t is int64 (Polygon ms timestamps); o, h, l, c, v, vw are float64 and n is
+    float64 with NaN where Polygon sent no value. Volume stays float64 because
+    crypto aggregates carry fractional volumes.
+
+    For callers written against lists of dicts, a Bars also supports len(),
+    bars[-1]['c'] (an int index returns one bar as a dict), slicing and index
+    arrays (both return Bars) and iteration over dicts.
+    """
+
+    __slots__ = ("t", "o", "h", "l", "c", "v", "vw", "n")
+
+    def __init__(
+        self,
+        t: np.ndarray,
+        o: np.ndarray,
+        h: np.ndarray,
+        l: np.ndarray,
+        c: np.ndarray,
+        v: np.ndarray,
+        vw: Optional[np.ndarray] = None,
+        n: Optional[np.ndarray] = None
+    ):
+        self.t = np.asarray(t, dtype=np.int64)
+        self.o = np.asarray(o, dtype=np.float64)
+        self.h = np.asarray(h, dtype=np.float64)
+        self.l = np.asarray(l, dtype=np.float64)
+        self.c = np.asarray(c, dtype=np.float64)
+        self.v = np.asarray(v, dtype=np.float64)
+        self.vw = np.asarray(vw, dtype=np.float64) if vw is not None else np.full(len(self.t), np.nan)
+        self.n = np.asarray(n, dtype=np.float64) if n is not None else np.full(len(self.t), np.nan)
+
+    @classmethod
+    def empty(cls) -> "Bars":
+        return cls.from_rows([])
+
+    @classmethod
+    def from_results(cls, results: Iterable[dict]) -> "Bars":
+        """Build from Polygon aggregate results (dicts with t, o, h, l, c, v and optionally vw, n)"""
+        results = list(results)
+        nan = np.nan
+        return cls(
+            np.fromiter((r["t"] for r in results), dtype=np.int64, count=len(results)),
+            np.fromiter((r.get("o", nan) for r in results), dtype=np.float64, count=len(results)),
+            np.fromiter((r.get("h", nan) for r in results), dtype=np.float64, count=len(results)),
+            np.fromiter((r.get("l", nan) for r in results), dtype=np.float64, count=len(results)),
+            np.fromiter((r.get("c", nan) for r in results), dtype=np.float64, count=len(results)),
+            np.fromiter((r.get("v", nan) for r in results), dtype=np.float64, count=len(results)),
+            np.fromiter((r.get("vw", nan) for r in results), dtype=np.float64, count=len(results)),
+            np.fromiter((r.get("n", nan) for r in results), dtype=np.float64, count=len(results))
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> "Bars":
+        """Build from (t, o, h, l, c, v, vw, n) tuples, e.g. bar store query rows"""
+        if not len(rows):
+            return cls(*(np.empty(0) for _ in range(8)))
+        t = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        # None (NULL) becomes NaN when the float columns are converted in one block
+        values = np.array([row[1:] for row in rows], dtype=np.float64)
+        return cls(t, *values.T)
+
+    @classmethod
+    def coerce(cls, data: Union["Bars", List[dict], None]) -> "Bars":
+        """Accept either a Bars or a list of Polygon bar dicts"""
+        if isinstance(data, Bars):
+            return data
+        return cls.from_results(data or [])
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the field arrays"""
+        return sum(getattr(self, field).nbytes for field in self.__slots__)
+
+    def __getitem__(self, index):
+        if isinstance(index, (slice, np.ndarray, list)):
+            return Bars(self.t[index], self.o[index], self.h[index], self.l[index],
+                        self.c[index], self.v[index], self.vw[index], self.n[index])
+        return self._bar(index)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self._bar(i)
+
+    def _bar(self, i: int) -> dict:
+        bar = {
+            "t": int(self.t[i]),
+            "o": float(self.o[i]),
+            "h": float(self.h[i]),
+            "l": float(self.l[i]),
+            "c": float(self.c[i]),
+            "v": float(self.v[i])
+        }
+        if not np.isnan(self.vw[i]):
+            bar["vw"] = float(self.vw[i])
+        if not np.isnan(self.n[i]):
+            bar["n"] = int(self.n[i])
+        return bar
+
+    def to_results(self) -> List[dict]:
+        """Back to Polygon-style bar dicts"""
+        return list(self)
+
+    def dates(self) -> np.ndarray:
+        """Bar timestamps as datetime64[ms] (UTC, naive - same as pd.to_datetime(t, unit='ms'))"""
+        return self.t.astype("datetime64[ms]")
+
+    def date_strings(self) -> List[str]:
+        """Trading date of each bar as YYYY-MM-DD"""
+        return np.datetime_as_string(self.dates().astype("datetime64[D]")).tolist()
+
+    def to_raw_frame(self) -> pd.DataFrame:
+        """DataFrame with Polygon's column names (t, o, h, l, c, v, vw, n), as pd.DataFrame(bars) gives"""
+        return pd.DataFrame({
+            "t": self.t, "o": self.o, "h": self.h, "l": self.l,
+            "c": self.c, "v": self.v, "vw": self.vw, "n": self.n
+        })
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame with Open/High/Low/Close/Volume columns indexed by bar date,
+        sorted oldest first - the layout the screeners and indicators use.
+        """
+        order = np.argsort(self.t, kind="stable")
+        return pd.DataFrame(
+            {
+                "t": self.t[order],
+                "Open": self.o[order],
+                "High": self.h[order],
+                "Low": self.l[order],
+                "Close": self.c[order],
+                "Volume": self.v[order]
+            },
+            index=pd.DatetimeIndex(self.dates()[order], name="Date")
+        )
+
+
+def panel_from_rows(rows: Sequence[tuple]) -> Dict[str, Bars]:
+    """
+    Split (ticker, t, o, h, l, c, v, vw, n) rows sorted by ticker into one
+    Bars per ticker.
+    """
+    panel: Dict[str, Bars] = {}
+    if not rows:
+        return panel
+
+    tickers = np.array([row[0] for row in rows], dtype=object)
+    bars = Bars.from_rows([row[1:] for row in rows])
+    boundaries = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(tickers)]))
+    for start, end in zip(starts, ends):
+        panel[tickers[start]] = bars[start:end]
+    return panel
+
+
+def raw_frame(data: Union[Bars, List[dict]]) -> pd.DataFrame:
+    """pd.DataFrame(data) for either a Bars or a list of Polygon bar dicts"""
+    if isinstance(data, Bars):
+        return data.to_raw_frame()
+    return pd.DataFrame(data)
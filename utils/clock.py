@@ -0,0 +1,36 @@
+# utils/clock.py
+
+from datetime import date, datetime, tzinfo
+from typing import Optional
+
+from utils.polygon_replay import POLYGON_MODE, REPLAY_NOW, CassetteStore
+
+
+def _pinned_now() -> Optional[datetime]:
+    """
+    MIDAS_REPLAY_NOW if set; in replay mode, otherwise the time the cassettes
+    were recorded, so the date windows computed from "today" (n_days_ago,
+    last_closed_date, ...) ask for the requests that were recorded.
+    """
+    value = REPLAY_NOW or (CassetteStore().recorded_at() if POLYGON_MODE == "replay" else None)
+    if not value:
+        return None
+    pinned = datetime.fromisoformat(value)
+    return pinned if pinned.tzinfo else pinned.astimezone()  # Naive values are local time
+
+
+PINNED_NOW = _pinned_now()
+
+
+def now(tz: Optional[tzinfo] = None) -> datetime:
+    """datetime.now(tz), or the pinned time when one is set"""
+    if PINNED_NOW is None:
+        return datetime.now(tz)
+    if tz is None:
+        return PINNED_NOW.astimezone().replace(tzinfo=None)
+    return PINNED_NOW.astimezone(tz)
+
+
+def today() -> date:
+    """Local date of now()"""
+    return now().date()
@@ -0,0 +1,121 @@
+# utils/corporate_actions.py
+
+import logging
+from typing import List, Set, Tuple
+
+from utils import clock
+from utils.bar_store import bar_store, shift_date
+from utils.fast_json import response_json
+from utils.polygon_session import polygon_session
+from utils.trading_calendar import latest_closed_session
+
+logger = logging.getLogger(__name__)
+
+
+def _get_all_pages(url: str, params: dict, error_message: str) -> list[dict]:
+    """Follow a v3 reference endpoint's next_url links and collect every result"""
+    results = []
+    while url:
+        response = polygon_session.get(url, params=params)
+        if response.status_code != 200:
+            raise Exception(f"[Polygon] {error_message}: {response.text}")
+        data = response_json(response)
+        results.extend(data.get("results", []))
+        url, params = data.get("next_url"), None  # next_url already carries the query
+    return results
+
+
+def get_splits(start_date: str, end_date: str) -> list[dict]:
+    """Every stock split executed in [start_date, end_date] (ticker, execution_date, split_from, split_to)"""
+    params = {"execution_date.gte": start_date, "execution_date.lte": end_date, "limit": 1000}
+    return _get_all_pages("/v3/reference/splits", params, "Failed to fetch splits")
+
+
+def get_dividends(start_date: str, end_date: str) -> list[dict]:
+    """Every cash dividend going ex in [start_date, end_date] (ticker, ex_dividend_date, cash_amount, ...)"""
+    params = {"ex_dividend_date.gte": start_date, "ex_dividend_date.lte": end_date, "limit": 1000}
+    return _get_all_pages("/v3/reference/dividends", params, "Failed to fetch dividends")
+
+
+def _unsynced_ranges(kind: str, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+    """Parts of [start_date, end_date] not pulled yet; together with the synced range they stay contiguous"""
+    synced = bar_store.get_adjustment_sync(kind)
+    if synced is None:
+        return [(start_date, end_date)]
+    ranges = []
+    if start_date < synced[0]:
+        ranges.append((start_date, shift_date(synced[0], -1)))
+    if end_date > synced[1]:
+        ranges.append((shift_date(synced[1], 1), end_date))
+    return ranges
+
+
+def _split_rows(splits: List[dict]) -> List[Tuple[str, str, str, float]]:
+    rows = []
+    for split in splits:
+        split_from, split_to = split.get("split_from"), split.get("split_to")
+        if split.get("ticker") and split.get("execution_date") and split_from and split_to:
+            rows.append((split["ticker"], split["execution_date"], "split", split_from / split_to))
+    return rows
+
+
+def _dividend_rows(dividends: List[dict]) -> List[Tuple[str, str, str, float]]:
+    # Factor = 1 - cash / previous close, so it needs the raw close before the ex-date from the bar store
+    rows = []
+    for dividend in dividends:
+        ticker, ex_date, cash = dividend.get("ticker"), dividend.get("ex_dividend_date"), dividend.get("cash_amount")
+        if not (ticker and ex_date and cash):
+            continue
+        prev_close = bar_store.last_close_before(ticker, ex_date)
+        if prev_close and cash < prev_close:
+            rows.append((ticker, ex_date, "dividend", 1 - cash / prev_close))
+    return rows
+
+
+def sync_corporate_actions(start_date: str, end_date: str, include_dividends: bool = False) -> Set[str]:
+    """
+    Pull the market-wide splits (and optionally cash dividends) from
+    start_date through the latest closed session into the bar store's
+    adjustment factor table. One paginated reference request covers every
+    ticker, and ranges synced before are not requested again.
+
+    A bar's factor is the product of every later ex-date, not just those
+    inside the window it was read with, so the sync always runs through the
+    latest closed session (today when end_date is today) whatever end_date
+    is - otherwise the same historical window would come back raw or
+    adjusted depending on which calls ran before.
+
+    Dividend factors use the raw close before the ex-date, so dividends whose
+    ticker has no stored bar before it are skipped.
+
+    Args:
+        start_date: First ex-date in YYYY-MM-DD format
+        end_date: Last date of the window being read (the sync extends past it, up to today)
+        include_dividends: Also sync cash dividends (only applied by reads with dividends=True)
+
+    Returns:
+        Tickers whose adjustment factors changed - anything derived from their
+        adjusted bars (streaming indicator state, cached windows) is stale
+    """
+    today = clock.today().isoformat()
+    end_date = min(max(end_date, latest_closed_session()), today)
+    if start_date > end_date:
+        return set()
+
+    changed = set()
+    kinds = [("split", get_splits, _split_rows)]
+    if include_dividends:
+        kinds.append(("dividend", get_dividends, _dividend_rows))
+
+    for kind, fetch, to_rows in kinds:
+        for fetch_start, fetch_end in _unsynced_ranges(kind, start_date, end_date):
+            try:
+                actions = fetch(fetch_start, fetch_end)
+            except Exception as e:
+                logger.warning(f"⚠️  Failed to sync {kind}s for {fetch_start} to {fetch_end}: {e}")
+                continue
+            changed |= bar_store.put_adjustments(to_rows(actions))
+            bar_store.mark_adjustment_sync(kind, fetch_start, fetch_end)
+            logger.info(f"🧾 Synced {len(actions)} {kind}s ({fetch_start} to {fetch_end})")
+
+    return changed
@@ -0,0 +1,39 @@
+# utils/fast_json.py
+
+import json
+from typing import Any, Union
+
+# Optional fast decoders - fall back to the standard library when not installed
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON with the fastest available decoder (orjson, msgspec, then json)"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    if HAS_MSGSPEC:
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def response_json(response) -> Any:
+    """Drop-in for response.json() on a requests/httpx response, decoding the raw bytes directly"""
+    return loads(response.content)
+
+
+def decoder_name() -> str:
+    if HAS_ORJSON:
+        return "orjson"
+    if HAS_MSGSPEC:
+        return "msgspec"
+    return "json"
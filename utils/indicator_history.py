@@ -0,0 +1,184 @@
+# utils/indicator_history.py
+
+import math
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.bars import Bars
+from utils.indicator_panel import TABLE_COLUMNS, IndicatorTable, compute_window_metrics
+from utils.trading_calendar import previous_session, window_start_days
+
+# Indicator history configuration
+INDICATOR_HISTORY_FILE = os.getenv("MIDAS_INDICATOR_HISTORY_FILE", "cache/indicator_history.db")
+DEFAULT_LOOKBACK_DAYS = 180  # Trading days - same window get_historical_stock_data fetches
+MIN_HISTORY_BARS = 30  # The historical screener skips tickers with fewer bars
+WINDOW_CHUNK = 256  # As-of dates evaluated per matrix pass (bounds memory on long histories)
+
+DAY_MS = 86_400_000
+INTEGER_COLUMNS = ("score_macd", "score_rsi", "score_so", "score_prc", "volume_avg_30d", "bars")
+HISTORY_COLUMNS = tuple(name for name in TABLE_COLUMNS if name != "as_of")
+
+
+def metric_history(bars: Bars, lookback_days: int = DEFAULT_LOOKBACK_DAYS, start_date: Optional[str] = None,
+                   min_bars: int = MIN_HISTORY_BARS) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Screener metrics as of every bar date of one ticker.
+
+    The row for date D is computed from the bars dated within the last
+    lookback_days sessions ending on D, the same window get_historical_stock_data uses
+    for reference_date D, so the values match it exactly. Windows of
+    successive dates are stacked right-aligned into matrices and run through
+    the panel kernels, a chunk of dates per pass.
+
+    Args:
+        bars: The ticker's bars, oldest first
+        lookback_days: Trading days in each as-of window
+        start_date: Only produce rows from this date (YYYY-MM-DD) on
+        min_bars: Dates whose window holds fewer bars are skipped
+
+    Returns:
+        (dates, columns) - YYYY-MM-DD dates and one array per HISTORY_COLUMNS entry
+    """
+    days = bars.t // DAY_MS  # UTC day numbers, as used by bar_date()
+    ends = np.arange(len(bars))
+    if start_date is not None:
+        start_day = np.datetime64(start_date, "D").astype(np.int64)
+        ends = ends[days >= start_day]
+    starts = np.searchsorted(days, window_start_days(days[ends], lookback_days), side="left")
+    counts = ends - starts + 1
+    ends, starts, counts = ends[counts >= min_bars], starts[counts >= min_bars], counts[counts >= min_bars]
+
+    if not len(ends):
+        return [], {name: np.empty(0) for name in HISTORY_COLUMNS}
+
+    width = int(counts.max())
+    offsets = np.arange(width) - (width - 1)
+    chunks = []
+    for i in range(0, len(ends), WINDOW_CHUNK):
+        chunk_ends, chunk_starts = ends[i:i + WINDOW_CHUNK], starts[i:i + WINDOW_CHUNK]
+        index = chunk_ends[:, None] + offsets
+        valid = index >= chunk_starts[:, None]
+        index = np.maximum(index, 0)
+
+        def window(values: np.ndarray) -> np.ndarray:
+            return np.where(valid, values[index], np.nan)
+
+        chunks.append(compute_window_metrics(window(bars.h), window(bars.l), window(bars.c), window(bars.v),
+                                             counts[i:i + WINDOW_CHUNK]))
+
+    columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in HISTORY_COLUMNS}
+    return bars[ends].date_strings(), columns
+
+
+class IndicatorHistoryStore:
+    """
+    Point-in-time screener metrics in a SQLite table keyed by (date, ticker),
+    one column per metric. Ranking the universe as of a date is one
+    clustered range read of that date's rows.
+    """
+
+    def __init__(self, db_path: str = INDICATOR_HISTORY_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            if not self._initialized:
+                self._create_tables(conn)
+                self._initialized = True
+        return conn
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        metric_columns = ",\n".join(
+            f"{name} {'INTEGER' if name in INTEGER_COLUMNS else 'REAL'}" for name in HISTORY_COLUMNS
+        )
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS indicator_history (
+                date TEXT NOT NULL,
+                ticker TEXT NOT NULL,
+                {metric_columns},
+                PRIMARY KEY (date, ticker)
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+
+    def put_history(self, ticker: str, dates: List[str], columns: Dict[str, np.ndarray]):
+        """Insert or replace one ticker's metric rows"""
+        if not dates:
+            return
+        values = [
+            [None if isinstance(value, float) and math.isnan(value) else value for value in row]
+            for row in zip(*(columns[name].tolist() for name in HISTORY_COLUMNS))
+        ]
+        rows = [(day, ticker, *row) for day, row in zip(dates, values)]
+        placeholders = ", ".join("?" * (len(HISTORY_COLUMNS) + 2))
+        conn = self._connect()
+        with self._write_lock:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO indicator_history (date, ticker, {', '.join(HISTORY_COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                rows
+            )
+            conn.commit()
+
+    def has_date(self, day: str) -> bool:
+        """Whether metrics are stored for the date"""
+        conn = self._connect()
+        return conn.execute("SELECT 1 FROM indicator_history WHERE date = ? LIMIT 1", (day,)).fetchone() is not None
+
+    def get_slice(self, reference_date: str, tickers: Optional[Iterable[str]] = None) -> Tuple[Optional[str], IndicatorTable]:
+        """
+        Every stored ticker's metrics as of reference_date - the session itself,
+        or for a weekend or holiday the session before it (e.g. the Friday).
+        Older stored dates are never substituted: a gap in the history would
+        silently rank stale data.
+
+        Returns:
+            (date used, IndicatorTable) - date is None when that session isn't stored
+        """
+        try:
+            day = previous_session(reference_date)
+        except ValueError:
+            day = None
+        if day is None or not self.has_date(day):
+            return None, IndicatorTable(np.empty(0, dtype=object), {name: np.empty(0) for name in HISTORY_COLUMNS})
+
+        conn = self._connect()
+        rows = conn.execute(
+            f"SELECT ticker, {', '.join(HISTORY_COLUMNS)} FROM indicator_history WHERE date = ? ORDER BY ticker",
+            (day,)
+        ).fetchall()
+        if tickers is not None:
+            wanted = set(tickers)
+            rows = [row for row in rows if row[0] in wanted]
+
+        tickers_array = np.array([row[0] for row in rows], dtype=object)
+        # None (NULL) becomes NaN in the float block
+        values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(HISTORY_COLUMNS))
+        columns = {
+            name: values[:, i].astype(np.int64) if name in INTEGER_COLUMNS else values[:, i]
+            for i, name in enumerate(HISTORY_COLUMNS)
+        }
+        return day, IndicatorTable(tickers_array, columns)
+
+    def get_date_range(self) -> Tuple[Optional[str], Optional[str]]:
+        conn = self._connect()
+        return conn.execute("SELECT MIN(date), MAX(date) FROM indicator_history").fetchone()
+
+
+# Global instance
+indicator_history_store = IndicatorHistoryStore()
@@ -0,0 +1,245 @@
+# utils/indicator_panel.py
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from utils.bars import Bars
+from utils.indicators import (
+    ADR_WINDOW,
+    ATR_WINDOW,
+    PERFORMANCE_LOOKBACKS,
+    RSI_WINDOW,
+    SIGNAL_WEIGHTS,
+    STOCHASTIC_WINDOW,
+    atr_last,
+    macd_last,
+    rsi_signal,
+    sma_rsi_last,
+    stochastic_last
+)
+
+# Columns of the IndicatorTable built by compute_panel_metrics
+TABLE_COLUMNS = (
+    "current_price", "performance_1m", "performance_3m", "performance_6m", "adr_percentage",
+    "rsi", "macd", "macd_signal", "stochastic_oscillator", "atr",
+    "score_macd", "score_rsi", "score_so", "score_prc", "overall_score",
+    "volume_avg_30d", "bars", "as_of"
+)
+
+
+class PricePanel:
+    """
+    Daily bars for a whole universe aligned on one date axis: 2-D float64
+    (tickers x dates) matrices for high, low, close and volume, with NaN
+    where a ticker has no bar on a date.
+    """
+
+    def __init__(self, tickers: np.ndarray, t: np.ndarray, h: np.ndarray, l: np.ndarray,
+                 c: np.ndarray, v: np.ndarray):
+        self.tickers = tickers
+        self.t = t
+        self.h = h
+        self.l = l
+        self.c = c
+        self.v = v
+
+    @classmethod
+    def from_bars(cls, panel: Dict[str, Bars]) -> "PricePanel":
+        """Align a {ticker: Bars} panel (e.g. from load_price_panel) on the union of its dates"""
+        panel = {ticker: bars for ticker, bars in panel.items() if len(bars)}
+        if not panel:
+            return cls._from_columns(np.empty(0, dtype=object), *(np.empty(0) for _ in range(6)))
+
+        tickers = np.array(list(panel), dtype=object)
+        counts = [len(bars) for bars in panel.values()]
+        ticker_index = np.repeat(np.arange(len(tickers)), counts)
+
+        def stack(field: str) -> np.ndarray:
+            return np.concatenate([getattr(bars, field) for bars in panel.values()])
+
+        return cls._from_columns(tickers, ticker_index, stack("t"), stack("h"), stack("l"),
+                                 stack("c"), stack("v"))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> "PricePanel":
+        """Build from (ticker, t, o, h, l, c, v, ...) rows such as bar store panel queries"""
+        if not rows:
+            return cls._from_columns(np.empty(0, dtype=object), *(np.empty(0) for _ in range(6)))
+        tickers, ticker_index = np.unique(np.array([row[0] for row in rows], dtype=object),
+                                          return_inverse=True)
+        values = np.array([row[1:7] for row in rows], dtype=np.float64)
+        return cls._from_columns(tickers, ticker_index, values[:, 0].astype(np.int64),
+                                 values[:, 2], values[:, 3], values[:, 4], values[:, 5])
+
+    @classmethod
+    def _from_columns(cls, tickers, ticker_index, t, h, l, c, v) -> "PricePanel":
+        ticker_index = np.asarray(ticker_index, dtype=np.intp)
+        dates, date_index = np.unique(np.asarray(t, dtype=np.int64), return_inverse=True)
+        shape = (len(tickers), len(dates))
+
+        def scatter(values: np.ndarray) -> np.ndarray:
+            matrix = np.full(shape, np.nan)
+            matrix[ticker_index, date_index] = values
+            return matrix
+
+        return cls(tickers, dates, scatter(h), scatter(l), scatter(c), scatter(v))
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def right_aligned(self):
+        """
+        Each ticker's bars shifted to the right edge of its row (NaN padding on
+        the left), so the last column is every ticker's latest bar and the
+        trailing-window kernels see the same values as on the ticker's own series.
+
+        Returns:
+            (h, l, c, v, counts, last_t) - counts is the number of bars per ticker
+            and last_t the timestamp of each ticker's latest bar (0 if it has none)
+        """
+        valid = ~np.isnan(self.c)
+        counts = valid.sum(axis=1)
+        # Stable sort puts the missing dates first and keeps the bars in date order
+        order = np.argsort(valid, axis=1, kind="stable")
+
+        def shift(matrix: np.ndarray) -> np.ndarray:
+            return np.where(np.take_along_axis(valid, order, axis=1),
+                            np.take_along_axis(matrix, order, axis=1), np.nan)
+
+        if not valid.size:
+            return self.h, self.l, self.c, self.v, counts, np.zeros(len(self), dtype=np.int64)
+
+        last_index = valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        last_t = np.where(counts > 0, self.t[last_index], 0)
+        return shift(self.h), shift(self.l), shift(self.c), shift(self.v), counts, last_t
+
+
+class IndicatorTable:
+    """
+    Screener metrics for many tickers held column-wise (one array per metric),
+    so a universe can be filtered with a mask and sorted by any column.
+    """
+
+    def __init__(self, tickers: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.tickers = tickers
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def take(self, indices: np.ndarray) -> "IndicatorTable":
+        return IndicatorTable(self.tickers[indices],
+                              {name: values[indices] for name, values in self.columns.items()})
+
+    def filter(self, mask: np.ndarray) -> "IndicatorTable":
+        return self.take(np.flatnonzero(mask))
+
+    def sort(self, column: str, descending: bool = True) -> "IndicatorTable":
+        values = self.columns[column]
+        return self.take(np.argsort(-values if descending else values, kind="stable"))
+
+    def to_columns(self) -> Dict[str, list]:
+        """JSON-ready column lists (ticker plus every metric)"""
+        result = {"ticker": self.tickers.tolist()}
+        result.update({name: values.tolist() for name, values in self.columns.items()})
+        return result
+
+    def rows(self) -> List[dict]:
+        """Per-ticker dicts in the layout of compute_screener_metrics, preceded by the ticker"""
+        cols = {name: values.tolist() for name, values in self.columns.items()}
+        return [
+            {
+                "ticker": ticker,
+                "current_price": round(cols["current_price"][i], 2),
+                "performance_1m": round(cols["performance_1m"][i], 2),
+                "performance_3m": round(cols["performance_3m"][i], 2),
+                "performance_6m": round(cols["performance_6m"][i], 2),
+                "adr_percentage": round(cols["adr_percentage"][i], 2),
+                "rsi": round(cols["rsi"][i], 2),
+                "rsi_signal": rsi_signal(cols["rsi"][i]),
+                "macd": round(cols["macd"][i], 2),
+                "macd_signal": round(cols["macd_signal"][i], 2),
+                "stochastic_oscillator": round(cols["stochastic_oscillator"][i], 2),
+                "atr": round(cols["atr"][i], 2),
+                "indicator_scores": {
+                    "MACD": cols["score_macd"][i],
+                    "RSI": cols["score_rsi"][i],
+                    "SO": cols["score_so"][i],
+                    "PRC": cols["score_prc"][i]
+                },
+                "overall_signal": ("BULLISH" if cols["overall_score"][i] > 0
+                                   else "BEARISH" if cols["overall_score"][i] < 0 else "NEUTRAL"),
+                "overall_score": round(cols["overall_score"][i], 2),
+                "volume_avg_30d": cols["volume_avg_30d"][i]
+            }
+            for i, ticker in enumerate(self.tickers.tolist())
+        ]
+
+
+def compute_panel_metrics(panel: PricePanel) -> IndicatorTable:
+    """
+    Every screener metric for every ticker in the panel, computed in a few
+    whole-matrix passes instead of one pass per ticker.
+
+    Tickers with too little history for an indicator get NaN for it (0 for
+    the performance windows), exactly as compute_screener_metrics would for
+    the same bars. Tickers without any bars are dropped.
+    """
+    h, l, c, v, counts, last_t = panel.right_aligned()
+    keep = counts > 0
+    if not keep.any():
+        return IndicatorTable(np.empty(0, dtype=object), {name: np.empty(0) for name in TABLE_COLUMNS})
+    columns = compute_window_metrics(h[keep], l[keep], c[keep], v[keep], counts[keep])
+    columns["as_of"] = last_t[keep]
+    return IndicatorTable(panel.tickers[keep], columns)
+
+
+def compute_window_metrics(h: np.ndarray, l: np.ndarray, c: np.ndarray, v: np.ndarray,
+                           counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Screener metric columns (TABLE_COLUMNS except as_of) for a stack of
+    right-aligned bar windows: one row per window, its latest bar in the last
+    column and NaN padding on the left. counts holds the bars in each row (> 0).
+    """
+    columns = {"current_price": c[:, -1]}
+
+    for name, lookback in PERFORMANCE_LOOKBACKS.items():
+        if c.shape[1] < lookback:
+            columns[name] = np.zeros(len(c))
+            continue
+        base = c[:, -lookback]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            performance = (c[:, -1] - base) / base * 100
+        columns[name] = np.where((counts < lookback) | (base == 0), 0.0, performance)
+
+    # ADR% and average volume over the last 30 bars (fewer when the ticker has fewer)
+    tail_counts = np.minimum(counts, ADR_WINDOW)
+    h_tail, l_tail, c_tail = h[:, -ADR_WINDOW:], l[:, -ADR_WINDOW:], c[:, -ADR_WINDOW:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adr = np.where(c_tail == 0, 0.0, (h_tail - l_tail) / c_tail * 100)
+    columns["adr_percentage"] = np.nansum(adr, axis=1) / tail_counts
+
+    rsi = sma_rsi_last(c)
+    columns["rsi"] = np.where(counts >= RSI_WINDOW, rsi, np.nan)
+    columns["macd"], columns["macd_signal"] = macd_last(c)
+    stochastic = stochastic_last(h, l, c)
+    columns["stochastic_oscillator"] = np.where(counts >= STOCHASTIC_WINDOW, stochastic, np.nan)
+    atr = atr_last(h, l, c)
+    columns["atr"] = np.where(counts >= ATR_WINDOW, atr, np.nan)
+
+    # Same rules as score_indicators; comparisons with NaN are False, as in Python
+    with np.errstate(invalid="ignore"):
+        columns["score_macd"] = np.where(columns["macd"] > columns["macd_signal"], 1, -1)
+        columns["score_rsi"] = np.where(columns["rsi"] < 30, 1, np.where(columns["rsi"] > 70, -1, 0))
+        columns["score_so"] = np.where(columns["stochastic_oscillator"] < 20, 1,
+                                       np.where(columns["stochastic_oscillator"] > 80, -1, 0))
+    columns["score_prc"] = np.where(columns["performance_1m"] > 0, 1, -1)
+    columns["overall_score"] = (columns["score_macd"] * SIGNAL_WEIGHTS["MACD"]
+                                + columns["score_rsi"] * SIGNAL_WEIGHTS["RSI"]
+                                + columns["score_so"] * SIGNAL_WEIGHTS["SO"]
+                                + columns["score_prc"] * SIGNAL_WEIGHTS["PRC"])
+
+    columns["volume_avg_30d"] = (np.nansum(v[:, -ADR_WINDOW:], axis=1) / tail_counts).astype(np.int64)
+    columns["bars"] = counts
+    return columns
@@ -0,0 +1,398 @@
+# utils/indicator_state.py
+
+import json
+import math
+import os
+import sqlite3
+import threading
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from utils.bars import Bars
+from utils.fast_json import loads
+from utils.indicators import (
+    ADR_WINDOW,
+    ATR_WINDOW,
+    MACD_FAST,
+    MACD_SIGNAL,
+    MACD_SLOW,
+    PERFORMANCE_LOOKBACKS,
+    RSI_WINDOW,
+    STOCHASTIC_WINDOW,
+    rsi_signal,
+    score_indicators
+)
+from utils.trading_calendar import window_start_day
+
+# Indicator state store configuration
+INDICATOR_STATE_FILE = os.getenv("MIDAS_INDICATOR_STATE_FILE", "cache/indicator_state.db")
+# Version 3 records the latest split each state was built with
+STATE_VERSION = 3
+
+# Closes are kept for the same trading-day window the screener fetches (days_back=180),
+# so performance lookbacks see exactly the bars a full recompute would see
+DEFAULT_HISTORY_DAYS = 180
+DAY_MS = 86_400_000
+
+
+class RollingSum:
+    """Sum and mean of the last `window` values, updated in O(1) per value"""
+
+    def __init__(self, window: int, values: Iterable[float] = (), total: float = 0.0):
+        self.window = window
+        self.values = deque(values, maxlen=window)
+        self.total = total
+
+    def push(self, value: float):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        """Mean over a full window (NaN until the window has filled, like rolling(window).mean())"""
+        return self.total / self.window if self.full else math.nan
+
+    def partial_mean(self) -> float:
+        """Mean over however many values the window holds (like tail(window).mean())"""
+        return self.total / len(self.values) if self.values else 0.0
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "values": list(self.values), "total": self.total}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RollingSum":
+        return cls(data["window"], data["values"], data["total"])
+
+
+class RollingExtreme:
+    """
+    Minimum or maximum of the last `window` values using a monotonic deque:
+    each value is appended and removed at most once, so updates are amortized O(1).
+    """
+
+    def __init__(self, window: int, maximum: bool, items: Iterable = (), index: int = 0):
+        self.window = window
+        self.maximum = maximum
+        self.items = deque(tuple(item) for item in items)  # (index, value), values monotonic
+        self.index = index
+
+    def push(self, value: float):
+        if self.maximum:
+            while self.items and self.items[-1][1] <= value:
+                self.items.pop()
+        else:
+            while self.items and self.items[-1][1] >= value:
+                self.items.pop()
+        self.items.append((self.index, value))
+        if self.items[0][0] <= self.index - self.window:
+            self.items.popleft()
+        self.index += 1
+
+    def value(self) -> float:
+        """Extreme over a full window (NaN until `window` values have been pushed)"""
+        return self.items[0][1] if self.index >= self.window else math.nan
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "maximum": self.maximum,
+                "items": [list(item) for item in self.items], "index": self.index}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RollingExtreme":
+        return cls(data["window"], data["maximum"], data["items"], data["index"])
+
+
+class EMA:
+    """
+    Exponential moving average matching pandas' ewm(span=span).mean() (adjust=True),
+    kept as a running weighted sum and running weight total.
+    """
+
+    def __init__(self, span: int, numerator: float = 0.0, denominator: float = 0.0):
+        self.span = span
+        self.beta = 1.0 - 2.0 / (span + 1.0)
+        self.numerator = numerator
+        self.denominator = denominator
+
+    def push(self, value: float) -> float:
+        self.numerator = value + self.beta * self.numerator
+        self.denominator = 1.0 + self.beta * self.denominator
+        return self.value()
+
+    def value(self) -> float:
+        return self.numerator / self.denominator if self.denominator else math.nan
+
+    def to_dict(self) -> dict:
+        return {"span": self.span, "numerator": self.numerator, "denominator": self.denominator}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EMA":
+        return cls(data["span"], data["numerator"], data["denominator"])
+
+
+class TickerIndicatorState:
+    """
+    Everything needed to produce a ticker's screener metrics after each new
+    daily bar without re-reading its history: rolling sums for RSI, ATR, ADR%
+    and volume, EMAs for MACD, monotonic deques for the stochastic range and
+    the closes inside the lookback window for performance.
+
+    update() is O(1) per bar; metrics() returns the same fields as
+    utils.indicators.compute_screener_metrics over the same window of bars.
+    The MACD EMAs run over the whole streamed history instead of restarting
+    at the window start, so MACD can differ from a recompute in the last
+    digits (enough to flip the MACD score when the lines are nearly equal).
+    """
+
+    def __init__(self, history_days: int = DEFAULT_HISTORY_DAYS):
+        self.history_days = history_days
+        self.split_ex_date: Optional[str] = None  # Latest split ex-date the state's bars were adjusted for
+        self.last_t = 0
+        self.prev_close = math.nan
+        self.closes = deque()  # (t, close) within the lookback window
+        self.gains = RollingSum(RSI_WINDOW)
+        self.losses = RollingSum(RSI_WINDOW)
+        self.ema_fast = EMA(MACD_FAST)
+        self.ema_slow = EMA(MACD_SLOW)
+        self.ema_signal = EMA(MACD_SIGNAL)
+        self.high_max = RollingExtreme(STOCHASTIC_WINDOW, maximum=True)
+        self.low_min = RollingExtreme(STOCHASTIC_WINDOW, maximum=False)
+        self.true_range = RollingSum(ATR_WINDOW)
+        self.adr = RollingSum(ADR_WINDOW)
+        self.volume = RollingSum(ADR_WINDOW)
+
+    @classmethod
+    def from_bars(cls, bars: Bars, history_days: int = DEFAULT_HISTORY_DAYS,
+                  split_ex_date: Optional[str] = None) -> "TickerIndicatorState":
+        """
+        Bootstrap a state by streaming a ticker's history through update().
+        split_ex_date is the latest split the (adjusted) bars reflect; a state
+        must be rebuilt once a newer split is stored.
+        """
+        state = cls(history_days)
+        state.split_ex_date = split_ex_date
+        state.update_bars(bars)
+        return state
+
+    def update_bars(self, bars: Bars) -> int:
+        """Apply every bar newer than the last one seen; returns the number applied"""
+        applied = 0
+        for t, h, l, c, v in zip(bars.t.tolist(), bars.h.tolist(), bars.l.tolist(),
+                                 bars.c.tolist(), bars.v.tolist()):
+            if self.update(t, h, l, c, v):
+                applied += 1
+        return applied
+
+    def update(self, t: int, high: float, low: float, close: float, volume: float) -> bool:
+        """Fold one daily bar into the state (bars at or before the last seen bar are ignored)"""
+        if t <= self.last_t:
+            return False
+
+        # The first bar has no change; the screener counts it as a zero gain / zero loss
+        delta = close - self.prev_close if not math.isnan(self.prev_close) else 0.0
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+
+        macd_line = self.ema_fast.push(close) - self.ema_slow.push(close)
+        self.ema_signal.push(macd_line)
+
+        self.high_max.push(high)
+        self.low_min.push(low)
+
+        if math.isnan(self.prev_close):
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.true_range.push(true_range)
+
+        self.adr.push(0.0 if close == 0 else (high - low) / close * 100)
+        self.volume.push(volume)
+
+        self.closes.append((t, close))
+        cutoff = window_start_day(t // DAY_MS, self.history_days) * DAY_MS
+        while self.closes[0][0] < cutoff:
+            self.closes.popleft()
+
+        self.prev_close = close
+        self.last_t = t
+        return True
+
+    @property
+    def bar_count(self) -> int:
+        """Bars inside the lookback window"""
+        return len(self.closes)
+
+    def metrics(self) -> Optional[Dict]:
+        """Screener metrics for the latest bar, rounded as the screeners report them"""
+        if not self.closes:
+            return None
+
+        current_price = self.closes[-1][1]
+        performance = {}
+        for name, lookback in PERFORMANCE_LOOKBACKS.items():
+            if len(self.closes) < lookback:
+                performance[name] = 0
+                continue
+            base = self.closes[-lookback][1]
+            performance[name] = 0 if base == 0 else (current_price - base) / base * 100
+
+        gain, loss = self.gains.mean(), self.losses.mean()
+        if math.isnan(gain):
+            rsi = math.nan
+        else:
+            rsi = 100 - (100 / (1 + gain / loss)) if loss else (100.0 if gain else math.nan)
+
+        macd = self.ema_fast.value() - self.ema_slow.value()
+        macd_signal = self.ema_signal.value()
+
+        high_max, low_min = self.high_max.value(), self.low_min.value()
+        range_size = high_max - low_min
+        if math.isnan(range_size):
+            stochastic = math.nan
+        elif range_size:
+            stochastic = 100 * (current_price - low_min) / range_size
+        else:
+            stochastic = math.nan if current_price == low_min else math.copysign(math.inf, current_price - low_min)
+
+        atr = self.true_range.mean()
+        scores = score_indicators(rsi, macd, macd_signal, stochastic, performance["performance_1m"])
+
+        return {
+            "current_price": round(current_price, 2),
+            "performance_1m": round(performance["performance_1m"], 2),
+            "performance_3m": round(performance["performance_3m"], 2),
+            "performance_6m": round(performance["performance_6m"], 2),
+            "adr_percentage": round(self.adr.partial_mean(), 2),
+            "rsi": round(rsi, 2),
+            "rsi_signal": rsi_signal(rsi),
+            "macd": round(macd, 2),
+            "macd_signal": round(macd_signal, 2),
+            "stochastic_oscillator": round(stochastic, 2),
+            "atr": round(atr, 2),
+            "indicator_scores": scores["indicator_scores"],
+            "overall_signal": scores["overall_signal"],
+            "overall_score": round(scores["overall_score"], 2),
+            "volume_avg_30d": int(self.volume.partial_mean())
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "version": STATE_VERSION,
+            "history_days": self.history_days,
+            "split_ex_date": self.split_ex_date,
+            "last_t": self.last_t,
+            "prev_close": None if math.isnan(self.prev_close) else self.prev_close,
+            "closes": [list(item) for item in self.closes],
+            "gains": self.gains.to_dict(),
+            "losses": self.losses.to_dict(),
+            "ema_fast": self.ema_fast.to_dict(),
+            "ema_slow": self.ema_slow.to_dict(),
+            "ema_signal": self.ema_signal.to_dict(),
+            "high_max": self.high_max.to_dict(),
+            "low_min": self.low_min.to_dict(),
+            "true_range": self.true_range.to_dict(),
+            "adr": self.adr.to_dict(),
+            "volume": self.volume.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TickerIndicatorState":
+        state = cls(data["history_days"])
+        state.split_ex_date = data["split_ex_date"]
+        state.last_t = data["last_t"]
+        state.prev_close = math.nan if data["prev_close"] is None else data["prev_close"]
+        state.closes = deque(tuple(item) for item in data["closes"])
+        state.gains = RollingSum.from_dict(data["gains"])
+        state.losses = RollingSum.from_dict(data["losses"])
+        state.ema_fast = EMA.from_dict(data["ema_fast"])
+        state.ema_slow = EMA.from_dict(data["ema_slow"])
+        state.ema_signal = EMA.from_dict(data["ema_signal"])
+        state.high_max = RollingExtreme.from_dict(data["high_max"])
+        state.low_min = RollingExtreme.from_dict(data["low_min"])
+        state.true_range = RollingSum.from_dict(data["true_range"])
+        state.adr = RollingSum.from_dict(data["adr"])
+        state.volume = RollingSum.from_dict(data["volume"])
+        return state
+
+
+class IndicatorStateStore:
+    """
+    SQLite table of serialized TickerIndicatorState per ticker, so daily
+    refreshes pick up where the previous run stopped.
+    """
+
+    def __init__(self, db_path: str = INDICATOR_STATE_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            if not self._initialized:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS indicator_state (
+                        ticker TEXT PRIMARY KEY,
+                        last_t INTEGER NOT NULL,
+                        state TEXT NOT NULL
+                    ) WITHOUT ROWID
+                """)
+                conn.commit()
+                self._initialized = True
+        return conn
+
+    def get_states(self, tickers: Iterable[str]) -> Dict[str, TickerIndicatorState]:
+        """Load the saved states for tickers (tickers without a usable state are left out)"""
+        tickers = list(tickers)
+        conn = self._connect()
+        states = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(tickers), 500):
+            chunk = tickers[i:i + 500]
+            rows = conn.execute(
+                f"SELECT ticker, state FROM indicator_state WHERE ticker IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for ticker, payload in rows:
+                data = loads(payload)
+                if data.get("version") == STATE_VERSION:
+                    states[ticker] = TickerIndicatorState.from_dict(data)
+        return states
+
+    def put_states(self, states: Dict[str, TickerIndicatorState]):
+        """Insert or replace the states for several tickers in one transaction"""
+        if not states:
+            return
+        rows = [
+            (ticker, state.last_t, json.dumps(state.to_dict(), separators=(",", ":")))
+            for ticker, state in states.items()
+        ]
+        conn = self._connect()
+        with self._write_lock:
+            conn.executemany(
+                "INSERT OR REPLACE INTO indicator_state (ticker, last_t, state) VALUES (?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+    def clear(self):
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("DELETE FROM indicator_state")
+            conn.commit()
+
+
+# Global instance
+indicator_state_store = IndicatorStateStore()
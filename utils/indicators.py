@@ -0,0 +1,299 @@
+# utils/indicators.py
+
+from typing import Dict
+
+import numpy as np
+
+from utils import jit_kernels
+from utils.bars import Bars
+
+# Screener indicator configuration
+RSI_WINDOW = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+STOCHASTIC_WINDOW = 14
+ATR_WINDOW = 14
+ADR_WINDOW = 30
+PERFORMANCE_LOOKBACKS = {"performance_1m": 30, "performance_3m": 90, "performance_6m": 180}
+SIGNAL_WEIGHTS = {"MACD": 0.5, "PRC": 0.3, "RSI": 0.2, "SO": 0.4}
+
+# EWM is evaluated in blocks so beta ** -k never overflows on long histories
+EWM_BLOCK = 32
+
+
+# ---------------------------------------------------------------------------
+# Kernels - operate along the last axis, so they take one ticker (1-D) or a
+# (tickers x days) panel (2-D) alike. The recursive ones dispatch to compiled
+# loops in utils.jit_kernels when that backend is enabled (same results to
+# floating-point rounding).
+# ---------------------------------------------------------------------------
+
+def rolling_mean_last(x: np.ndarray, window: int) -> np.ndarray:
+    """Last value of x.rolling(window).mean() (NaN when there are fewer than window values)"""
+    if x.shape[-1] < window:
+        return np.full(x.shape[:-1], np.nan)
+    return x[..., -window:].mean(axis=-1)
+
+
+def ewm_mean(x: np.ndarray, span: int) -> np.ndarray:
+    """
+    Full series of pandas' x.ewm(span=span).mean() (adjust=True):
+    y_t = sum(beta^i * x_{t-i}) / sum(beta^i), with beta = 1 - 2 / (span + 1).
+
+    NaN entries carry no weight (pandas' default ignore_na=False), so a panel
+    row padded with leading NaNs gives the same values as its unpadded series.
+    Numerator and denominator are running sums; within each block they are
+    computed with a cumulative sum scaled by beta^-k, and carried across blocks.
+    """
+    if jit_kernels.enabled() and x.size:
+        return jit_kernels.ewm_mean(x, span)
+    beta = 1.0 - 2.0 / (span + 1.0)
+    n = x.shape[-1]
+    valid = ~np.isnan(x)
+    values = np.where(valid, x, 0.0)
+    out = np.empty(x.shape, dtype=np.float64)
+    carry_num = np.zeros(x.shape[:-1])
+    carry_den = np.zeros(x.shape[:-1])
+
+    for start in range(0, n, EWM_BLOCK):
+        block = values[..., start:start + EWM_BLOCK]
+        weight = valid[..., start:start + EWM_BLOCK]
+        k = np.arange(block.shape[-1])
+        decay = beta ** k  # beta^k
+        carry_decay = beta ** (k + 1)  # weight of the previous block's running sums
+        num = decay * np.cumsum(block / decay, axis=-1) + carry_num[..., None] * carry_decay
+        den = decay * np.cumsum(weight / decay, axis=-1) + carry_den[..., None] * carry_decay
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[..., start:start + EWM_BLOCK] = num / den  # 0 / 0 (no values yet) -> NaN
+        carry_num = num[..., -1]
+        carry_den = den[..., -1]
+    return out
+
+
+def sma_rsi_last(close: np.ndarray, window: int = RSI_WINDOW) -> np.ndarray:
+    """Last RSI value using simple moving averages of gains and losses"""
+    delta = np.diff(close, axis=-1)
+    # The first bar has no change; pandas counts it as a zero gain / zero loss
+    delta = np.concatenate([np.zeros(close.shape[:-1] + (1,)), delta], axis=-1)
+    gain = rolling_mean_last(np.where(delta > 0, delta, 0.0), window)
+    loss = rolling_mean_last(np.where(delta < 0, -delta, 0.0), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+
+def macd_last(close: np.ndarray, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+    """Last MACD line and signal line values (EWM, adjust=True)"""
+    macd_line = ewm_mean(close, fast) - ewm_mean(close, slow)
+    macd_signal = ewm_mean(macd_line, signal)
+    return macd_line[..., -1], macd_signal[..., -1]
+
+
+def stochastic_last(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                    window: int = STOCHASTIC_WINDOW) -> np.ndarray:
+    """Last %K value of the stochastic oscillator"""
+    if close.shape[-1] < window:
+        return np.full(close.shape[:-1], np.nan)
+    low_min = low[..., -window:].min(axis=-1)
+    high_max = high[..., -window:].max(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 * ((close[..., -1] - low_min) / (high_max - low_min))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range per bar; the first bar (no previous close) uses high - low"""
+    if jit_kernels.enabled() and close.size:
+        return jit_kernels.true_range(high, low, close)
+    prev_close = np.concatenate([np.full(close.shape[:-1] + (1,), np.nan), close[..., :-1]], axis=-1)
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def rolling_extreme(x: np.ndarray, window: int, maximum: bool) -> np.ndarray:
+    """Full series of x.rolling(window).max() (or .min()) - NaN until the window is full or while it holds a NaN"""
+    if jit_kernels.enabled() and x.size:
+        return jit_kernels.rolling_extreme(x, window, maximum)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=-1)
+        out[..., window - 1:] = windows.max(axis=-1) if maximum else windows.min(axis=-1)
+    return out
+
+
+def atr_last(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = ATR_WINDOW) -> np.ndarray:
+    """Last ATR value as a simple rolling mean of true range"""
+    return rolling_mean_last(true_range(high, low, close), window)
+
+
+def adr_percentage_last(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                        window: int = ADR_WINDOW) -> np.ndarray:
+    """Average of (high - low) / close * 100 over the last `window` bars (0 where close is 0)"""
+    high, low, close = high[..., -window:], low[..., -window:], close[..., -window:]
+    if close.shape[-1] == 0:
+        return np.zeros(close.shape[:-1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        adr = np.where(close == 0, 0.0, (high - low) / close * 100)
+    return adr.mean(axis=-1)
+
+
+def performance_last(close: np.ndarray, lookback: int) -> np.ndarray:
+    """% change from close[-lookback] to the last close (0 with too little history or a zero base)"""
+    if close.shape[-1] < lookback:
+        return np.zeros(close.shape[:-1])
+    base = close[..., -lookback]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(base == 0, 0.0, (close[..., -1] - base) / base * 100)
+
+
+# ---------------------------------------------------------------------------
+# Screener metrics
+# ---------------------------------------------------------------------------
+
+def score_indicators(rsi: float, macd: float, macd_signal: float, stochastic: float,
+                     performance_1m: float) -> Dict:
+    """Indicator scores, weighted overall score and signal shared by the screeners"""
+    indicator_scores = {
+        "MACD": 1 if macd > macd_signal else -1,
+        "RSI": 1 if rsi < 30 else -1 if rsi > 70 else 0,
+        "SO": 1 if stochastic < 20 else -1 if stochastic > 80 else 0,
+        "PRC": 1 if performance_1m > 0 else -1
+    }
+    overall_score = sum(indicator_scores[k] * SIGNAL_WEIGHTS[k] for k in indicator_scores)
+
+    if overall_score > 0:
+        overall_signal = "BULLISH"
+    elif overall_score < 0:
+        overall_signal = "BEARISH"
+    else:
+        overall_signal = "NEUTRAL"
+
+    return {
+        "indicator_scores": indicator_scores,
+        "overall_signal": overall_signal,
+        "overall_score": overall_score
+    }
+
+
+def rsi_signal(rsi: float) -> str:
+    if rsi < 30:
+        return "OVERSOLD"
+    if rsi > 70:
+        return "OVERBOUGHT"
+    return "NEUTRAL"
+
+
+def compute_screener_metrics(bars: Bars) -> Dict:
+    """
+    Every screener metric for one ticker's bars (oldest first), rounded the
+    way the screeners report them.
+
+    Only the latest value of each indicator is needed, so rolling windows are
+    evaluated on the tail of the arrays instead of over the whole series.
+    """
+    high, low, close = bars.h, bars.l, bars.c
+
+    current_price = float(close[-1])
+    performance = {name: float(performance_last(close, lookback))
+                   for name, lookback in PERFORMANCE_LOOKBACKS.items()}
+    adr_percentage = float(adr_percentage_last(high, low, close))
+    rsi = float(sma_rsi_last(close))
+    macd, macd_signal = (float(v) for v in macd_last(close))
+    stochastic = float(stochastic_last(high, low, close))
+    atr = float(atr_last(high, low, close))
+    volume_avg_30d = int(bars.v[-ADR_WINDOW:].mean())
+
+    scores = score_indicators(rsi, macd, macd_signal, stochastic, performance["performance_1m"])
+
+    return {
+        "current_price": round(current_price, 2),
+        "performance_1m": round(performance["performance_1m"], 2),
+        "performance_3m": round(performance["performance_3m"], 2),
+        "performance_6m": round(performance["performance_6m"], 2),
+        "adr_percentage": round(adr_percentage, 2),
+        "rsi": round(rsi, 2),
+        "rsi_signal": rsi_signal(rsi),
+        "macd": round(macd, 2),
+        "macd_signal": round(macd_signal, 2),
+        "stochastic_oscillator": round(stochastic, 2),
+        "atr": round(atr, 2),
+        "indicator_scores": scores["indicator_scores"],
+        "overall_signal": scores["overall_signal"],
+        "overall_score": round(scores["overall_score"], 2),
+        "volume_avg_30d": volume_avg_30d
+    }
+
+
+# ---------------------------------------------------------------------------
+# Signal kernels - the formulas of the `ta` indicators used by
+# technical_indicator_service (recursive EWMs with min_periods, Wilder
+# smoothing). Rows may be padded with leading NaNs.
+# ---------------------------------------------------------------------------
+
+def ewm_recursive(x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """
+    Full series of pandas' x.ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()
+    along the last axis. The recursion starts at each row's first non-NaN value.
+    """
+    if jit_kernels.enabled() and x.size:
+        return jit_kernels.ewm_recursive(x, alpha, min_periods)
+    out = np.full(x.shape, np.nan)
+    y = np.full(x.shape[:-1], np.nan)
+    seen = np.zeros(x.shape[:-1], dtype=np.int64)
+    for i in range(x.shape[-1]):
+        value = x[..., i]
+        valid = ~np.isnan(value)
+        y = np.where(valid, np.where(np.isnan(y), value, (1 - alpha) * y + alpha * value), y)
+        seen += valid
+        out[..., i] = np.where(seen >= min_periods, y, np.nan)
+    return out
+
+
+def ta_macd_last(close: np.ndarray, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+    """Last values of ta.trend.MACD(close).macd() and .macd_signal()"""
+    macd_line = (ewm_recursive(close, 2.0 / (fast + 1), fast)
+                 - ewm_recursive(close, 2.0 / (slow + 1), slow))
+    macd_signal = ewm_recursive(macd_line, 2.0 / (signal + 1), signal)
+    return macd_line[..., -1], macd_signal[..., -1]
+
+
+def wilder_rsi_last(close: np.ndarray, window: int = RSI_WINDOW) -> np.ndarray:
+    """Last value of ta.momentum.RSIIndicator(close, window).rsi()"""
+    delta = np.diff(close, axis=-1, prepend=np.nan)
+    # ta counts the first bar as a zero move; padding stays NaN so it carries no weight
+    padding = np.isnan(close)
+    up = np.where(padding, np.nan, np.where(delta > 0, delta, 0.0))
+    down = np.where(padding, np.nan, np.where(delta < 0, -delta, 0.0))
+    up_avg = ewm_recursive(up, 1.0 / window, window)[..., -1]
+    down_avg = ewm_recursive(down, 1.0 / window, window)[..., -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(down_avg == 0, 100.0, 100 - (100 / (1 + up_avg / down_avg)))
+
+
+def roc_last(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Last value of ta.momentum.ROCIndicator(close, window).roc()"""
+    if close.shape[-1] <= window:
+        return np.full(close.shape[:-1], np.nan)
+    base = close[..., -1 - window]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (close[..., -1] - base) / base * 100
+
+
+def wilder_atr_last(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = ATR_WINDOW) -> np.ndarray:
+    """
+    Last value of ta.volatility.AverageTrueRange(high, low, close, window): seeded
+    with the mean of the first `window` true ranges, then (prev * (window - 1) + tr) / window.
+    """
+    tr = true_range(high, low, close)
+    if jit_kernels.enabled() and tr.size:
+        return jit_kernels.wilder_smooth_last(tr, window)
+    atr = np.zeros(tr.shape[:-1])
+    seed_sum = np.zeros(tr.shape[:-1])
+    seen = np.zeros(tr.shape[:-1], dtype=np.int64)
+    for i in range(tr.shape[-1]):
+        value = tr[..., i]
+        valid = ~np.isnan(value)
+        seen += valid
+        seed_sum += np.where(valid & (seen <= window), value, 0.0)
+        atr = np.where(valid & (seen == window), seed_sum / window, atr)
+        atr = np.where(valid & (seen > window), (atr * (window - 1) + value) / window, atr)
+    return atr
@@ -0,0 +1,181 @@
+# utils/jit_kernels.py
+
+import logging
+import os
+
+import numpy as np
+
+# Optional JIT compiler for the recursive indicator loops - utils.indicators
+# keeps NumPy implementations of every kernel and uses these only when enabled
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Indicator backend configuration: "auto" (numba when installed), "numba" or "numpy"
+INDICATOR_BACKEND = os.getenv("MIDAS_INDICATOR_BACKEND", "auto").lower()
+BACKENDS = ("auto", "numba", "numpy")
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+
+
+def set_backend(name: str) -> str:
+    """
+    Select the kernel backend used by utils.indicators.
+
+    Args:
+        name: "auto", "numba" or "numpy"
+
+    Returns:
+        The backend actually in use ("numba" or "numpy")
+    """
+    global _enabled
+    name = name.lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown indicator backend '{name}' (expected one of {', '.join(BACKENDS)})")
+    if name == "numba" and not HAS_NUMBA:
+        logger.warning("⚠️  Indicator backend 'numba' requested but numba is not installed - using numpy")
+    _enabled = HAS_NUMBA and name != "numpy"
+    return backend_name()
+
+
+def backend_name() -> str:
+    return "numba" if _enabled else "numpy"
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _rows(x: np.ndarray) -> np.ndarray:
+    """View any (..., n) array as contiguous float64 (rows x n) for the compiled loops"""
+    return np.ascontiguousarray(x, dtype=np.float64).reshape(int(np.prod(x.shape[:-1])), x.shape[-1])
+
+
+if HAS_NUMBA:
+    @numba.njit(cache=True)
+    def _ewm_mean(x, beta):
+        out = np.empty_like(x)
+        for r in range(x.shape[0]):
+            num = 0.0
+            den = 0.0
+            for i in range(x.shape[1]):
+                num *= beta
+                den *= beta
+                if not np.isnan(x[r, i]):
+                    num += x[r, i]
+                    den += 1.0
+                out[r, i] = num / den if den > 0 else np.nan
+        return out
+
+    @numba.njit(cache=True)
+    def _ewm_recursive(x, alpha, min_periods):
+        out = np.full(x.shape, np.nan)
+        for r in range(x.shape[0]):
+            y = np.nan
+            seen = 0
+            for i in range(x.shape[1]):
+                value = x[r, i]
+                if not np.isnan(value):
+                    y = value if np.isnan(y) else (1 - alpha) * y + alpha * value
+                    seen += 1
+                if seen >= min_periods:
+                    out[r, i] = y
+        return out
+
+    @numba.njit(cache=True)
+    def _true_range(high, low, close):
+        out = np.empty_like(high)
+        for r in range(high.shape[0]):
+            prev_close = np.nan
+            for i in range(high.shape[1]):
+                value = high[r, i] - low[r, i]
+                if not np.isnan(prev_close):
+                    up = abs(high[r, i] - prev_close)
+                    down = abs(low[r, i] - prev_close)
+                    # fmax semantics: NaN only when every operand is NaN
+                    if np.isnan(value) or up > value:
+                        value = up
+                    if np.isnan(value) or down > value:
+                        value = down
+                out[r, i] = value
+                prev_close = close[r, i]
+        return out
+
+    @numba.njit(cache=True)
+    def _wilder_smooth_last(tr, window):
+        out = np.zeros(tr.shape[0])
+        for r in range(tr.shape[0]):
+            atr = 0.0
+            seed_sum = 0.0
+            seen = 0
+            for i in range(tr.shape[1]):
+                value = tr[r, i]
+                if np.isnan(value):
+                    continue
+                seen += 1
+                if seen <= window:
+                    seed_sum += value
+                    if seen == window:
+                        atr = seed_sum / window
+                else:
+                    atr = (atr * (window - 1) + value) / window
+            out[r] = atr
+        return out
+
+    @numba.njit(cache=True)
+    def _rolling_extreme(x, window, maximum):
+        # Monotonic deque of indices per row: O(n) regardless of the window
+        out = np.full(x.shape, np.nan)
+        queue = np.empty(x.shape[1], dtype=np.int64)
+        for r in range(x.shape[0]):
+            head = 0
+            tail = 0
+            last_nan = -1
+            for i in range(x.shape[1]):
+                value = x[r, i]
+                if np.isnan(value):
+                    last_nan = i
+                else:
+                    while tail > head and ((x[r, queue[tail - 1]] <= value) if maximum
+                                           else (x[r, queue[tail - 1]] >= value)):
+                        tail -= 1
+                    queue[tail] = i
+                    tail += 1
+                while tail > head and queue[head] <= i - window:
+                    head += 1
+                # Like rolling(window): NaN until full, and while a NaN is inside the window
+                if i >= window - 1 and last_nan <= i - window:
+                    out[r, i] = x[r, queue[head]]
+        return out
+
+
+def ewm_mean(x: np.ndarray, span: int) -> np.ndarray:
+    out = _ewm_mean(_rows(x), 1.0 - 2.0 / (span + 1.0))
+    return out.reshape(x.shape)
+
+
+def ewm_recursive(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    out = _ewm_recursive(_rows(x), float(alpha), int(min_periods))
+    return out.reshape(x.shape)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    out = _true_range(_rows(high), _rows(low), _rows(close))
+    return out.reshape(close.shape)
+
+
+def wilder_smooth_last(tr: np.ndarray, window: int) -> np.ndarray:
+    out = _wilder_smooth_last(_rows(tr), int(window))
+    return out.reshape(tr.shape[:-1])
+
+
+def rolling_extreme(x: np.ndarray, window: int, maximum: bool) -> np.ndarray:
+    out = _rolling_extreme(_rows(x), int(window), bool(maximum))
+    return out.reshape(x.shape)
+
+
+set_backend(INDICATOR_BACKEND)
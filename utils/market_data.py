@@ -1,9 +1,10 @@
 # utils/market_data.py
 
-import requests
-from datetime import datetime, timedelta
+from datetime import timedelta
 import os
 from dotenv import load_dotenv
+from utils import clock
+from utils.polygon_session import polygon_session
 
 load_dotenv()
 
@@ -11,17 +12,12 @@ POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
 
 
 def fetch_polygon_ohlcv(ticker: str, days: int = 60):
-    import requests
-    import os
-    from datetime import datetime, timedelta
-
-    api_key = os.getenv("POLYGON_API_KEY")
-    end_date = datetime.now().date()
+    end_date = clock.today()
     start_date = end_date - timedelta(days=days)
 
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/day/{start_date}/{end_date}"
-    params = {"adjusted": "true", "sort": "asc", "apiKey": api_key}
-    response = requests.get(url, params=params)
+    url = f"/v2/aggs/ticker/{ticker}/range/1/day/{start_date}/{end_date}"
+    params = {"adjusted": "true", "sort": "asc"}
+    response = polygon_session.get(url, params=params)
     data = response.json()
 
     bars = data.get("results", [])
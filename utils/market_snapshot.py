@@ -0,0 +1,226 @@
+# utils/market_snapshot.py
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from utils.fast_json import HAS_MSGSPEC, loads
+
+# Numeric fields pulled out of each snapshot ticker: (column, section, key)
+FLOAT_FIELDS = (
+    ("open", "day", "o"),
+    ("high", "day", "h"),
+    ("low", "day", "l"),
+    ("close", "day", "c"),
+    ("volume", "day", "v"),
+    ("vwap", "day", "vw"),
+    ("todays_change", None, "todaysChange"),
+    ("todays_change_perc", None, "todaysChangePerc"),
+    ("prev_close", "prevDay", "c"),
+    ("prev_high", "prevDay", "h"),
+    ("prev_low", "prevDay", "l"),
+    ("prev_open", "prevDay", "o"),
+    ("prev_volume", "prevDay", "v"),
+    ("last_trade_price", "lastTrade", "p"),
+    ("last_trade_size", "lastTrade", "s")
+)
+# Share counts: held as float64 (Polygon can send fractional volumes) but emitted as ints when whole
+COUNT_FIELDS = ("volume", "prev_volume", "last_trade_size")
+# Nanosecond timestamps don't fit in float64 without losing precision
+INT_FIELDS = (
+    ("last_trade_timestamp", "lastTrade", "t"),
+    ("updated", None, "updated")
+)
+
+if HAS_MSGSPEC:
+    import msgspec
+
+    class _SnapshotBar(msgspec.Struct):
+        o: Optional[float] = 0
+        h: Optional[float] = 0
+        l: Optional[float] = 0
+        c: Optional[float] = 0
+        v: Optional[float] = 0
+        vw: Optional[float] = 0
+
+    class _SnapshotTrade(msgspec.Struct):
+        p: Optional[float] = 0
+        s: Optional[float] = 0
+        t: Optional[int] = 0
+
+    class _SnapshotTicker(msgspec.Struct):
+        ticker: Optional[str] = None
+        day: _SnapshotBar = msgspec.field(default_factory=_SnapshotBar)
+        prevDay: _SnapshotBar = msgspec.field(default_factory=_SnapshotBar)
+        lastTrade: _SnapshotTrade = msgspec.field(default_factory=_SnapshotTrade)
+        todaysChange: Optional[float] = 0
+        todaysChangePerc: Optional[float] = 0
+        updated: Optional[int] = 0
+
+    class _Snapshot(msgspec.Struct):
+        status: str = "OK"
+        tickers: List[_SnapshotTicker] = []
+
+    # Typed decode skips every field not declared above instead of building dicts for it
+    _snapshot_decoder = msgspec.json.Decoder(_Snapshot)
+
+
+def _count(value: float) -> Union[int, float]:
+    """A share count as the API sent it: int when whole (12345, not 12345.0)"""
+    return int(value) if value.is_integer() else value
+
+
+class MarketSnapshot:
+    """
+    Full-market snapshot held column-wise: one NumPy array per field with
+    one entry per ticker, built from the API payload in a single pass.
+    Missing or null values are 0, matching the formatting in the screener.
+    """
+
+    def __init__(self, status: str, tickers: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.status = status
+        self.tickers = tickers
+        self.columns = columns
+
+    @classmethod
+    def from_payload(cls, payload: Union[bytes, str]) -> "MarketSnapshot":
+        """Decode a /v2/snapshot/.../tickers response body"""
+        if HAS_MSGSPEC:
+            try:
+                snapshot = _snapshot_decoder.decode(payload)
+            except msgspec.ValidationError:
+                snapshot = None  # Unexpected field types - use the generic decoder below
+            if snapshot is not None:
+                # Same order as FLOAT_FIELDS / INT_FIELDS
+                floats = [
+                    (d.day.o, d.day.h, d.day.l, d.day.c, d.day.v, d.day.vw,
+                     d.todaysChange, d.todaysChangePerc,
+                     d.prevDay.c, d.prevDay.h, d.prevDay.l, d.prevDay.o, d.prevDay.v,
+                     d.lastTrade.p, d.lastTrade.s)
+                    for d in snapshot.tickers
+                ]
+                ints = [(d.lastTrade.t, d.updated) for d in snapshot.tickers]
+                tickers = [d.ticker for d in snapshot.tickers]
+                return cls._from_tuples(snapshot.status, tickers, floats, ints)
+
+        data = loads(payload)
+        return cls.from_results(data.get("tickers", []), data.get("status", "OK"))
+
+    @classmethod
+    def from_results(cls, tickers_data: List[dict], status: str = "OK") -> "MarketSnapshot":
+        """Build from already-decoded snapshot ticker dicts"""
+        floats = []
+        ints = []
+        tickers = []
+        empty = {}
+        for d in tickers_data:
+            day = d.get("day") or empty
+            prev_day = d.get("prevDay") or empty
+            last_trade = d.get("lastTrade") or empty
+            # Same order as FLOAT_FIELDS / INT_FIELDS
+            floats.append((
+                day.get("o"), day.get("h"), day.get("l"), day.get("c"), day.get("v"), day.get("vw"),
+                d.get("todaysChange"), d.get("todaysChangePerc"),
+                prev_day.get("c"), prev_day.get("h"), prev_day.get("l"), prev_day.get("o"), prev_day.get("v"),
+                last_trade.get("p"), last_trade.get("s")
+            ))
+            ints.append((last_trade.get("t"), d.get("updated")))
+            tickers.append(d.get("ticker"))
+        return cls._from_tuples(status, tickers, floats, ints)
+
+    @classmethod
+    def _from_tuples(cls, status: str, tickers: list, floats: list, ints: list) -> "MarketSnapshot":
+        float_block = np.array(floats, dtype=np.float64).reshape(len(floats), len(FLOAT_FIELDS))
+        float_block = np.nan_to_num(float_block, nan=0.0)  # None (null/missing) -> 0
+        int_block = np.array(
+            [tuple(v or 0 for v in row) for row in ints], dtype=np.int64
+        ).reshape(len(ints), len(INT_FIELDS))
+
+        columns = {name: float_block[:, i] for i, (name, _, _) in enumerate(FLOAT_FIELDS)}
+        columns.update({name: int_block[:, i] for i, (name, _, _) in enumerate(INT_FIELDS)})
+        return cls(status, np.array(tickers, dtype=object), columns)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def rows(self) -> List[dict]:
+        """Per-ticker dicts in the screener's formatted snapshot layout"""
+        cols = {name: values.tolist() for name, values in self.columns.items()}
+        for name in COUNT_FIELDS:
+            cols[name] = [_count(value) for value in cols[name]]
+        return [
+            {
+                "ticker": ticker,
+                "current_price": cols["close"][i],
+                "open": cols["open"][i],
+                "high": cols["high"][i],
+                "low": cols["low"][i],
+                "close": cols["close"][i],
+                "volume": cols["volume"][i],
+                "vwap": cols["vwap"][i],
+                "todays_change": cols["todays_change"][i],
+                "todays_change_perc": cols["todays_change_perc"][i],
+                "prev_day": {
+                    "close": cols["prev_close"][i],
+                    "high": cols["prev_high"][i],
+                    "low": cols["prev_low"][i],
+                    "open": cols["prev_open"][i],
+                    "volume": cols["prev_volume"][i]
+                },
+                "last_trade": {
+                    "price": cols["last_trade_price"][i],
+                    "size": cols["last_trade_size"][i],
+                    "timestamp": cols["last_trade_timestamp"][i]
+                },
+                "updated": cols["updated"][i]
+            }
+            for i, ticker in enumerate(self.tickers.tolist())
+        ]
+
+    def to_columns(self) -> Dict[str, list]:
+        """JSON-ready column lists (ticker plus every numeric field)"""
+        result = {"ticker": self.tickers.tolist()}
+        result.update({name: values.tolist() for name, values in self.columns.items()})
+        return result
+
+    def statistics(self, top_n: int = 10) -> Dict:
+        """Market-wide breadth, volume and top movers"""
+        if len(self) == 0:
+            return {
+                "total_tickers": 0,
+                "total_volume": 0,
+                "gainers": 0,
+                "losers": 0,
+                "unchanged": 0,
+                "top_gainers": [],
+                "top_losers": []
+            }
+
+        change_perc = self.columns["todays_change_perc"]
+        gainers = int((change_perc > 0).sum())
+        losers = int((change_perc < 0).sum())
+        total_volume = float(self.columns["volume"].sum())
+
+        # Stable descending order, same tie-breaking as sorted(..., reverse=True)
+        order = np.argsort(-change_perc, kind="stable")
+
+        def movers(indices) -> List[dict]:
+            return [
+                {
+                    "ticker": self.tickers[i],
+                    "change_perc": round(float(change_perc[i]), 2),
+                    "price": float(self.columns["close"][i]),
+                    "volume": _count(float(self.columns["volume"][i]))
+                }
+                for i in indices
+            ]
+
+        return {
+            "total_tickers": len(self),
+            "total_volume": _count(total_volume),
+            "gainers": gainers,
+            "losers": losers,
+            "unchanged": len(self) - gainers - losers,
+            "top_gainers": movers(order[:top_n]),
+            "top_losers": movers(order[-top_n:][::-1])
+        }
@@ -0,0 +1,77 @@
+# utils/memo.py
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def approximate_size(obj: Any) -> int:
+    """Approximate memory footprint in bytes of a result made of dicts, lists, strings, numbers and arrays"""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "nbytes"):  # NumPy arrays and array-backed containers such as Bars
+        return size + obj.nbytes
+    if isinstance(obj, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(approximate_size(item) for item in obj)
+    return size
+
+
+class ByteBudgetLRU:
+    """
+    Thread-safe LRU cache bounded by the approximate size of its values
+    rather than by entry count. Inserting past the budget evicts the least
+    recently used entries.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
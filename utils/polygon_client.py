@@ -1,60 +1,132 @@
-import os
-import requests
 from datetime import datetime, timedelta
-from typing import Optional, List
-
-POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
+from typing import Optional, List, Tuple
+from utils import clock
+from utils.bar_store import bar_store, shift_date
+from utils.bars import Bars
+from utils.corporate_actions import sync_corporate_actions
+from utils.fast_json import response_json
+from utils.market_snapshot import MarketSnapshot
+from utils.polygon_session import polygon_session
+from utils.resample import resample_bars
+from utils.trading_calendar import session_window_start
 
 
 def n_days_ago(n: int) -> str:
-    return (datetime.now() - timedelta(days=n)).strftime("%Y-%m-%d")
-
+    return (clock.now() - timedelta(days=n)).strftime("%Y-%m-%d")
 
-def get_price_history(ticker: str, days: int = 60) -> list[dict]:
-    POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
 
-    print(f'POLYGON API {POLYGON_API_KEY}')
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/day/{n_days_ago(days)}/{n_days_ago(0)}"
+def _fetch_daily_bars(ticker: str, start_date: str, end_date: str, error_message: str) -> list[dict]:
+    """
+    Fetch raw (unadjusted) daily bars for [start_date, end_date] straight from
+    Polygon - the bar store applies split factors when they are read back.
+    """
+    url = f"/v2/aggs/ticker/{ticker}/range/1/day/{start_date}/{end_date}"
     params = {
-        "adjusted": "true",
-        "sort": "asc",
-        "apiKey": POLYGON_API_KEY
+        "adjusted": "false",
+        "sort": "asc"
     }
-    response = requests.get(url, params=params)
+    response = polygon_session.get(url, params=params)
     if response.status_code != 200:
-        raise Exception(f"[Polygon] Failed to fetch price history: {response.text}")
+        raise Exception(f"[Polygon] {error_message}: {response.text}")
+
+    return response_json(response).get("results", [])
+
+
+def plan_daily_fetch(ticker: str, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+    """
+    Work out what still has to come from Polygon for [start_date, end_date].
+
+    Returns the minimal list of (start, end) ranges the local bar store lacks,
+    oldest first - empty when it already holds the whole range. Bars that are
+    not final yet (today's session) are always refetched.
+    """
+    # Split factors from the window start through the latest session must be known before stored raw bars are read back adjusted
+    sync_corporate_actions(start_date, end_date)
+
+    closed_end = min(end_date, bar_store.last_closed_date())
+    ranges = bar_store.missing_ranges(ticker, start_date, closed_end)
+
+    if end_date > closed_end:
+        open_start = max(start_date, shift_date(closed_end, 1))
+        if ranges and ranges[-1][1] == closed_end:
+            # Gap runs into the unfinished bars - fetch both in one request
+            ranges[-1] = (ranges[-1][0], end_date)
+        else:
+            ranges.append((open_start, end_date))
+    return ranges
+
+
+def store_daily_fetch(ticker: str, bars: list[dict], fetch_start: str, fetch_end: str):
+    """Save bars fetched for [fetch_start, fetch_end] and record the final part of the range as covered"""
+    bar_store.put_bars(ticker, bars)
+    bar_store.mark_covered(ticker, fetch_start, min(fetch_end, bar_store.last_closed_date()))
+
+
+def _get_daily_bars(ticker: str, start_date: str, end_date: str, error_message: str) -> list[dict]:
+    """
+    Get daily bars for [start_date, end_date], reading from the local bar store
+    first and going to Polygon only for the gaps it doesn't hold.
+    """
+    ranges = plan_daily_fetch(ticker, start_date, end_date)
+
+    for fetch_start, fetch_end in ranges:
+        bars = _fetch_daily_bars(ticker, fetch_start, fetch_end, error_message)
+        store_daily_fetch(ticker, bars, fetch_start, fetch_end)
+        if (fetch_start, fetch_end) == (start_date, end_date):
+            return bar_store.adjust_results(ticker, bars)
+
+    return bar_store.get_bars(ticker, start_date, end_date)
+
+
+def _load_daily_bars(ticker: str, start_date: str, end_date: str, error_message: str) -> Bars:
+    """Array-backed version of _get_daily_bars - stored bars are read without building per-bar dicts"""
+    ranges = plan_daily_fetch(ticker, start_date, end_date)
+
+    for fetch_start, fetch_end in ranges:
+        bars = _fetch_daily_bars(ticker, fetch_start, fetch_end, error_message)
+        store_daily_fetch(ticker, bars, fetch_start, fetch_end)
+        if (fetch_start, fetch_end) == (start_date, end_date):
+            return bar_store.adjust(ticker, Bars.from_results(bars))
+
+    return bar_store.get_bar_arrays(ticker, start_date, end_date)
+
+
+def _lookback_start(end_date: str, days_back: int) -> str:
+    return (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=days_back)).strftime("%Y-%m-%d")
+
 
-    return response.json().get("results", [])
+def get_price_history(ticker: str, days: int = 60) -> list[dict]:
+    return _get_daily_bars(ticker, n_days_ago(days), n_days_ago(0), "Failed to fetch price history")
 
 
 def get_bars(ticker: str, start_days_ago: int = 30, end_days_ago: int = 0) -> list[dict]:
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/day/{n_days_ago(start_days_ago)}/{n_days_ago(end_days_ago)}"
-    params = {
-        "adjusted": "true",
-        "sort": "asc",
-        "apiKey": POLYGON_API_KEY
-    }
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        raise Exception(f"[Polygon] Failed to fetch bars: {response.text}")
+    return _get_daily_bars(ticker, n_days_ago(start_days_ago), n_days_ago(end_days_ago), "Failed to fetch bars")
 
-    return response.json().get("results", [])
 
+def get_grouped_daily(date: str) -> list[dict]:
+    """
+    Get the raw (unadjusted) daily bar of every U.S. stock for one date in a
+    single call. Each result carries the ticker symbol in its `T` field.
+    """
+    url = f"/v2/aggs/grouped/locale/us/market/stocks/{date}"
+    params = {"adjusted": "false"}
 
-def get_top_movers(direction: str = "gainers") -> list[dict]:
-    POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
+    response = polygon_session.get(url, params=params)
+    if response.status_code != 200:
+        raise Exception(f"[Polygon] Failed to fetch grouped daily bars: {response.text}")
+
+    return response_json(response).get("results", [])
 
-    print(f'POLYGON API {POLYGON_API_KEY}')
 
+def get_top_movers(direction: str = "gainers") -> list[dict]:
     assert direction in ["gainers", "losers"], "Direction must be 'gainers' or 'losers'"
-    url = f"https://api.polygon.io/v2/snapshot/locale/us/markets/stocks/{direction}"
-    params = {"apiKey": POLYGON_API_KEY}
+    url = f"/v2/snapshot/locale/us/markets/stocks/{direction}"
 
-    response = requests.get(url, params=params)
+    response = polygon_session.get(url)
     if response.status_code != 200:
         raise Exception(f"[Polygon] Failed to fetch top movers: {response.text}")
 
-    tickers = response.json().get("tickers", [])
+    tickers = response_json(response).get("tickers", [])
 
     return [
         {
@@ -67,25 +139,10 @@ def get_top_movers(direction: str = "gainers") -> list[dict]:
     ]
 
 
-def get_market_snapshot(tickers: Optional[List[str]] = None, include_otc: bool = False) -> dict:
-    """
-    Get a comprehensive snapshot of the entire U.S. stock market
-    
-    Args:
-        tickers: Optional list of specific tickers to get snapshots for. 
-                 If None or empty, returns all tickers.
-        include_otc: Whether to include OTC securities. Default is False.
-    
-    Returns:
-        Dictionary containing the snapshot response
-    """
-    POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
-    
-    url = "https://api.polygon.io/v2/snapshot/locale/us/markets/stocks/tickers"
+def _fetch_market_snapshot(tickers: Optional[List[str]], include_otc: bool):
+    url = "/v2/snapshot/locale/us/markets/stocks/tickers"
     
-    params = {
-        "apiKey": POLYGON_API_KEY
-    }
+    params = {}
     
     # Add tickers parameter if provided
     if tickers and len(tickers) > 0:
@@ -95,12 +152,35 @@ def get_market_snapshot(tickers: Optional[List[str]] = None, include_otc: bool =
     if include_otc:
         params["include_otc"] = "true"
     
-    response = requests.get(url, params=params)
+    response = polygon_session.get(url, params=params)
     
     if response.status_code != 200:
         raise Exception(f"[Polygon] Failed to fetch market snapshot: {response.text}")
     
-    return response.json()
+    return response
+
+
+def get_market_snapshot(tickers: Optional[List[str]] = None, include_otc: bool = False) -> dict:
+    """
+    Get a comprehensive snapshot of the entire U.S. stock market
+    
+    Args:
+        tickers: Optional list of specific tickers to get snapshots for. 
+                 If None or empty, returns all tickers.
+        include_otc: Whether to include OTC securities. Default is False.
+    
+    Returns:
+        Dictionary containing the snapshot response
+    """
+    return response_json(_fetch_market_snapshot(tickers, include_otc))
+
+
+def get_market_snapshot_columns(tickers: Optional[List[str]] = None, include_otc: bool = False) -> MarketSnapshot:
+    """
+    Same request as get_market_snapshot, decoded straight into a columnar
+    MarketSnapshot (one array per field) without keeping the nested payload.
+    """
+    return MarketSnapshot.from_payload(_fetch_market_snapshot(tickers, include_otc).content)
 
 
 def get_price_history_at_date(ticker: str, end_date: str, days_back: int = 180) -> list[dict]:
@@ -116,25 +196,8 @@ def get_price_history_at_date(ticker: str, end_date: str, days_back: int = 180)
     Returns:
         List of price bars (OHLCV data) up to end_date
     """
-    POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
-    
-    # Calculate start date
-    end_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
-    start_date_obj = end_date_obj - timedelta(days=days_back)
-    start_date = start_date_obj.strftime("%Y-%m-%d")
-    
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/day/{start_date}/{end_date}"
-    params = {
-        "adjusted": "true",
-        "sort": "asc",
-        "apiKey": POLYGON_API_KEY
-    }
-    
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        raise Exception(f"[Polygon] Failed to fetch historical price data: {response.text}")
-    
-    return response.json().get("results", [])
+    start_date = _lookback_start(end_date, days_back)
+    return _get_daily_bars(ticker, start_date, end_date, "Failed to fetch historical price data")
 
 
 def get_forward_price_history(ticker: str, start_date: str, end_date: Optional[str] = None) -> list[dict]:
@@ -150,20 +213,67 @@ def get_forward_price_history(ticker: str, start_date: str, end_date: Optional[s
     Returns:
         List of price bars (OHLCV data) from start_date to end_date
     """
-    POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
-    
     if end_date is None:
-        end_date = datetime.now().strftime("%Y-%m-%d")
-    
-    url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/day/{start_date}/{end_date}"
-    params = {
-        "adjusted": "true",
-        "sort": "asc",
-        "apiKey": POLYGON_API_KEY
-    }
-    
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        raise Exception(f"[Polygon] Failed to fetch forward price data: {response.text}")
+        end_date = n_days_ago(0)
     
-    return response.json().get("results", [])
+    return _get_daily_bars(ticker, start_date, end_date, "Failed to fetch forward price data")
+
+
+def get_price_bars(ticker: str, days: int = 60) -> Bars:
+    """get_price_history returning a Bars instead of a list of dicts"""
+    return _load_daily_bars(ticker, n_days_ago(days), n_days_ago(0), "Failed to fetch price history")
+
+
+def get_price_bars_at_date(ticker: str, end_date: str, days_back: int = 180) -> Bars:
+    """get_price_history_at_date returning a Bars instead of a list of dicts"""
+    start_date = _lookback_start(end_date, days_back)
+    return _load_daily_bars(ticker, start_date, end_date, "Failed to fetch historical price data")
+
+
+def get_session_bars(ticker: str, sessions: int, end_date: Optional[str] = None) -> Bars:
+    """
+    Get the last `sessions` NYSE trading days of bars ending on end_date.
+
+    The start date comes from the trading calendar, so the window holds
+    exactly that many bars (fewer only for tickers listed inside it) rather
+    than the ~70% of a calendar-day lookback that falls on sessions.
+
+    Args:
+        ticker: Stock ticker symbol
+        sessions: Number of trading days (bars) to fetch
+        end_date: Last date in YYYY-MM-DD format (defaults to today)
+
+    Returns:
+        Bars dated within the session window
+    """
+    if end_date is None:
+        end_date = n_days_ago(0)
+    start_date = session_window_start(end_date, sessions)
+    return _load_daily_bars(ticker, start_date, end_date, "Failed to fetch price history")
+
+
+def get_aggregate_bars(ticker: str, multiplier: int, timespan: str, start_date: str, end_date: str) -> Bars:
+    """
+    Local stand-in for Polygon's range/{multiplier}/{timespan} aggregates:
+    loads daily bars (bar store first) and resamples them, so weekly and
+    monthly bars cost no extra requests.
+
+    Args:
+        ticker: Stock ticker symbol
+        multiplier: Number of timespans per bar
+        timespan: "day" (trading sessions), "week" or "month"
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+
+    Returns:
+        Resampled Bars, oldest first (the newest period may be partial)
+    """
+    bars = _load_daily_bars(ticker, start_date, end_date, "Failed to fetch price history")
+    return resample_bars(bars, multiplier, timespan)
+
+
+def get_forward_price_bars(ticker: str, start_date: str, end_date: Optional[str] = None) -> Bars:
+    """get_forward_price_history returning a Bars instead of a list of dicts"""
+    if end_date is None:
+        end_date = n_days_ago(0)
+    return _load_daily_bars(ticker, start_date, end_date, "Failed to fetch forward price data")
@@ -0,0 +1,234 @@
+# utils/polygon_replay.py
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Polygon transport mode: 'live' (default), 'record' (live + save responses) or 'replay' (serve saved responses)
+POLYGON_MODE = os.getenv("POLYGON_MODE", "live").lower()
+CASSETTE_DIR = os.getenv("POLYGON_CASSETTE_DIR", "cache/polygon_cassettes")
+
+# Replay tuning - lets benchmarks mimic API latency and rate limiting reproducibly
+REPLAY_LATENCY_MS = float(os.getenv("POLYGON_REPLAY_LATENCY_MS", "0"))
+REPLAY_429_RATE = float(os.getenv("POLYGON_REPLAY_429_RATE", "0"))  # Fraction of requests answered with 429
+REPLAY_SEED = os.getenv("POLYGON_REPLAY_SEED")
+# Pinned current time (ISO 8601, e.g. 2024-06-14T21:30:00+00:00), see utils/clock.py
+REPLAY_NOW = os.getenv("MIDAS_REPLAY_NOW")
+
+IGNORED_PARAMS = {"apiKey"}
+CLOCK_FILE = "clock.json"  # When the cassettes were recorded (see utils/clock.py)
+
+
+def is_recordable(status_code: int) -> bool:
+    """Whether a response belongs in a cassette - rate limits (429) and server errors are transient, not data"""
+    return status_code != 429 and status_code < 500
+
+
+def request_key(url: str) -> Tuple[str, Dict[str, str]]:
+    """Path and params (minus the API key) that identify a Polygon request"""
+    parts = urlsplit(url)
+    params = {k: v for k, v in parse_qsl(parts.query) if k not in IGNORED_PARAMS}
+    return parts.path, params
+
+
+class CassetteStore:
+    """
+    Recorded Polygon responses on disk, one JSON file per distinct request.
+
+    Files are named by a hash of the request path and sorted params, so the
+    same call made later (with any API key) finds the same recording. Many
+    requests carry dates derived from today, so the directory also records
+    when it was recorded, and replays run with the clock pinned to that time.
+    """
+
+    def __init__(self, cassette_dir: str = CASSETTE_DIR):
+        self.cassette_dir = cassette_dir
+
+    def _path(self, path: str, params: Dict[str, str]) -> str:
+        digest = hashlib.sha1(
+            json.dumps([path, sorted(params.items())]).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cassette_dir, f"{digest}.json")
+
+    def save(self, url: str, status_code: int, body: str):
+        path, params = request_key(url)
+        os.makedirs(self.cassette_dir, exist_ok=True)
+        clock_path = os.path.join(self.cassette_dir, CLOCK_FILE)
+        if not os.path.exists(clock_path):
+            with open(clock_path, "w") as f:
+                json.dump({"recorded_at": REPLAY_NOW or datetime.now(timezone.utc).isoformat()}, f)
+        file_path = self._path(path, params)
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"path": path, "params": params, "status_code": status_code, "body": body}, f)
+        os.replace(tmp_path, file_path)
+
+    def load(self, url: str) -> Optional[dict]:
+        path, params = request_key(url)
+        file_path = self._path(path, params)
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, "r") as f:
+            return json.load(f)
+
+    def recorded_at(self) -> Optional[str]:
+        """ISO time of the first recording in the directory, or None"""
+        clock_path = os.path.join(self.cassette_dir, CLOCK_FILE)
+        if not os.path.exists(clock_path):
+            return None
+        with open(clock_path, "r") as f:
+            return json.load(f).get("recorded_at")
+
+
+class ReplayPolicy:
+    """Latency and 429 injection applied to replayed responses"""
+
+    def __init__(
+        self,
+        latency_ms: float = REPLAY_LATENCY_MS,
+        rate_limit_rate: float = REPLAY_429_RATE,
+        seed: Optional[str] = REPLAY_SEED
+    ):
+        self.latency = latency_ms / 1000.0
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def inject_429(self) -> bool:
+        if self.rate_limit_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.rate_limit_rate
+
+    def replay(self, cassettes: CassetteStore, url: str) -> Tuple[int, str]:
+        """Status code and body to serve for url"""
+        if self.inject_429():
+            return 429, json.dumps({"status": "ERROR", "error": "Injected rate limit (replay)"})
+        recording = cassettes.load(url)
+        if recording is None:
+            path, params = request_key(url)
+            return 404, json.dumps({"status": "NOT_FOUND", "error": f"No recorded response for {path} {params}"})
+        return recording["status_code"], recording["body"]
+
+
+# ---------------------------------------------------------------------------
+# requests (utils/polygon_session)
+# ---------------------------------------------------------------------------
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that saves every response it receives, except transient errors"""
+
+    def __init__(self, cassettes: CassetteStore, **kwargs):
+        self.cassettes = cassettes
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if is_recordable(response.status_code):
+            self.cassettes.save(request.url, response.status_code, response.text)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that serves recorded responses without touching the network"""
+
+    def __init__(self, cassettes: CassetteStore, policy: ReplayPolicy):
+        super().__init__()
+        self.cassettes = cassettes
+        self.policy = policy
+
+    def send(self, request, **kwargs):
+        if self.policy.latency:
+            time.sleep(self.policy.latency)
+        status_code, body = self.policy.replay(self.cassettes, request.url)
+
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = body.encode("utf-8")
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def build_requests_adapter(pool_size: int) -> BaseAdapter:
+    """Adapter for PolygonSession matching POLYGON_MODE"""
+    if POLYGON_MODE == "replay":
+        return ReplayAdapter(CassetteStore(), ReplayPolicy())
+    if POLYGON_MODE == "record":
+        return RecordingAdapter(CassetteStore(), pool_connections=4, pool_maxsize=pool_size)
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+
+
+# ---------------------------------------------------------------------------
+# httpx (utils/async_polygon_client)
+# ---------------------------------------------------------------------------
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that saves every response it receives, except transient errors"""
+
+    def __init__(self, cassettes: CassetteStore, inner: httpx.AsyncBaseTransport):
+        self.cassettes = cassettes
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        if not is_recordable(response.status_code):
+            # Passed through untouched, Retry-After and all
+            return response
+        body = (await response.aread()).decode("utf-8")
+        await response.aclose()
+        self.cassettes.save(str(request.url), response.status_code, body)
+        return httpx.Response(
+            response.status_code,
+            headers={"Content-Type": "application/json"},
+            content=body.encode("utf-8"),
+            request=request
+        )
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport that serves recorded responses without touching the network"""
+
+    def __init__(self, cassettes: CassetteStore, policy: ReplayPolicy):
+        self.cassettes = cassettes
+        self.policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.policy.latency:
+            await asyncio.sleep(self.policy.latency)
+        status_code, body = self.policy.replay(self.cassettes, str(request.url))
+        return httpx.Response(
+            status_code,
+            headers={"Content-Type": "application/json"},
+            content=body.encode("utf-8"),
+            request=request
+        )
+
+
+def build_async_transport(limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+    """Transport for AsyncPolygonClient matching POLYGON_MODE (None = httpx default)"""
+    if POLYGON_MODE == "replay":
+        return ReplayTransport(CassetteStore(), ReplayPolicy())
+    if POLYGON_MODE == "record":
+        return RecordingTransport(CassetteStore(), httpx.AsyncHTTPTransport(limits=limits))
+    return None
@@ -0,0 +1,101 @@
+# utils/polygon_session.py
+
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+
+from utils.polygon_replay import build_requests_adapter
+from utils.rate_limiter import polygon_rate_limiter
+from utils.single_flight import SingleFlight
+
+POLYGON_BASE_URL = "https://api.polygon.io"
+
+# Connection pool / timeout configuration (overridable from the environment)
+DEFAULT_POOL_SIZE = int(os.getenv("POLYGON_POOL_SIZE", "10"))
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("POLYGON_CONNECT_TIMEOUT", "5"))
+DEFAULT_READ_TIMEOUT = float(os.getenv("POLYGON_READ_TIMEOUT", "30"))
+
+
+class PolygonSession:
+    """
+    Process-wide HTTP client for Polygon.io.
+
+    Wraps a single requests.Session so every caller reuses keep-alive
+    connections instead of paying a TCP+TLS handshake per request. The
+    connection pool can be grown to match the number of worker threads
+    that share it, and the API key is attached here so callers don't
+    have to thread it through. Every request takes a token from the
+    process-wide Polygon rate limiter first.
+
+    Identical requests (same URL and params) issued while one is already in
+    flight - e.g. several dashboard panels loading the same ticker - share
+    that request's response instead of going out again.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT
+    ):
+        self._api_key = api_key
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._session = self._build_session(pool_size)
+        self._in_flight = SingleFlight()
+
+    @property
+    def api_key(self) -> Optional[str]:
+        # Read lazily so keys loaded by load_dotenv() after import are picked up
+        return self._api_key or os.getenv("POLYGON_API_KEY")
+
+    def _build_session(self, pool_size: int) -> requests.Session:
+        session = requests.Session()
+        # Live HTTP adapter, or the record/replay stand-in when POLYGON_MODE is set
+        adapter = build_requests_adapter(pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def ensure_pool_size(self, workers: int):
+        """Grow the connection pool so `workers` threads can each hold a connection"""
+        if workers <= self.pool_size:
+            return
+        with self._lock:
+            if workers <= self.pool_size:
+                return
+            old_session = self._session
+            self._session = self._build_session(workers)
+            self.pool_size = workers
+            old_session.close()
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> requests.Response:
+        """
+        GET a Polygon endpoint. `url` may be a full URL (e.g. a `next_url`
+        from a paginated response) or a path relative to the API base.
+        """
+        if not url.startswith("http"):
+            url = f"{POLYGON_BASE_URL}{url}"
+
+        params = dict(params or {})
+        if "apiKey" not in params and "apiKey=" not in url:
+            params["apiKey"] = self.api_key
+
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+
+        def send() -> requests.Response:
+            polygon_rate_limiter.acquire()
+            return self._session.get(url, params=params, timeout=timeout)
+
+        key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+        return self._in_flight.do(key, send)
+
+
+# Global instance
+polygon_session = PolygonSession()
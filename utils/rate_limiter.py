@@ -0,0 +1,111 @@
+# utils/rate_limiter.py
+
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+# Requests per minute allowed by each Polygon plan (0 = unlimited)
+# Free tier: ~5 calls/minute | Pro tier: ~200 calls/minute | Advanced: ~500 calls/minute
+POLYGON_PLAN_LIMITS = {
+    "free": 5,
+    "pro": 200,
+    "advanced": 500,
+    "unlimited": 0
+}
+DEFAULT_POLYGON_PLAN = "pro"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens refill continuously at `rate_per_minute / 60` per second up to
+    `burst`. The lock is only held while the bucket is updated - callers that
+    have to wait sleep outside it, so one throttled worker never blocks the
+    others from taking tokens that are already available.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.set_rate(rate_per_minute, burst)
+
+    @classmethod
+    def for_plan(cls, plan: str) -> "TokenBucket":
+        """Build a limiter sized for a Polygon plan name (free, pro, advanced, unlimited)"""
+        if plan.lower() not in POLYGON_PLAN_LIMITS:
+            raise ValueError(f"Unknown Polygon plan '{plan}'. Expected one of: {', '.join(POLYGON_PLAN_LIMITS)}")
+        return cls(POLYGON_PLAN_LIMITS[plan.lower()])
+
+    def set_rate(self, rate_per_minute: float, burst: Optional[int] = None):
+        """Change the budget; a rate of 0 disables limiting"""
+        with self._lock:
+            self.rate_per_minute = rate_per_minute
+            self.rate_per_second = rate_per_minute / 60.0
+            # Default burst: ~10 seconds of budget, so a full minute can't be spent at once
+            self.burst = burst if burst is not None else max(1, int(rate_per_minute // 6))
+            self._tokens = float(self.burst)
+            self._last_refill = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate_per_second)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """
+        Non-blocking acquire.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the number of seconds to
+            wait before trying again
+        """
+        if self.rate_per_minute <= 0:
+            return 0.0
+
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate_per_second
+
+    def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the tokens are available.
+
+        Returns:
+            True once acquired, False if `timeout` seconds passed first
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 1):
+        """Event-loop friendly acquire: awaits instead of blocking the thread"""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+
+def _build_polygon_rate_limiter() -> TokenBucket:
+    # An explicit per-minute budget wins over the plan name
+    rate_override = os.getenv("POLYGON_RATE_LIMIT_PER_MINUTE")
+    if rate_override:
+        return TokenBucket(float(rate_override))
+    return TokenBucket.for_plan(os.getenv("POLYGON_PLAN", DEFAULT_POLYGON_PLAN))
+
+
+# Global instance shared by every Polygon caller in the process
+polygon_rate_limiter = _build_polygon_rate_limiter()
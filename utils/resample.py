@@ -0,0 +1,93 @@
+# utils/resample.py
+
+from typing import Dict
+
+import numpy as np
+
+from utils.bars import Bars
+from utils.trading_calendar import SESSION_DAYS
+
+# Resampling configuration
+TIMESPANS = ("day", "week", "month")
+
+DAY_MS = 86_400_000
+
+
+def period_keys(t: np.ndarray, multiplier: int = 1, timespan: str = "week") -> np.ndarray:
+    """
+    Bucket number of each daily bar timestamp. Buckets are anchored to fixed
+    dates rather than to the first bar, so a bar lands in the same period
+    whatever window it was loaded with:
+
+    - day: N consecutive NYSE sessions (bars on non-session dates join the preceding session's bucket)
+    - week: N calendar weeks starting on Monday
+    - month: N calendar months
+    """
+    if timespan not in TIMESPANS:
+        raise ValueError(f"Unsupported timespan '{timespan}' (expected one of {', '.join(TIMESPANS)})")
+    if multiplier < 1:
+        raise ValueError("multiplier must be at least 1")
+
+    days = t // DAY_MS  # UTC day numbers, as used by bar_date()
+    if timespan == "day":
+        keys = np.searchsorted(SESSION_DAYS, days, side="right") - 1
+    elif timespan == "week":
+        keys = (days + 3) // 7  # 1970-01-01 was a Thursday
+    else:
+        keys = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return keys // multiplier
+
+
+def resample_bars(bars: Bars, multiplier: int = 1, timespan: str = "week") -> Bars:
+    """
+    Aggregate daily bars into multiplier x timespan bars, the local
+    equivalent of Polygon's range/{multiplier}/{timespan} aggregates.
+
+    Each output bar takes the first bar's t and open, the highest high, the
+    lowest low, the last close, the summed volume and trade count and the
+    volume-weighted vw. The newest period is partial when its last session is
+    still ahead. The result is a Bars like any other, so it goes straight into
+    compute_screener_metrics or a PricePanel.
+
+    Args:
+        bars: Daily bars, oldest first
+        multiplier: Number of timespans per output bar
+        timespan: "day" (trading sessions), "week" or "month"
+
+    Returns:
+        Resampled Bars, oldest first
+    """
+    if timespan == "day" and multiplier == 1:
+        return bars
+    if not len(bars):
+        return Bars.empty()
+
+    keys = period_keys(bars.t, multiplier, timespan)
+    starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [len(bars)])) - 1
+
+    volume = np.add.reduceat(bars.v, starts)
+    has_vw = ~np.isnan(bars.vw)
+    vw_volume = np.add.reduceat(np.where(has_vw, bars.v, 0.0), starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vw = np.add.reduceat(np.where(has_vw, bars.vw * bars.v, 0.0), starts) / vw_volume
+    vw = np.where(np.add.reduceat(has_vw, starts) > 0, vw, np.nan)
+    has_n = ~np.isnan(bars.n)
+    n = np.where(np.add.reduceat(has_n, starts) > 0, np.add.reduceat(np.where(has_n, bars.n, 0.0), starts), np.nan)
+
+    return Bars(
+        t=bars.t[starts],
+        o=bars.o[starts],
+        h=np.maximum.reduceat(bars.h, starts),
+        l=np.minimum.reduceat(bars.l, starts),
+        c=bars.c[ends],
+        v=volume,
+        vw=vw,
+        n=n
+    )
+
+
+def resample_panel(panel: Dict[str, Bars], multiplier: int = 1, timespan: str = "week") -> Dict[str, Bars]:
+    """resample_bars for every ticker of a {ticker: Bars} panel"""
+    return {ticker: resample_bars(bars, multiplier, timespan) for ticker, bars in panel.items()}
+
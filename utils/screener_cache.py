@@ -0,0 +1,247 @@
+# utils/screener_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from utils import clock
+from utils.fast_json import loads
+from utils.trading_calendar import latest_closed_session, session_close
+
+# Screener cache store configuration
+SCREENER_CACHE_FILE = os.getenv("MIDAS_SCREENER_CACHE_FILE", "cache/screener_cache.db")
+# Version 2 adds the per-ticker as_of bar date
+SCREENER_CACHE_VERSION = 2
+
+# When a cached ticker is refetched:
+# - session: once a session newer than its as_of date has closed since it was written
+# - ttl: once it is older than the TTL, whatever the market did
+REFRESH_POLICIES = ("session", "ttl")
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, separators=(",", ":"))
+
+
+def stale_tickers(freshness: Dict[str, Tuple[Optional[str], float]], policy: str = "session",
+                  ttl_hours: float = 48, now: Optional[datetime] = None) -> Set[str]:
+    """
+    Tickers whose cached row is out of date under a refresh policy.
+
+    Args:
+        freshness: {ticker: (as_of session date or None, write time in epoch seconds)}
+        policy: "session" or "ttl" (see REFRESH_POLICIES)
+        ttl_hours: Maximum row age for the ttl policy
+        now: Reference time (default: the current time)
+
+    Returns:
+        Set of stale tickers
+    """
+    if policy not in REFRESH_POLICIES:
+        raise ValueError(f"Unknown refresh policy '{policy}' (expected one of {', '.join(REFRESH_POLICIES)})")
+    now = now or clock.now(timezone.utc)
+    if policy == "ttl":
+        cutoff = now.timestamp() - ttl_hours * 3600
+        return {ticker for ticker, (_, updated_at) in freshness.items() if updated_at < cutoff}
+
+    # A row is current if it already reflects the latest closed session, or was written
+    # after that session closed (a halted ticker has no newer bar to pick up)
+    latest = latest_closed_session(now)
+    closed_at = session_close(latest).timestamp()
+    return {
+        ticker for ticker, (as_of, updated_at) in freshness.items()
+        if (as_of or "") < latest and updated_at < closed_at
+    }
+
+
+class ScreenerCacheStore:
+    """
+    SQLite store for the stock screener: one row per ticker with its latest
+    screener data, plus the resume checkpoint of an interrupted scan.
+
+    Writes are upserts of just the tickers that changed, so saving every
+    CHECKPOINT_INTERVAL tickers costs O(batch) instead of rewriting the
+    whole cache. Every write bumps a generation counter in the meta table;
+    readers holding a warm copy compare that one value to know whether to
+    reload.
+    """
+
+    def __init__(self, db_path: str = SCREENER_CACHE_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            if not self._initialized:
+                self._create_tables(conn)
+                self._initialized = True
+        return conn
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS screener_cache (
+                ticker TEXT PRIMARY KEY,
+                as_of TEXT,
+                updated_at REAL NOT NULL,
+                data TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        if 0 < version < 2:
+            # Rows from version 1 have no as_of and are refreshed at the next closed session
+            conn.execute("ALTER TABLE screener_cache ADD COLUMN as_of TEXT")
+        conn.execute(f"PRAGMA user_version = {SCREENER_CACHE_VERSION}")
+        conn.execute("CREATE INDEX IF NOT EXISTS screener_cache_updated ON screener_cache (updated_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS screener_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute("INSERT OR IGNORE INTO screener_meta (key, value) VALUES ('generation', '0')")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS screener_checkpoint (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                batch_id TEXT NOT NULL,
+                filters_hash TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS screener_checkpoint_tickers (
+                ticker TEXT PRIMARY KEY
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+
+    def _bump_generation(self, conn: sqlite3.Connection):
+        conn.execute("UPDATE screener_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'")
+
+    def generation(self) -> int:
+        """Counter bumped by every cache write (in any process sharing the file)"""
+        row = self._connect().execute("SELECT value FROM screener_meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._connect().execute("SELECT value FROM screener_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("INSERT OR REPLACE INTO screener_meta (key, value) VALUES (?, ?)", (key, value))
+            conn.commit()
+
+    def put(self, stock_data: Dict[str, dict], updated_at: Optional[float] = None):
+        """Insert or replace the rows of several tickers in one transaction (as_of is taken from each row's data)"""
+        if not stock_data:
+            return
+        updated_at = time.time() if updated_at is None else updated_at
+        rows = [(ticker, data.get("as_of"), updated_at, _dumps(data)) for ticker, data in stock_data.items()]
+        conn = self._connect()
+        with self._write_lock:
+            conn.executemany(
+                "INSERT OR REPLACE INTO screener_cache (ticker, as_of, updated_at, data) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._bump_generation(conn)
+            conn.commit()
+
+    def get_all(self) -> Dict[str, dict]:
+        """Every cached row as {ticker: data} (freshness is judged separately, see stale_tickers)"""
+        rows = self._connect().execute("SELECT ticker, data FROM screener_cache").fetchall()
+        return {ticker: loads(data) for ticker, data in rows}
+
+    def get_freshness(self) -> Dict[str, Tuple[Optional[str], float]]:
+        """{ticker: (as_of, updated_at)} for every row - metadata only, no row data is parsed"""
+        rows = self._connect().execute("SELECT ticker, as_of, updated_at FROM screener_cache").fetchall()
+        return {ticker: (as_of, updated_at) for ticker, as_of, updated_at in rows}
+
+    def count(self, min_updated_at: float = 0.0) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM screener_cache WHERE updated_at >= ?", (min_updated_at,)
+        ).fetchone()[0]
+
+    def prune(self, min_updated_at: float) -> int:
+        """Delete rows written before min_updated_at, returning how many were removed"""
+        conn = self._connect()
+        with self._write_lock:
+            removed = conn.execute("DELETE FROM screener_cache WHERE updated_at < ?", (min_updated_at,)).rowcount
+            if removed:
+                self._bump_generation(conn)
+            conn.commit()
+        return removed
+
+    def get_checkpoint(self) -> Optional[dict]:
+        """The saved checkpoint as {timestamp, batch_id, filters_hash, processed_tickers, stats}, or None"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT batch_id, filters_hash, stats, updated_at FROM screener_checkpoint WHERE id = 1"
+        ).fetchone()
+        if row is None:
+            return None
+        batch_id, filters_hash, stats, updated_at = row
+        tickers = [ticker for ticker, in conn.execute("SELECT ticker FROM screener_checkpoint_tickers")]
+        return {
+            "timestamp": updated_at,
+            "batch_id": batch_id,
+            "filters_hash": filters_hash,
+            "processed_tickers": tickers,
+            "stats": loads(stats)
+        }
+
+    def save_checkpoint(self, new_tickers: Iterable[str], filters_hash: str, batch_id: str, stats: Dict):
+        """
+        Add newly processed tickers to the checkpoint and update its header.
+        A checkpoint of another batch or filter set is replaced, not extended.
+        """
+        conn = self._connect()
+        with self._write_lock:
+            row = conn.execute("SELECT batch_id, filters_hash FROM screener_checkpoint WHERE id = 1").fetchone()
+            if row != (batch_id, filters_hash):
+                conn.execute("DELETE FROM screener_checkpoint_tickers")
+            conn.executemany(
+                "INSERT OR IGNORE INTO screener_checkpoint_tickers (ticker) VALUES (?)",
+                ((ticker,) for ticker in new_tickers)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO screener_checkpoint (id, batch_id, filters_hash, stats, updated_at) "
+                "VALUES (1, ?, ?, ?, ?)",
+                (batch_id, filters_hash, _dumps(stats), time.time())
+            )
+            conn.commit()
+
+    def clear_checkpoint(self) -> bool:
+        """Remove the checkpoint, returning whether there was one"""
+        conn = self._connect()
+        with self._write_lock:
+            existed = conn.execute("DELETE FROM screener_checkpoint").rowcount > 0
+            conn.execute("DELETE FROM screener_checkpoint_tickers")
+            conn.commit()
+        return existed
+
+    def clear(self):
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("DELETE FROM screener_cache")
+            self._bump_generation(conn)
+            conn.commit()
+
+
+# Global instance
+screener_cache_store = ScreenerCacheStore()
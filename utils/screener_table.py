@@ -0,0 +1,140 @@
+# utils/screener_table.py
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Numeric fields the screener filters and sorts on, with the value used when a cached row lacks one
+SCREENER_COLUMNS = {
+    "current_price": math.nan,
+    "performance_1m": math.nan,
+    "performance_3m": math.nan,
+    "performance_6m": math.nan,
+    "rsi": 50.0,
+    "adr_percentage": 0.0
+}
+RSI_SIGNALS = ("OVERSOLD", "NEUTRAL", "OVERBOUGHT")
+SORT_COLUMNS = {
+    "adr": "adr_percentage",
+    "rsi": "rsi",
+    "performance_1m": "performance_1m",
+    "performance_3m": "performance_3m",
+    "performance_6m": "performance_6m"
+}
+
+Bounds = Dict[str, Tuple[float, float]]
+
+
+def _number(value, default: float) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class ScreenerTable:
+    """
+    The screener cache ({ticker: stock data}) held column-wise: one float
+    array per filterable field plus the original dicts for the response.
+
+    Every filter is evaluated as one boolean mask over the columns and the
+    best `limit` rows are picked with a partial selection, so re-screening
+    warm data with different filters never walks the per-ticker dicts.
+    """
+
+    def __init__(self, tickers: np.ndarray, columns: Dict[str, np.ndarray], rsi_signals: np.ndarray,
+                 records: List[dict]):
+        self.tickers = tickers
+        self.columns = columns
+        self.rsi_signals = rsi_signals  # Index into RSI_SIGNALS, -1 for anything else
+        self.records = records
+        self.index = {ticker: i for i, ticker in enumerate(tickers.tolist())}
+
+    @classmethod
+    def from_records(cls, stock_data: Dict[str, dict]) -> "ScreenerTable":
+        tickers = np.array(list(stock_data), dtype=object)
+        records = list(stock_data.values())
+        columns = {
+            name: np.fromiter((_number(record.get(name), default) for record in records),
+                              dtype=np.float64, count=len(records))
+            for name, default in SCREENER_COLUMNS.items()
+        }
+        signal_codes = {signal: code for code, signal in enumerate(RSI_SIGNALS)}
+        rsi_signals = np.fromiter((signal_codes.get(record.get("rsi_signal", "NEUTRAL"), -1) for record in records),
+                                  dtype=np.int8, count=len(records))
+        return cls(tickers, columns, rsi_signals, records)
+
+    @classmethod
+    def empty(cls) -> "ScreenerTable":
+        return cls.from_records({})
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.index
+
+    def to_dict(self) -> Dict[str, dict]:
+        return dict(zip(self.tickers.tolist(), self.records))
+
+    def rows_for(self, tickers: Iterable[str]) -> np.ndarray:
+        """Row numbers of the given tickers in their order, skipping tickers without cached data"""
+        index = self.index
+        return np.array([index[ticker] for ticker in tickers if ticker in index], dtype=np.intp)
+
+    def mask(self, rows: np.ndarray, bounds: Bounds, rsi_signal: str = "all") -> np.ndarray:
+        """
+        Rows (of `rows`) passing every filter. bounds maps a column to an
+        inclusive (min, max) range; rsi_signal is 'all', 'oversold',
+        'neutral' or 'overbought'. NaN values fail every range.
+        """
+        keep = np.ones(len(rows), dtype=bool)
+        for name, (low, high) in bounds.items():
+            values = self.columns[name][rows]
+            keep &= (values >= low) & (values <= high)
+        if rsi_signal != "all":
+            signal = rsi_signal.upper()
+            code = RSI_SIGNALS.index(signal) if signal in RSI_SIGNALS else -2
+            keep &= self.rsi_signals[rows] == code
+        return keep
+
+    def top_k(self, rows: np.ndarray, column: str, descending: bool = True, limit: Optional[int] = None) -> np.ndarray:
+        """
+        The best `limit` of `rows` by column, best first. Selection uses
+        argpartition (O(n)) and only the selected rows are sorted; ties keep
+        the order of `rows`, the same as a stable full sort.
+        """
+        values = self.columns[column][rows]
+        keys = -values if descending else values
+        keys = np.where(np.isnan(keys), np.inf, keys)  # Missing values rank last
+        positions = np.arange(len(rows))
+        if limit is not None and limit < len(rows):
+            if limit <= 0:
+                return rows[:0]
+            kth = keys[np.argpartition(keys, limit - 1)[limit - 1]]
+            better = positions[keys < kth]
+            ties = positions[keys == kth][:limit - len(better)]
+            positions = np.concatenate((better, ties))
+        order = positions[np.lexsort((positions, keys[positions]))]
+        return rows[order]
+
+    def screen(self, tickers: Iterable[str], bounds: Bounds, rsi_signal: str = "all", sort_by: str = "adr",
+               descending: bool = True, limit: Optional[int] = None) -> Tuple[List[dict], int]:
+        """
+        Filter the given tickers and return (top rows as the cached dicts, number of matches).
+
+        Args:
+            tickers: Tickers to screen, in ranking tie-break order
+            bounds: {column: (min, max)} inclusive ranges
+            rsi_signal: 'all', 'oversold', 'neutral' or 'overbought'
+            sort_by: Key of SORT_COLUMNS (unknown keys sort by ADR)
+            descending: Sort direction
+            limit: Number of rows to return (all matches when None)
+        """
+        rows = self.rows_for(tickers)
+        matches = rows[self.mask(rows, bounds, rsi_signal)]
+        top = self.top_k(matches, SORT_COLUMNS.get(sort_by, "adr_percentage"), descending, limit)
+        return [self.records[i] for i in top.tolist()], len(matches)
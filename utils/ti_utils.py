@@ -2,6 +2,9 @@ import numpy as np
 from typing import List
 import math
 
+from utils.bars import Bars
+from utils.indicators import true_range
+
 def price_rate_of_change(prices: List[float], window: int) -> float:
     return (prices[-1] / prices[-window]) - 1
 
@@ -43,23 +46,9 @@ def calculate_atr(results: List[dict], period: int) -> float:
     if len(results) < period:
         raise ValueError("Insufficient data for ATR calculation.")
 
-    tr_list = []
-    for i in range(1, period):
-        curr = results[i]
-        prev = results[i - 1]
-
-        high = curr["h"]
-        low = curr["l"]
-        prev_close = prev["c"]
-
-        tr = max(
-            high - low,
-            abs(high - prev_close),
-            abs(low - prev_close)
-        )
-        tr_list.append(tr)
-
-    return np.mean(tr_list)
+    # True ranges of bars 1..period-1 (bar 0 only provides the previous close)
+    bars = Bars.coerce(results)[:period]
+    return np.mean(true_range(bars.h, bars.l, bars.c)[1:])
 
 
 def round_to_sf(value: float, sig_figs: int = 3) -> float:
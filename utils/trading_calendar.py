@@ -0,0 +1,197 @@
+# utils/trading_calendar.py
+
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Set, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from utils import clock
+
+# NYSE session calendar configuration
+CALENDAR_START_YEAR = 1990
+CALENDAR_END_YEAR = 2060
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+SESSION_CLOSE = time(16, 0)  # Regular close; early closes (13:00) are treated as 16:00
+
+# Unscheduled full-day closures (national days of mourning, weather, 9/11)
+SPECIAL_CLOSURES = (
+    "1994-04-27",  # President Nixon
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",  # September 11
+    "2004-06-11",  # President Reagan
+    "2007-01-02",  # President Ford
+    "2012-10-29", "2012-10-30",  # Hurricane Sandy
+    "2018-12-05",  # President George H.W. Bush
+    "2025-01-09"   # President Carter
+)
+
+DateLike = Union[str, date]
+
+
+def _easter(year: int) -> date:
+    """Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday (Monday=0) of a month"""
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    next_month = date(year + (month == 12), month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year: int) -> Set[date]:
+    """Full-day NYSE holidays for a year (regular rules plus SPECIAL_CLOSURES)"""
+    holidays = set()
+
+    # New Year's Day moves to Monday when on a Sunday, but is not observed on the
+    # previous Friday when on a Saturday (that Friday is the last session of the year)
+    new_year = date(year, 1, 1)
+    if new_year.weekday() == 6:
+        holidays.add(new_year + timedelta(days=1))
+    elif new_year.weekday() < 5:
+        holidays.add(new_year)
+
+    if year >= 1998:
+        holidays.add(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    holidays.add(_nth_weekday(year, 2, 0, 3))  # Washington's Birthday
+    holidays.add(_easter(year) - timedelta(days=2))  # Good Friday
+    holidays.add(_last_weekday(year, 5, 0))  # Memorial Day
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    holidays.add(_observed(date(year, 7, 4)))  # Independence Day
+    holidays.add(_nth_weekday(year, 9, 0, 1))  # Labor Day
+    holidays.add(_nth_weekday(year, 11, 3, 4))  # Thanksgiving
+    holidays.add(_observed(date(year, 12, 25)))  # Christmas
+
+    holidays.update(
+        datetime.strptime(day, "%Y-%m-%d").date() for day in SPECIAL_CLOSURES if day.startswith(str(year))
+    )
+    return holidays
+
+
+def _build_sessions() -> np.ndarray:
+    days = np.arange(np.datetime64(f"{CALENDAR_START_YEAR}-01-01"),
+                     np.datetime64(f"{CALENDAR_END_YEAR + 1}-01-01"), dtype="datetime64[D]")
+    weekdays = days[np.is_busday(days)]
+    holidays = np.array(
+        sorted(day for year in range(CALENDAR_START_YEAR, CALENDAR_END_YEAR + 1) for day in nyse_holidays(year)),
+        dtype="datetime64[D]"
+    )
+    return weekdays[~np.isin(weekdays, holidays)]
+
+
+# Every NYSE session date in [CALENDAR_START_YEAR, CALENDAR_END_YEAR], sorted
+SESSIONS = _build_sessions()
+# Same dates as day numbers since 1970-01-01 (the UTC day of a Polygon daily bar timestamp)
+SESSION_DAYS = SESSIONS.astype(np.int64)
+_SESSION_DAY_LIST = SESSION_DAYS.tolist()  # For scalar lookups without numpy call overhead
+
+
+def _to_day(day: DateLike) -> np.datetime64:
+    value = np.datetime64(day if isinstance(day, str) else day.isoformat(), "D")
+    if not SESSIONS[0] - 7 <= value <= SESSIONS[-1] + 7:
+        raise ValueError(f"{day} is outside the trading calendar ({CALENDAR_START_YEAR}-{CALENDAR_END_YEAR})")
+    return value
+
+
+def _to_string(day: np.datetime64) -> str:
+    return str(day.astype("datetime64[D]"))
+
+
+def is_session(day: DateLike) -> bool:
+    """Whether NYSE has a regular session on this date"""
+    value = _to_day(day)
+    index = np.searchsorted(SESSIONS, value)
+    return bool(index < len(SESSIONS) and SESSIONS[index] == value)
+
+
+def previous_session(day: DateLike) -> str:
+    """Latest session on or before the date"""
+    index = np.searchsorted(SESSIONS, _to_day(day), side="right") - 1
+    return _to_string(SESSIONS[max(index, 0)])
+
+
+def next_session(day: DateLike) -> str:
+    """Earliest session on or after the date"""
+    index = np.searchsorted(SESSIONS, _to_day(day), side="left")
+    return _to_string(SESSIONS[min(index, len(SESSIONS) - 1)])
+
+
+def sessions_between(start_date: DateLike, end_date: DateLike) -> List[str]:
+    """Session dates in [start_date, end_date] as YYYY-MM-DD strings"""
+    lo = np.searchsorted(SESSIONS, _to_day(start_date), side="left")
+    hi = np.searchsorted(SESSIONS, _to_day(end_date), side="right")
+    return np.datetime_as_string(SESSIONS[lo:hi]).tolist()
+
+
+def session_window_start(end_date: DateLike, sessions: int) -> str:
+    """
+    First date of the window holding the last `sessions` sessions ending on
+    end_date (the latest session on or before it) - the start date to
+    request so a daily-bar fetch returns exactly that many bars.
+    """
+    end_index = np.searchsorted(SESSIONS, _to_day(end_date), side="right") - 1
+    return _to_string(SESSIONS[max(end_index - max(sessions, 1) + 1, 0)])
+
+
+def window_start_days(day_numbers: np.ndarray, sessions: int) -> np.ndarray:
+    """session_window_start for an array of UTC day numbers, returned as day numbers"""
+    end_index = np.searchsorted(SESSION_DAYS, day_numbers, side="right") - 1
+    return SESSION_DAYS[np.maximum(end_index - max(sessions, 1) + 1, 0)]
+
+
+def window_start_day(day_number: int, sessions: int) -> int:
+    """Scalar window_start_days, cheap enough to call once per streamed bar"""
+    end_index = bisect_right(_SESSION_DAY_LIST, day_number) - 1
+    return _SESSION_DAY_LIST[max(end_index - max(sessions, 1) + 1, 0)]
+
+
+def last_closed_session(today: Optional[date] = None) -> str:
+    """Latest session before today (today's bar keeps changing until the session ends)"""
+    today = today or clock.today()
+    return previous_session(today - timedelta(days=1))
+
+
+def session_close(day: DateLike) -> datetime:
+    """Timezone-aware close time of the session on a date"""
+    value = day if isinstance(day, date) else datetime.strptime(day, "%Y-%m-%d").date()
+    return datetime.combine(value, SESSION_CLOSE, tzinfo=MARKET_TIMEZONE)
+
+
+def latest_closed_session(now: Optional[datetime] = None) -> str:
+    """
+    Latest session whose regular close has passed at `now` (default: the
+    current time) - unlike last_closed_session, this turns over at 16:00 New
+    York time instead of at midnight.
+    """
+    market_now = (now or clock.now(timezone.utc)).astimezone(MARKET_TIMEZONE)
+    today = market_now.date()
+    if market_now.time() >= SESSION_CLOSE and is_session(today):
+        return today.isoformat()
+    return previous_session(today - timedelta(days=1))